@@ -1,15 +1,27 @@
 from dotenv import load_dotenv
 load_dotenv()
 from fastapi import FastAPI
+from contextlib import asynccontextmanager
 from src import routes
 from config.logging_config import setup_logging
+from src.utils.tracing import setup_tracing
+from src.utils.compression import CompressionMiddleware
 import logging
 
 setup_logging()
+setup_tracing()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Paper Orbit Scraper", version="1.0.0")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await routes.kindle_handler.startup()
+    yield
+    await routes.kindle_handler.shutdown()
+
+app = FastAPI(title="Paper Orbit Scraper", version="1.0.0", lifespan=lifespan)
+
+app.add_middleware(CompressionMiddleware)
 app.include_router(routes.router)
 
 if __name__ == "__main__":
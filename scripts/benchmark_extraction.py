@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.async_api import async_playwright
+from notebook_fixtures import synthetic_library, render_notebook
+from src.utils.notebook_dom import LIBRARY_SCRIPT, ANNOTATIONS_SCRIPT
+
+
+async def extract_per_element(page):
+    """Previous extraction strategy: one query_selector/inner_text round trip per field"""
+    books = []
+    for book in await page.query_selector_all('.kp-notebook-library-each-book'):
+        title_elem = await book.query_selector('h2.kp-notebook-searchable')
+        author_elem = await book.query_selector('p.a-spacing-base.a-color-secondary')
+        cover_elem = await book.query_selector('img.kp-notebook-cover-image')
+        books.append({
+            'id': await book.get_attribute('id'),
+            'title': await title_elem.inner_text() if title_elem else None,
+            'author': await author_elem.inner_text() if author_elem else None,
+            'cover': await cover_elem.get_attribute('src') if cover_elem else None,
+        })
+
+    annotations = []
+    for container in await page.query_selector_all('#kp-notebook-annotations > div[id*="QTI"]'):
+        header = await container.query_selector('span#annotationHighlightHeader')
+        highlight = await container.query_selector('.kp-notebook-highlight span#highlight')
+        note = await container.query_selector('.kp-notebook-note span#note')
+        annotations.append({
+            'header': await header.inner_text() if header else None,
+            'text': await highlight.inner_text() if highlight else None,
+            'note': await note.inner_text() if note else None,
+        })
+    return books, annotations
+
+
+async def extract_bulk(page):
+    """Current extraction strategy: one page.evaluate for the library and one for the book"""
+    books = await page.evaluate(LIBRARY_SCRIPT)
+    annotations = (await page.evaluate(ANNOTATIONS_SCRIPT))['annotations']
+    return books, annotations
+
+
+async def time_strategy(page, strategy, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await strategy(page)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def run(args):
+    if args.html:
+        with open(args.html, encoding="utf-8") as f:
+            content = f.read()
+    else:
+        content = render_notebook(synthetic_library(args.books, args.highlights), open_book=0)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        page = await browser.new_page()
+        await page.set_content(content)
+
+        per_element_books, per_element_annotations = await extract_per_element(page)
+        bulk_books, bulk_annotations = await extract_bulk(page)
+        if [b['title'] for b in per_element_books] != [b['title'] for b in bulk_books] or per_element_annotations != bulk_annotations:
+            raise RuntimeError("Bulk extraction returned different data than per-element extraction")
+
+        per_element = await time_strategy(page, extract_per_element, args.repeat)
+        bulk = await time_strategy(page, extract_bulk, args.repeat)
+        await browser.close()
+
+    return {
+        "source": args.html or f"synthetic:{args.books}x{args.highlights}",
+        "books": len(bulk_books),
+        "annotations": len(bulk_annotations),
+        "per_element_seconds": round(per_element, 4),
+        "bulk_seconds": round(bulk, 4),
+        "speedup": round(per_element / bulk, 1) if bulk else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-element and bulk notebook DOM extraction")
+    parser.add_argument("--html", help="Saved notebook HTML with one book open (defaults to a synthetic page)")
+    parser.add_argument("--books", type=int, default=100, help="Books in the synthetic library")
+    parser.add_argument("--highlights", type=int, default=500, help="Highlights in the open synthetic book")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per strategy; the best time is kept")
+    parser.add_argument("--output", help="Write the result as JSON to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Replay runs measure the scraper itself, not the pauses that make it look human
+os.environ.setdefault("HUMANIZATION_PROFILE", "none")
+os.environ["SESSION_CACHE_ENABLED"] = "False"
+
+from notebook_fixtures import synthetic_library, render_annotations, render_notebook, SIGNIN_PAGE
+from src.services.browser_pool import BrowserPool
+from src.services.session_cache_service import SessionCacheService
+from src.services.highlight_store_service import HighlightStoreService
+from src.services.kindle_scraper_service import KindleScraperService
+from src.services.wait_strategy import WaitStrategy
+
+# name: (books, highlights per book)
+SCENARIOS = {
+    "small": (10, 50),
+    "medium": (200, 100),
+    "large": (2000, 10),
+    "long-books": (10, 10000),
+}
+
+
+class SyntheticNotebook:
+    """Serves a synthetic library, paginating each book's annotations like the notebook does"""
+
+    def __init__(self, books, page_size: int):
+        self.books = {book["asin"]: book for book in books}
+        self.page_size = page_size
+        self.notebook_page = render_notebook(books, open_book=None, interactive=True)
+
+    def signin(self) -> str:
+        return SIGNIN_PAGE
+
+    def notebook(self) -> str:
+        return self.notebook_page
+
+    def annotations(self, asin: str, token: str):
+        book = self.books.get(asin)
+        if book is None:
+            return None
+        start = int(token or 0)
+        end = start + self.page_size
+        next_token = str(end) if end < len(book["highlights"]) else ""
+        return render_annotations(book, book["highlights"][start:end], next_token)
+
+
+class RecordedNotebook:
+    """Serves saved pages: signin.html, notebook.html and annotations/<ASIN>[-<token>].html"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _read(self, *parts):
+        path = os.path.join(self.directory, *parts)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def signin(self) -> str:
+        return self._read("signin.html") or SIGNIN_PAGE
+
+    def notebook(self) -> str:
+        return self._read("notebook.html")
+
+    def annotations(self, asin: str, token: str):
+        name = f"{asin}-{token}.html" if token else f"{asin}.html"
+        return self._read("annotations", name)
+
+
+def start_server(notebook):
+    """Run a local stand-in for read.amazon.com/notebook on a free port"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            query = urllib.parse.parse_qs(url.query)
+            cookies = SimpleCookie(self.headers.get("Cookie", ""))
+
+            if url.path != "/notebook":
+                body = None
+            elif "asin" in query:
+                body = notebook.annotations(query["asin"][0], query.get("token", [""])[0])
+            elif "bench-session" in cookies:
+                body = notebook.notebook()
+            else:
+                body = notebook.signin()
+
+            if body is None:
+                self.send_error(404)
+                return
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def peak_rss_mb(who) -> float:
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(who).ru_maxrss / divisor, 1)
+
+
+async def run_scenario(name: str, notebook, expected, args):
+    server = start_server(notebook)
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    pool = BrowserPool(size=1, max_uses=0, max_age=0)
+
+    started = time.perf_counter()
+    await pool.start(warm=True)
+    launch_seconds = time.perf_counter() - started
+
+    service = KindleScraperService(
+        pool,
+        SessionCacheService(),
+        HighlightStoreService(os.path.join(workdir, "highlights.db")),
+        wait_strategy=WaitStrategy(os.path.join(workdir, "wait_stats.json"))
+    )
+    service.kindle_notebook_url = f"http://127.0.0.1:{server.server_port}/notebook"
+
+    scrape = service.scrape
+    captured = {}
+
+    async def timed_scrape(*scrape_args, **scrape_kwargs):
+        scrape_started = time.perf_counter()
+        result = await scrape(*scrape_args, **scrape_kwargs)
+        captured["seconds"] = time.perf_counter() - scrape_started
+        captured["result"] = result
+        return result
+
+    service.scrape = timed_scrape
+    try:
+        started = time.perf_counter()
+        response = await service.get_highlights(
+            "bench@example.com", "benchmark", headless=True, concurrency=args.concurrency, extraction=args.extraction
+        )
+        total_seconds = time.perf_counter() - started
+    finally:
+        await pool.stop()
+        server.shutdown()
+
+    if response.status_code != 200:
+        raise RuntimeError(f"Scenario {name} failed: {response.body.decode('utf-8')}")
+
+    books = captured["result"]["books"]
+    highlights = sum(len(book.highlights) for book in books)
+    if expected and (len(books), highlights) != expected:
+        raise RuntimeError(f"Scenario {name} returned {len(books)} books / {highlights} highlights, expected {expected}")
+
+    return {
+        "scenario": name,
+        "books": len(books),
+        "highlights": highlights,
+        "extraction": args.extraction,
+        "concurrency": args.concurrency,
+        "total_seconds": round(total_seconds, 4),
+        "phases": {
+            "launch": round(launch_seconds, 4),
+            **captured["result"]["meta"].get("timings", {}),
+            "serialization": round(total_seconds - captured["seconds"], 4),
+        },
+        "books_per_second": round(len(books) / total_seconds, 2) if total_seconds else None,
+        "response_bytes": len(response.body),
+        "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF),
+        "peak_browser_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+async def run(args):
+    results = []
+    if args.fixtures:
+        results.append(await run_scenario(f"recorded:{args.fixtures}", RecordedNotebook(args.fixtures), None, args))
+        return results
+
+    scenarios = [(name, *SCENARIOS[name]) for name in args.scenario or ["small"]]
+    if args.books:
+        scenarios = [(f"custom-{args.books}x{args.highlights}", args.books, args.highlights)]
+
+    for name, num_books, highlights_per_book in scenarios:
+        books = synthetic_library(num_books, highlights_per_book)
+        notebook = SyntheticNotebook(books, args.page_size)
+        result = await run_scenario(name, notebook, (num_books, num_books * highlights_per_book), args)
+        print(json.dumps(result), file=sys.stderr)
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the scraper end to end against a local replay of the Kindle notebook")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable, default: small)")
+    parser.add_argument("--books", type=int, help="Custom scenario: books in the library")
+    parser.add_argument("--highlights", type=int, default=100, help="Custom scenario: highlights per book")
+    parser.add_argument("--fixtures", help="Directory with recorded signin.html, notebook.html and annotations/<ASIN>.html")
+    parser.add_argument("--page-size", type=int, default=100, help="Annotations per notebook page in synthetic scenarios")
+    parser.add_argument("--extraction", choices=["dom", "network"], default="dom")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "humanization": os.environ["HUMANIZATION_PROFILE"],
+        "results": asyncio.run(run(args)),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from src.models.kindle_models import Highlight, HighlightItem, BookRecord, HighlightRecord
+from src.services.result_cache_service import ResultCacheService
+from src.utils import serialization
+from src.utils.response import encode_response_body
+
+
+def synthetic_rows(books: int, highlights: int):
+    """Raw per-book data as it comes out of annotation parsing"""
+    return [
+        {
+            "id": f"B{i:09d}",
+            "title": f"Synthetic book {i}",
+            "authors": [f"Author {i}", "Second Author"],
+            "cover": f"https://example.com/covers/{i}.jpg",
+            "date": "2024-01-01",
+            "annotations": [
+                {"text": f"Highlight {j} of book {i}: " + "lorem ipsum dolor sit amet " * 4, "note": "a note" if j % 5 == 0 else None, "type": "Yellow", "page": j}
+                for j in range(highlights)
+            ],
+        }
+        for i in range(books)
+    ]
+
+
+def encode_pydantic(rows) -> bytes:
+    """Previous path: pydantic models, model_dump, then stdlib json for the ETag and in JSONResponse"""
+    books = [
+        Highlight(
+            book_id=row["id"], book_title=row["title"], book_author=row["authors"], book_cover=row["cover"], date=row["date"],
+            highlights=[HighlightItem(text=a["text"], note=a["note"], type=a["type"], page=a["page"]) for a in row["annotations"]]
+        )
+        for row in rows
+    ]
+    data = [book.model_dump() for book in books]
+    hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+    return JSONResponse({"code": 200, "message": "ok", "data": data}).body
+
+
+def encode_records(rows) -> bytes:
+    """Current path: slotted dataclasses encoded once; the body and the ETag reuse those bytes"""
+    books = [
+        BookRecord(
+            book_id=row["id"], book_title=row["title"], book_author=row["authors"], book_cover=row["cover"], date=row["date"],
+            highlights=[HighlightRecord(text=a["text"], note=a["note"], type=a["type"], page=a["page"]) for a in row["annotations"]]
+        )
+        for row in rows
+    ]
+    data_json = serialization.dumps(books)
+    ResultCacheService.etag(data_json)
+    return encode_response_body(200, "ok", data_json)
+
+
+def measure(strategy, rows, repeat: int):
+    best_cpu = float("inf")
+    best_wall = float("inf")
+    for _ in range(repeat):
+        cpu_started, wall_started = time.process_time(), time.perf_counter()
+        body = strategy(rows)
+        best_cpu = min(best_cpu, time.process_time() - cpu_started)
+        best_wall = min(best_wall, time.perf_counter() - wall_started)
+        del body
+
+    tracemalloc.start()
+    strategy(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"cpu_seconds": round(best_cpu, 4), "wall_seconds": round(best_wall, 4), "peak_memory_mb": round(peak / 1024 / 1024, 1)}
+
+
+def run(args):
+    rows = synthetic_rows(args.books, args.highlights // args.books)
+    if json.loads(encode_pydantic(rows)) != json.loads(encode_records(rows)):
+        raise RuntimeError("Record serialization returned different data than the pydantic path")
+
+    pydantic_result = measure(encode_pydantic, rows, args.repeat)
+    records_result = measure(encode_records, rows, args.repeat)
+    return {
+        "books": args.books,
+        "highlights": args.books * (args.highlights // args.books),
+        "pydantic": pydantic_result,
+        "records": records_result,
+        "cpu_speedup": round(pydantic_result["cpu_seconds"] / records_result["cpu_seconds"], 1) if records_result["cpu_seconds"] else None,
+        "memory_saved_mb": round(pydantic_result["peak_memory_mb"] - records_result["peak_memory_mb"], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pydantic model_dump + stdlib json with record dataclasses + orjson")
+    parser.add_argument("--books", type=int, default=500, help="Books in the synthetic library")
+    parser.add_argument("--highlights", type=int, default=50000, help="Total highlights, spread evenly over the books")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per strategy; the best time is kept")
+    parser.add_argument("--output", help="Write the result as JSON to this file")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,50 @@
 
+import argparse
 import base64
 import json
 import os
+import sys
 import urllib.parse
 from dotenv import load_dotenv
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.crypto_service import build_envelope
+
 def load_public_key_from_private():
     load_dotenv()
-    
+
     private_key_b64 = os.getenv('PRIVATE_KEY')
     if not private_key_b64:
         raise ValueError("PRIVATE_KEY not found in .env file")
-    
+
     private_key_pem = base64.b64decode(private_key_b64)
     private_key = serialization.load_pem_private_key(private_key_pem, password=None)
-    
+
     public_key = private_key.public_key()
     return public_key
 
-def encrypt_credentials(email: str, password: str) -> str:
+def encrypt_credentials(email: str, password: str, options: dict = None, legacy: bool = False) -> str:
     public_key = load_public_key_from_private()
-    
+
     credentials = {
         "email": email,
         "password": password
     }
-    
+
+    if not legacy:
+        if options:
+            credentials["options"] = options
+        return build_envelope(public_key, credentials)
+
+    if options:
+        raise ValueError("Options need the hybrid format (drop --legacy)")
+
     credentials_json = json.dumps(credentials)
     credentials_bytes = credentials_json.encode('utf-8')
-    
+
     encrypted_bytes = public_key.encrypt(
         credentials_bytes,
         padding.OAEP(
@@ -39,27 +53,42 @@ def encrypt_credentials(email: str, password: str) -> str:
             label=None
         )
     )
-    
+
     encrypted_b64 = base64.b64encode(encrypted_bytes).decode('utf-8')
     return encrypted_b64
 
+def parse_option(raw: str):
+    """Parse a name=value option; JSON values (true, 2, "x") are decoded, anything else stays a string"""
+    name, _, value = raw.partition("=")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
 def main():
+    parser = argparse.ArgumentParser(description="Encrypt Amazon credentials for the 'encrypted' parameter")
+    parser.add_argument("--option", action="append", default=[], metavar="NAME=VALUE",
+                        help="Request option sent inside the envelope, e.g. incremental=true or concurrency=2")
+    parser.add_argument("--legacy", action="store_true", help="Produce the old single RSA block (email and password only)")
+    args = parser.parse_args()
+
     print("🔐 Kindle Credentials Encryptor")
     print("=" * 40)
-    
+
     try:
         email = input("Amazon account email: ").strip()
         password = input("Amazon account password: ").strip()
-        
+
         if not email or not password:
             print("❌ Email and password are required!")
             return
-        
+
         print("\n🔄 Encrypting credentials...")
-        encrypted_data = encrypt_credentials(email, password)
-        
+        options = dict(parse_option(raw) for raw in args.option)
+        encrypted_data = encrypt_credentials(email, password, options, args.legacy)
+
         encrypted_url_encoded = urllib.parse.quote(encrypted_data, safe='')
-        
+
         print("\n✅ Credentials encrypted successfully!")
         print("=" * 60)
         print("ORIGINAL ENCRYPTED DATA:")
@@ -70,13 +99,13 @@ def main():
         print("=" * 60)
         print(encrypted_url_encoded)
         print("=" * 60)
-        
+
         print(f"\n📝 To use in Postman:")
         print(f"   'encrypted' parameter: {encrypted_url_encoded}")
         print(f"   'email' and 'password' parameters: leave blank")
-        
+
     except Exception as e:
         print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import html
+import random
+from typing import Any, Dict, List, Optional
+
+COLORS = ["Yellow", "Blue", "Pink", "Orange"]
+WORDS = (
+    "orbit paper light signal reading memory margin chapter idea quiet river stone "
+    "method system pattern theory practice history future language window garden"
+).split()
+
+
+def synthetic_library(num_books: int, highlights_per_book: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Build a deterministic fake library shaped like the data the notebook shows"""
+    rng = random.Random(seed)
+    books = []
+    for i in range(num_books):
+        highlights = []
+        for j in range(highlights_per_book):
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))).capitalize() + "."
+            note = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))) if rng.random() < 0.2 else ""
+            highlights.append({
+                "id": f"QTI{i:05d}{j:06d}",
+                "color": rng.choice(COLORS),
+                "location": 10 + j * rng.randint(5, 30),
+                "text": text,
+                "note": note,
+            })
+        books.append({
+            "asin": f"B{i:09d}",
+            "title": f"Synthetic Book {i + 1}",
+            "authors": ", ".join(f"Author {rng.randint(1, 500)}" for _ in range(rng.randint(1, 2))),
+            "cover": f"https://m.media-amazon.com/images/I/cover-{i}.jpg",
+            "annotated_date": f"Sunday August {1 + i % 28}, 2025",
+            "highlights": highlights,
+        })
+    return books
+
+
+def render_library(books: List[Dict[str, Any]]) -> str:
+    """Render the left-hand library list of the notebook page"""
+    rows = []
+    for book in books:
+        rows.append(f"""
+<div id="{book['asin']}" class="a-row kp-notebook-library-each-book">
+  <span class="a-declarative" data-action="get-annotations-for-asin" data-get-annotations-for-asin='{{"asin":"{book['asin']}"}}'>
+    <a href="javascript:void(0);" class="a-link-normal a-text-normal">
+      <img class="kp-notebook-cover-image" src="{html.escape(book['cover'])}">
+      <h2 class="a-size-base a-color-base a-text-normal kp-notebook-searchable a-text-bold">{html.escape(book['title'])}</h2>
+      <p class="a-spacing-base a-spacing-top-mini a-color-secondary kp-notebook-searchable a-size-base">By: {html.escape(book['authors'])}</p>
+      <input type="hidden" value="{book['annotated_date']}" id="kp-notebook-annotated-date-{book['asin']}">
+    </a>
+  </span>
+</div>""")
+    return (
+        '<div class="a-scroller kp-notebook-scroller-addon a-scroller-vertical" style="height: 600px; overflow-y: auto;">'
+        + "".join(rows)
+        + "</div>"
+    )
+
+
+def render_annotations(book: Dict[str, Any], highlights: Optional[List[Dict[str, Any]]] = None, next_page_token: str = "") -> str:
+    """Render the annotations pane of one book as the notebook returns it"""
+    highlights = book["highlights"] if highlights is None else highlights
+    rows = []
+    for item in highlights:
+        rows.append(f"""
+<div id="{item['id']}" class="a-row a-spacing-base">
+  <div class="a-column a-span10 kp-notebook-row-separator">
+    <div class="a-row"><span id="annotationHighlightHeader" class="a-size-small a-color-secondary kp-notebook-selectable kp-notebook-metadata">{item['color']} highlight | Location:&nbsp;{item['location']}</span></div>
+    <div class="a-row a-spacing-top-medium kp-notebook-highlight kp-notebook-selectable kp-notebook-highlight-{item['color'].lower()}"><span id="highlight" class="a-size-base-plus a-color-base">{html.escape(item['text'])}</span></div>
+    <div class="a-row a-spacing-top-base kp-notebook-note kp-notebook-selectable"><span id="note-label" class="a-size-small a-color-secondary">Note:</span><span id="note" class="a-size-base-plus a-color-base">{html.escape(item['note'])}</span></div>
+  </div>
+</div>""")
+    return f"""
+<div id="kp-notebook-annotations-asin" data-asin="{book['asin']}">
+  <span id="kp-notebook-annotated-date" class="a-color-secondary kp-notebook-metadata">{book['annotated_date']}</span>
+  <span id="kp-notebook-highlights-count">{len(book['highlights'])}</span>
+  <input type="hidden" class="kp-notebook-annotations-next-page-start" value="{next_page_token}">
+  <input type="hidden" class="kp-notebook-content-limit-state" value="">
+  <div id="kp-notebook-annotations" class="a-row">{"".join(rows)}</div>
+</div>"""
+
+
+# Loads a book's annotations pane from the notebook when it is clicked, like the real page does
+NOTEBOOK_SCRIPT = """
+document.addEventListener('click', async (event) => {
+  const action = event.target.closest('span[data-action="get-annotations-for-asin"]');
+  if (!action) return;
+  const asin = JSON.parse(action.dataset.getAnnotationsForAsin).asin;
+  const pane = document.getElementById('annotations');
+  // Like the real page, the previous book stays in the pane until the new one has loaded
+  const response = await fetch(`${location.pathname}?asin=${asin}&contentLimitState=&`);
+  pane.innerHTML = await response.text();
+});
+"""
+
+# Two-step sign-in form with the selectors the scraper uses; submitting sets a session cookie
+SIGNIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Amazon Sign-In</title></head>
+<body>
+<form onsubmit="return false">
+  <div id="email-step"><input type="email" name="email"><input type="submit" id="continue" value="Continue"></div>
+  <div id="password-step" style="display: none"><input type="password" name="password"><input type="submit" id="signInSubmit" value="Sign in"></div>
+</form>
+<script>
+document.getElementById('continue').addEventListener('click', () => {
+  document.getElementById('email-step').style.display = 'none';
+  document.getElementById('password-step').style.display = 'block';
+});
+document.getElementById('signInSubmit').addEventListener('click', () => {
+  document.cookie = 'bench-session=1; path=/';
+  location.href = location.pathname;
+});
+</script>
+</body></html>"""
+
+
+def render_notebook(books: List[Dict[str, Any]], open_book: Optional[int] = 0, interactive: bool = False) -> str:
+    """Render a full notebook page with the library list and, optionally, one open book
+    
+    With interactive=True the page loads annotations on click (see NOTEBOOK_SCRIPT).
+    """
+    annotations = render_annotations(books[open_book]) if open_book is not None and books else ""
+    script = f"<script>{NOTEBOOK_SCRIPT}</script>" if interactive else ""
+    return f"""<!DOCTYPE html>
+<html><head><title>Kindle: Your Notes and Highlights</title></head>
+<body>
+<div id="kp-notebook-library">{render_library(books)}</div>
+<div id="annotations">{annotations}</div>
+{script}
+</body></html>"""
@@ -1,19 +1,149 @@
 from src.services.kindle_scraper_service import KindleScraperService
 from src.services.crypto_service import CryptoService
+from src.services.browser_pool import BrowserPool
+from src.services.session_cache_service import SessionCacheService
+from src.services.highlight_store_service import HighlightStoreService
+from src.services.request_filter import RequestFilter
+from src.services.admission_controller import AdmissionController, AdmissionRejectedError
+from src.services.wait_strategy import WaitStrategy
+from src.services.result_cache_service import ResultCacheService, CachedResult
+from src.services.job_service import JobService, JobQueueFullError
+from src.services.sync_scheduler import SyncScheduler
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Response
+from fastapi.responses import JSONResponse
+import asyncio
+import hmac
 import logging
+import os
+import time
 import urllib.parse
+from datetime import date, datetime
 
-from src.utils.response import create_response
+from src.utils.response import create_response, create_stream_response, encode_response_body, STREAM_MEDIA_TYPES
+from src.utils.export import create_export_response, export_unavailable, EXPORT_MEDIA_TYPES
+from src.utils.scraper import HumanizationProfile
+from src.utils.account import account_key, credential_key
+from src.utils.schedule import Schedule
+from src.utils.book_filter import BookFilter
+from src.utils import metrics, serialization
 
 logger = logging.getLogger(__name__)
 
 class KindleHandler:
     def __init__(self):
-        self.kindle_scraper_service = KindleScraperService(headless=False)
+        self.browser_pool = BrowserPool()
+        self.session_cache_service = SessionCacheService()
+        self.highlight_store_service = HighlightStoreService()
+        self.request_filter = RequestFilter()
+        self.admission_controller = AdmissionController(ceiling=self.browser_pool.size)
+        self.wait_strategy = WaitStrategy()
+        self.kindle_scraper_service = KindleScraperService(
+            self.browser_pool,
+            self.session_cache_service,
+            self.highlight_store_service,
+            self.request_filter,
+            self.admission_controller,
+            self.wait_strategy
+        )
+        self.job_service = JobService(self.kindle_scraper_service)
+        self.result_cache_service = ResultCacheService()
         self.crypto_service = CryptoService()
+        self.sync_scheduler = SyncScheduler(self.kindle_scraper_service, self.highlight_store_service, self.crypto_service)
+        self.default_concurrency = int(os.getenv("BOOK_CONCURRENCY", "1"))
+        self.max_concurrency = int(os.getenv("BOOK_CONCURRENCY_MAX", "4"))
+        self.default_extraction = os.getenv("EXTRACTION_MODE", "dom")
+        self.default_humanization = os.getenv("HUMANIZATION_PROFILE", "normal")
+        self.search_max_limit = int(os.getenv("SEARCH_MAX_LIMIT", "100"))
 
-    def get_highlights(self, encrypted: str, email: str, password: str, headless: str = None, manual_puzzle: str = None):
-        logger.info(f"Highlights request received")
+        metrics.POOL_STATE.set_function(self._pool_state_metrics)
+        metrics.JOB_QUEUE_DEPTH.set_function(lambda: {(): self.job_service.stats()["queue_depth"]})
+        metrics.SCRAPES_IN_FLIGHT.set_function(lambda: {(): self.kindle_scraper_service.single_flight.in_flight()})
+        metrics.ADMISSION_SLOTS.set_function(self._admission_metrics)
+        metrics.WAIT_TIMEOUTS.set_function(self._wait_metrics)
+
+    async def startup(self):
+        logger.info("Starting browser pool")
+        await self.browser_pool.start()
+        await self.job_service.start()
+        await self.sync_scheduler.start()
+
+    async def shutdown(self):
+        await self.sync_scheduler.stop()
+        await self.job_service.stop()
+        self.wait_strategy.save()
+        logger.info("Stopping browser pool")
+        await self.browser_pool.stop()
+
+    def _pool_state_metrics(self):
+        stats = self.browser_pool.stats()
+        return {("in_use",): stats["in_use"], ("idle",): stats["idle"], ("waiting",): stats["waiting"]}
+
+    def _admission_metrics(self):
+        stats = self.admission_controller.stats()
+        return {("active",): stats["active"], ("queued",): stats["queued"], ("capacity",): stats["capacity"]}
+
+    def _wait_metrics(self):
+        return {
+            (phase,): stats["timeout_ms"] / 1000
+            for phase, stats in self.wait_strategy.stats().items() if stats["timeout_ms"] is not None
+        }
+
+    def get_admission_stats(self):
+        return create_response(
+            code=200,
+            message="Admission control stats",
+            data=self.admission_controller.stats()
+        )
+
+    def get_pool_stats(self):
+        return create_response(
+            code=200,
+            message="Browser pool stats",
+            data=self.browser_pool.stats()
+        )
+
+    def _resolve_request(
+        self,
+        encrypted: str,
+        email: str,
+        password: str,
+        headless: str = None,
+        manual_puzzle: str = None,
+        incremental: str = None,
+        concurrency: int = None,
+        extraction: str = None,
+        humanization: str = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[JSONResponse]]:
+        """Validate the query parameters and resolve the credentials
+        Returns:
+            A (scraper_params, None) tuple on success or (None, error_response).
+        """
+        if encrypted:
+            logger.info(f"Processing highlights for encrypted data")
+            try:
+                encrypted_decoded = urllib.parse.unquote(encrypted)
+                logger.info(f"Decoded key: {encrypted_decoded[:20]}...")
+                
+                credentials = self.crypto_service.decrypt_credentials(encrypted_decoded)
+                email = credentials['email']
+                password = credentials['password']
+            except Exception as e:
+                logger.error(f"Error decrypting credentials: {e}")
+                return None, create_response(
+                    code=401,
+                    message="Invalid encrypted credentials",
+                    data=None
+                )
+
+            # Hybrid envelopes may carry request options; explicit query params take precedence
+            options = credentials.get("options") or {}
+            headless = self._encrypted_option(options, "headless", headless)
+            manual_puzzle = self._encrypted_option(options, "manual_puzzle", manual_puzzle)
+            incremental = self._encrypted_option(options, "incremental", incremental)
+            concurrency = self._encrypted_option(options, "concurrency", concurrency)
+            extraction = self._encrypted_option(options, "extraction", extraction)
+            humanization = self._encrypted_option(options, "humanization", humanization)
 
         if headless is None:
             headless = "True"
@@ -21,7 +151,7 @@ class KindleHandler:
 
         if headless not in ["True", "False"]:
             logger.warning(f"Invalid 'headless' parameter: {headless}")
-            return create_response(
+            return None, create_response(
                 code=400,
                 message="Param 'headless' must be 'True' or 'False'",
                 data=None
@@ -33,31 +163,59 @@ class KindleHandler:
 
         if manual_puzzle not in ["True", "False"]:
             logger.warning(f"Invalid 'manual_puzzle' parameter: {manual_puzzle}")
-            return create_response(
+            return None, create_response(
                 code=400,
                 message="Param 'manual_puzzle' must be True or False",
                 data=None
             )
 
-        if encrypted:
-            logger.info(f"Processing highlights for encrypted data")
-            try:
-                encrypted_decoded = urllib.parse.unquote(encrypted)
-                logger.info(f"Decoded key: {encrypted_decoded[:20]}...")
-                
-                credentials = self.crypto_service.decrypt_credentials(encrypted_decoded)
-                email = credentials['email']
-                password = credentials['password']
-            except Exception as e:
-                logger.error(f"Error decrypting credentials: {e}")
-                return create_response(
-                    code=401,
-                    message="Invalid encrypted credentials",
-                    data=None
-                )
-        elif not email or not password:
+        if incremental is None:
+            incremental = "False"
+
+        if incremental not in ["True", "False"]:
+            logger.warning(f"Invalid 'incremental' parameter: {incremental}")
+            return None, create_response(
+                code=400,
+                message="Param 'incremental' must be True or False",
+                data=None
+            )
+
+        if concurrency is None:
+            concurrency = self.default_concurrency
+
+        if not isinstance(concurrency, int) or concurrency < 1 or concurrency > self.max_concurrency:
+            logger.warning(f"Invalid 'concurrency' parameter: {concurrency}")
+            return None, create_response(
+                code=400,
+                message=f"Param 'concurrency' must be between 1 and {self.max_concurrency}",
+                data=None
+            )
+
+        if extraction is None:
+            extraction = self.default_extraction
+
+        if extraction not in ["dom", "network"]:
+            logger.warning(f"Invalid 'extraction' parameter: {extraction}")
+            return None, create_response(
+                code=400,
+                message="Param 'extraction' must be 'dom' or 'network'",
+                data=None
+            )
+
+        if humanization is None:
+            humanization = self.default_humanization
+
+        if humanization not in HumanizationProfile.PRESETS:
+            logger.warning(f"Invalid 'humanization' parameter: {humanization}")
+            return None, create_response(
+                code=400,
+                message=f"Param 'humanization' must be one of: {', '.join(HumanizationProfile.PRESETS)}",
+                data=None
+            )
+
+        if not email or not password:
             logger.warning("Required parameters missing")
-            return create_response(
+            return None, create_response(
                 code=401,
                 message="Missing required parameters: email and password or encrypted credentials",
                 data=None
@@ -71,13 +229,541 @@ class KindleHandler:
         manual_puzzle_bool = manual_puzzle == "True"
         logger.info(f"Manual puzzle mode: {manual_puzzle_bool}")
 
+        incremental_bool = incremental == "True"
+        logger.info(f"Incremental mode: {incremental_bool}")
+        logger.info(f"Book concurrency: {concurrency}")
+        logger.info(f"Extraction mode: {extraction}")
+        logger.info(f"Humanization profile: {humanization}")
+
+        return {
+            "email": email,
+            "password": password,
+            "headless": headless_bool,
+            "manual_puzzle": manual_puzzle_bool,
+            "incremental": incremental_bool,
+            "concurrency": concurrency,
+            "extraction": extraction,
+            "humanization": humanization
+        }, None
+
+    @staticmethod
+    def _encrypted_option(options: Dict[str, Any], name: str, value: Any) -> Any:
+        """Fill a param left out of the query from the encrypted options, as the query would spell it"""
+        if value is not None or options.get(name) is None:
+            return value
+        option = options[name]
+        if isinstance(option, bool):
+            return "True" if option else "False"
+        return option
+
+    def _resolve_format(self, export_format: Optional[str]) -> Tuple[str, Optional[JSONResponse]]:
+        """Validate the 'format' param, returning the format or an error response"""
+        if export_format is None:
+            return "json", None
+
+        if export_format not in EXPORT_MEDIA_TYPES:
+            logger.warning(f"Invalid 'format' parameter: {export_format}")
+            return export_format, create_response(
+                code=400,
+                message=f"Param 'format' must be one of: {', '.join(EXPORT_MEDIA_TYPES)}",
+                data=None
+            )
+
+        reason = export_unavailable(export_format)
+        if reason is not None:
+            logger.warning(reason)
+            return export_format, create_response(code=400, message=reason, data=None)
+
+        return export_format, None
+
+    def _resolve_book_filter(
+        self,
+        asin: Optional[str],
+        title: Optional[str],
+        annotated_since: Optional[str],
+        limit: Optional[int],
+        offset: Optional[int],
+        fields: Optional[str]
+    ) -> Tuple[Optional[BookFilter], Optional[JSONResponse]]:
+        """Validate the book selection and projection params, returning the filter or an error response"""
         try:
-            scraper = KindleScraperService(headless=headless_bool)
-            return scraper.get_highlights(email, password, manual_puzzle=manual_puzzle_bool)
+            return BookFilter.parse(asin, title, annotated_since, limit, offset, fields), None
+        except ValueError as e:
+            logger.warning(f"Invalid book filter: {e}")
+            return None, create_response(code=400, message=str(e), data=None)
+
+    def _cached_response(self, entry: CachedResult, if_none_match: Optional[str], cache_status: str) -> Response:
+        """Serve a cached result, or 304 Not Modified when the client already has it"""
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": self.result_cache_service.cache_control(),
+            "Age": str(entry.age),
+            "X-Cache": cache_status
+        }
+        if self.result_cache_service.matches(if_none_match, entry.etag):
+            logger.info(f"Result not modified ({cache_status.lower()}), returning 304")
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    async def get_highlights(
+        self,
+        encrypted: str,
+        email: str,
+        password: str,
+        headless: str = None,
+        manual_puzzle: str = None,
+        incremental: str = None,
+        stream: str = None,
+        concurrency: int = None,
+        extraction: str = None,
+        humanization: str = None,
+        force_refresh: str = None,
+        if_none_match: str = None,
+        export_format: str = None,
+        source: str = None,
+        asin: str = None,
+        title: str = None,
+        annotated_since: str = None,
+        limit: int = None,
+        offset: int = None,
+        fields: str = None,
+        resume_token: str = None
+    ):
+        logger.info(f"Highlights request received")
+
+        if source is None:
+            source = "live"
+
+        if source not in ["live", "store"]:
+            logger.warning(f"Invalid 'source' parameter: {source}")
+            return create_response(
+                code=400,
+                message="Param 'source' must be 'live' or 'store'",
+                data=None
+            )
+
+        if force_refresh is None:
+            force_refresh = "False"
+
+        if force_refresh not in ["True", "False"]:
+            logger.warning(f"Invalid 'force_refresh' parameter: {force_refresh}")
+            return create_response(
+                code=400,
+                message="Param 'force_refresh' must be True or False",
+                data=None
+            )
+
+        if stream is not None and stream not in STREAM_MEDIA_TYPES:
+            logger.warning(f"Invalid 'stream' parameter: {stream}")
+            return create_response(
+                code=400,
+                message=f"Param 'stream' must be one of: {', '.join(STREAM_MEDIA_TYPES)}",
+                data=None
+            )
+
+        export_format, error_response = self._resolve_format(export_format)
+        if error_response is not None:
+            return error_response
+
+        if stream and export_format != "json":
+            logger.warning(f"Param 'stream' cannot be combined with format={export_format}")
+            return create_response(
+                code=400,
+                message="Param 'stream' is only available with format=json",
+                data=None
+            )
+
+        book_filter, error_response = self._resolve_book_filter(asin, title, annotated_since, limit, offset, fields)
+        if error_response is not None:
+            return error_response
+
+        params, error_response = self._resolve_request(encrypted, email, password, headless, manual_puzzle, incremental, concurrency, extraction, humanization)
+        if error_response is not None:
+            return error_response
+
+        if source == "store":
+            if stream:
+                return create_response(code=400, message="Param 'stream' is only available with source=live", data=None)
+            return await self._stored_highlights(params, export_format, book_filter)
+
+        params["book_filter"] = book_filter
+        params["resume_token"], error_response = await self._resolve_resume_token(params, resume_token)
+        if error_response is not None:
+            return error_response
+        # PBKDF2 is slow on purpose, so it runs once per request and is shared by the cache, coalescing and session keys
+        params["request_key"] = await asyncio.to_thread(credential_key, params["email"], params["password"])
+        if stream:
+            # Rejections must be decided before the stream starts, while a 429/503 status can still be sent
+            try:
+                self.admission_controller.check(params["email"])
+            except AdmissionRejectedError as e:
+                return create_response(
+                    code=e.status_code,
+                    message=f"{e}. Please try again later.",
+                    data=None,
+                    headers={"Retry-After": str(e.retry_after)}
+                )
+            logger.info(f"Streaming highlights as {stream}")
+            return create_stream_response(self.kindle_scraper_service.stream_highlights(**params, admission_checked=True), stream)
+
+        # Incremental and partial results depend on the highlight store and the journal, so only full results are cached.
+        # The key covers the password and the filter too, so a cached result is only served for the same request.
+        cache_key = self.result_cache_service.key(params["request_key"], **book_filter.options())
+        if not params["incremental"] and not params["resume_token"] and force_refresh == "False":
+            cached = self.result_cache_service.get(cache_key)
+            if cached is not None:
+                logger.info(f"Serving cached highlights ({cached.age}s old)")
+                if export_format != "json":
+                    return create_export_response(serialization.loads(cached.body)["data"], export_format)
+                return self._cached_response(cached, if_none_match, "HIT")
+
+        try:
+            result = await self.kindle_scraper_service.scrape(**params)
         except Exception as e:
-            logger.error(f"Error getting highlights: {e}")
+            return self.kindle_scraper_service.error_response(e)
+
+        books = result["books"]
+        data = [book_filter.project(book) for book in books] if book_filter.projects else books
+        meta = result["meta"] or None
+        partial = bool(meta and meta.get("partial"))
+        # The records are encoded once; those bytes are the body, the cached entry and the ETag's input
+        data_json = serialization.dumps(data)
+        body = encode_response_body(200, self.kindle_scraper_service.result_message(result), data_json, meta)
+        if params["incremental"]:
+            for key in {cache_key, self.result_cache_service.key(params["request_key"])}:
+                self.result_cache_service.invalidate(key)
+        elif not partial:
+            entry = self.result_cache_service.set(cache_key, body, data_json)
+
+        # Exports are converted from the records, so the cache and ETags stay format independent
+        if export_format != "json":
+            export_response = create_export_response([book if isinstance(book, dict) else book.to_dict() for book in data], export_format)
+            if partial:
+                export_response.headers["X-Resume-Token"] = meta["resume_token"]
+            return export_response
+        if params["incremental"] or partial:
+            return Response(content=body, media_type="application/json")
+        return self._cached_response(entry, if_none_match, "MISS")
+
+    async def _resolve_resume_token(self, params: Dict[str, Any], resume_token: Optional[str]) -> Tuple[Optional[str], Optional[JSONResponse]]:
+        """Check that a resume token belongs to the account and to a run with the same options (incremental flag and
+        book selection); "latest" picks the account's last unfinished run with these options"""
+        if not resume_token:
+            return None, None
+
+        key = account_key(params["email"])
+        options = KindleScraperService.run_options(params["incremental"], params.get("book_filter"))
+        if resume_token == "latest":
+            latest = await asyncio.to_thread(self.highlight_store_service.latest_run, key, options)
+            if latest is None:
+                return None, create_response(code=404, message="No unfinished scrape with these options to resume", data=None)
+            return latest, None
+
+        run_options = await asyncio.to_thread(self.highlight_store_service.run_options, key, resume_token)
+        if run_options is None:
+            logger.warning("Unknown or expired resume token")
+            return None, create_response(code=404, message="Unknown or expired resume_token", data=None)
+        if run_options != options:
+            logger.warning("Resume token used with different scrape options")
+            return None, create_response(
+                code=409,
+                message="Param 'resume_token' belongs to a scrape with a different 'incremental' flag or book filter",
+                data=None
+            )
+        return resume_token, None
+
+    async def _verified_sync_account(self, params: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Return the account key and its sync registration, if the request's credentials match it"""
+        key = account_key(params["email"])
+        account = await asyncio.to_thread(self.highlight_store_service.get_sync_account, key)
+        if account is None:
+            return key, None
+        request_key = await asyncio.to_thread(credential_key, params["email"], params["password"])
+        if not hmac.compare_digest(account["credential_key"], request_key):
+            return key, None
+        return key, account
+
+    async def _signed_in(self, key: str, request_key: str) -> bool:
+        """Whether Amazon accepted these credentials on the account's last sign-in (registering for sync checks no password)"""
+        login_key = await asyncio.to_thread(self.highlight_store_service.login_credential_key, key)
+        return login_key is not None and hmac.compare_digest(login_key, request_key)
+
+    def _not_signed_in_response(self) -> JSONResponse:
+        return create_response(
+            code=403,
+            message="These credentials have not signed in to Kindle yet; stored highlights are served once a scrape or sync with them succeeds",
+            data=None
+        )
+
+    @staticmethod
+    def _stored_date(book) -> Optional[date]:
+        """The stored mm-dd-yyyy annotated date of a book as a date"""
+        try:
+            return datetime.strptime(book.date, "%m-%d-%Y").date() if book.date else None
+        except ValueError:
+            return None
+
+    async def _stored_highlights(self, params: Dict[str, Any], export_format: str, book_filter: BookFilter):
+        """Serve the account's books from the highlight store without starting a browser"""
+        key, account = await self._verified_sync_account(params)
+        if account is None:
             return create_response(
-                code=500,
-                message="Error retrieving highlights",
+                code=404,
+                message="Account is not registered for scheduled sync (POST /kindle/sync)",
                 data=None
             )
+        if not await self._signed_in(key, account["credential_key"]):
+            return self._not_signed_in_response()
+
+        books = await asyncio.to_thread(self.highlight_store_service.get_books, key)
+        books, has_more = book_filter.page(
+            book for book in books
+            if book_filter.matches(book.book_id, book.book_title, self._stored_date(book) if book_filter.annotated_since else None)
+        )
+        logger.info(f"Serving {len(books)} books from the highlight store")
+        if book_filter.projects:
+            books = [book_filter.project(book) for book in books]
+        if export_format != "json":
+            return create_export_response([book if isinstance(book, dict) else book.to_dict() for book in books], export_format)
+
+        meta = {
+            "source": "store",
+            "synced_at": await asyncio.to_thread(self.highlight_store_service.get_synced_at, key),
+            "last_sync_status": account["last_status"]
+        }
+        if book_filter.options():
+            meta["filter"] = {**book_filter.options(), "selected": len(books), "has_more": has_more}
+        return create_response(
+            code=200,
+            message="Highlights loaded from store",
+            data=books,
+            meta=meta
+        )
+
+    async def search_highlights(
+        self,
+        encrypted: str,
+        email: str,
+        password: str,
+        q: str = None,
+        asin: str = None,
+        page_from: int = None,
+        page_to: int = None,
+        limit: int = None,
+        offset: int = None
+    ):
+        logger.info("Search request received")
+
+        if not q or not q.strip():
+            return create_response(code=400, message="Param 'q' is required", data=None)
+
+        if limit is None:
+            limit = 20
+
+        if limit < 1 or limit > self.search_max_limit:
+            return create_response(code=400, message=f"Param 'limit' must be between 1 and {self.search_max_limit}", data=None)
+
+        if offset is None:
+            offset = 0
+
+        if offset < 0:
+            return create_response(code=400, message="Param 'offset' must not be negative", data=None)
+
+        if page_from is not None and page_to is not None and page_from > page_to:
+            return create_response(code=400, message="Param 'page_from' must not be greater than 'page_to'", data=None)
+
+        params, error_response = self._resolve_request(encrypted, email, password)
+        if error_response is not None:
+            return error_response
+
+        key, account = await self._verified_sync_account(params)
+        if account is None:
+            return create_response(
+                code=404,
+                message="Account is not registered for scheduled sync (POST /kindle/sync)",
+                data=None
+            )
+        if not await self._signed_in(key, account["credential_key"]):
+            return self._not_signed_in_response()
+
+        asins = [value.strip() for value in asin.split(",") if value.strip()] if asin else None
+        started = time.perf_counter()
+        total, results = await asyncio.to_thread(
+            self.highlight_store_service.search, key, account["credential_key"], q, asins, page_from, page_to, limit, offset
+        )
+        took_ms = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(f"Search matched {total} highlights in {took_ms}ms")
+
+        return create_response(
+            code=200,
+            message="Search results",
+            data=results,
+            meta={"total": total, "limit": limit, "offset": offset, "took_ms": took_ms}
+        )
+
+    async def register_sync(self, encrypted: str, email: str, password: str, interval: int = None, cron: str = None):
+        logger.info("Sync registration request received")
+
+        params, error_response = self._resolve_request(encrypted, email, password)
+        if error_response is not None:
+            return error_response
+
+        try:
+            schedule = Schedule(interval=interval, cron=cron)
+            # A valid cron can still never fire (e.g. February 31st)
+            schedule.next_after(time.time())
+        except ValueError as e:
+            logger.warning(f"Invalid sync schedule: {e}")
+            return create_response(code=400, message=f"Invalid schedule: {e}", data=None)
+
+        if interval is not None and interval < self.sync_scheduler.min_interval:
+            return create_response(
+                code=400,
+                message=f"Param 'interval' must be at least {self.sync_scheduler.min_interval} seconds",
+                data=None
+            )
+
+        if cron is not None and schedule.min_gap() < self.sync_scheduler.min_interval:
+            return create_response(
+                code=400,
+                message=f"Param 'cron' must not run more often than every {self.sync_scheduler.min_interval} seconds",
+                data=None
+            )
+
+        key = account_key(params["email"])
+        request_key = await asyncio.to_thread(credential_key, params["email"], params["password"])
+        existing = await asyncio.to_thread(self.highlight_store_service.get_sync_account, key)
+        # Registration checks no password, so a registration only blocks others once its credentials have signed in;
+        # until then whoever registers with credentials that do sign in can replace it
+        if existing is not None and not hmac.compare_digest(existing["credential_key"], request_key) and await self._signed_in(key, existing["credential_key"]):
+            return create_response(
+                code=409,
+                message="Account is already registered with other credentials; DELETE /kindle/sync with them first",
+                data=None
+            )
+
+        try:
+            status = await asyncio.to_thread(
+                self.sync_scheduler.register, key, request_key, params["email"], params["password"], schedule
+            )
+        except ValueError as e:
+            logger.error(f"Cannot seal credentials for scheduled sync: {e}")
+            return create_response(code=503, message="Scheduled sync requires PRIVATE_KEY to be configured", data=None)
+
+        return create_response(
+            code=201 if existing is None else 200,
+            message="Account registered for scheduled sync",
+            data=status
+        )
+
+    async def get_sync(self, encrypted: str, email: str, password: str):
+        params, error_response = self._resolve_request(encrypted, email, password)
+        if error_response is not None:
+            return error_response
+
+        key, account = await self._verified_sync_account(params)
+        if account is None:
+            return create_response(code=404, message="Account is not registered for scheduled sync", data=None)
+
+        return create_response(
+            code=200,
+            message="Scheduled sync status",
+            data=await asyncio.to_thread(self.sync_scheduler.status, key)
+        )
+
+    async def delete_sync(self, encrypted: str, email: str, password: str):
+        params, error_response = self._resolve_request(encrypted, email, password)
+        if error_response is not None:
+            return error_response
+
+        key, account = await self._verified_sync_account(params)
+        if account is None:
+            return create_response(code=404, message="Account is not registered for scheduled sync", data=None)
+
+        await asyncio.to_thread(self.sync_scheduler.unregister, key)
+        return create_response(code=200, message="Account removed from scheduled sync", data=None)
+
+    async def create_job(
+        self,
+        encrypted: str,
+        email: str,
+        password: str,
+        headless: str = None,
+        manual_puzzle: str = None,
+        incremental: str = None,
+        webhook_url: str = None,
+        concurrency: int = None,
+        extraction: str = None,
+        humanization: str = None,
+        asin: str = None,
+        title: str = None,
+        annotated_since: str = None,
+        limit: int = None,
+        offset: int = None,
+        fields: str = None,
+        resume_token: str = None
+    ):
+        logger.info("Highlights job request received")
+
+        book_filter, error_response = self._resolve_book_filter(asin, title, annotated_since, limit, offset, fields)
+        if error_response is not None:
+            return error_response
+
+        params, error_response = self._resolve_request(encrypted, email, password, headless, manual_puzzle, incremental, concurrency, extraction, humanization)
+        if error_response is not None:
+            return error_response
+        params["book_filter"] = book_filter
+        params["resume_token"], error_response = await self._resolve_resume_token(params, resume_token)
+        if error_response is not None:
+            return error_response
+        params["request_key"] = await asyncio.to_thread(credential_key, params["email"], params["password"])
+
+        if webhook_url:
+            try:
+                await asyncio.to_thread(self.job_service.check_webhook_url, webhook_url)
+            except ValueError as e:
+                logger.warning(f"Invalid 'webhook_url' parameter: {e}")
+                return create_response(
+                    code=400,
+                    message=f"Param 'webhook_url' is not allowed: {e}",
+                    data=None
+                )
+
+        try:
+            job = self.job_service.submit(params, webhook_url)
+        except JobQueueFullError as e:
+            logger.warning(str(e))
+            return create_response(
+                code=429,
+                message="Too many jobs queued. Please try again later.",
+                data=None,
+                headers={"Retry-After": str(self.job_service.retry_after())}
+            )
+
+        return create_response(
+            code=202,
+            message="Job queued",
+            data=job.to_dict(include_result=False)
+        )
+
+    async def get_job(self, job_id: str, export_format: str = None):
+        export_format, error_response = self._resolve_format(export_format)
+        if error_response is not None:
+            return error_response
+
+        job = self.job_service.get(job_id)
+        if job is None:
+            return create_response(
+                code=404,
+                message="Job not found or expired",
+                data=None
+            )
+
+        if export_format != "json" and job.status == "completed":
+            return create_export_response(job.result, export_format, filename=f"highlights-{job.id}")
+
+        return create_response(
+            code=200,
+            message=f"Job {job.status}",
+            data=job.to_dict()
+        )
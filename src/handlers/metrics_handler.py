@@ -0,0 +1,16 @@
+from fastapi.responses import PlainTextResponse
+from src.utils.metrics import REGISTRY
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MetricsHandler:
+    def __init__(self):
+        pass
+
+    def metrics(self):
+        logger.debug("Handling metrics request")
+        return PlainTextResponse(
+            content=REGISTRY.render(),
+            media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
@@ -1,5 +1,6 @@
+from dataclasses import dataclass, field
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 class HighlightItem(BaseModel):
     text: str
@@ -8,8 +9,51 @@ class HighlightItem(BaseModel):
     page: Optional[int] = None
 
 class Highlight(BaseModel):
+    book_id: Optional[str] = None
     book_title: str
     book_author: List[str]
     book_cover: Optional[str] = None
     highlights: List[HighlightItem]
     date: Optional[str] = None
+
+class HighlightsResponse(BaseModel):
+    """Documented shape of a /kindle/highlights response (OpenAPI only, not used to validate)"""
+    code: int
+    message: str
+    data: Optional[List[Highlight]] = None
+    meta: Optional[Dict[str, Any]] = None
+
+
+# Internal representation used while scraping. Same fields and order as the pydantic
+# models above, but without validation, so building and encoding thousands of highlights
+# stays cheap; orjson encodes these dataclasses directly.
+
+@dataclass(slots=True)
+class HighlightRecord:
+    text: str
+    note: Optional[str] = None
+    type: Optional[str] = None
+    page: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"text": self.text, "note": self.note, "type": self.type, "page": self.page}
+
+@dataclass(slots=True, kw_only=True)
+class BookRecord:
+    book_id: Optional[str] = None
+    book_title: str
+    book_author: List[str]
+    book_cover: Optional[str] = None
+    highlights: List[HighlightRecord] = field(default_factory=list)
+    date: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict in the Highlight.model_dump() shape"""
+        return {
+            "book_id": self.book_id,
+            "book_title": self.book_title,
+            "book_author": self.book_author,
+            "book_cover": self.book_cover,
+            "highlights": [item.to_dict() for item in self.highlights],
+            "date": self.date,
+        }
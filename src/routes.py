@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Header, Query
 from src.handlers.kindle_handler import KindleHandler
 from src.handlers.ping_handler import PingHandler
+from src.handlers.metrics_handler import MetricsHandler
+from src.models.kindle_models import HighlightsResponse
 import logging
 
 router = APIRouter()
@@ -8,16 +10,119 @@ logger = logging.getLogger(__name__)
 
 kindle_handler = KindleHandler()
 
-@router.get("/kindle/highlights")
-def get_kindle_highlights(
+@router.get("/kindle/highlights", responses={200: {"model": HighlightsResponse}})
+async def get_kindle_highlights(
     encrypted: str = Query(None, description="Use secure endpoint with encrypted credentials"),
     email: str = Query(None, description="Amazon account email"),
     password: str = Query(None, description="Amazon account password"),
     headless: str = Query(None, description="Run browser in headless mode"),
-    manual_puzzle: str = Query(None, description="Enable manual puzzle solving")
+    manual_puzzle: str = Query(None, description="Enable manual puzzle solving"),
+    incremental: str = Query(None, description="Only return books whose annotations changed since the last sync"),
+    stream: str = Query(None, description="Stream each book as soon as it is parsed: 'ndjson' or 'sse'"),
+    concurrency: int = Query(None, description="Number of notebook pages used to open books in parallel"),
+    extraction: str = Query(None, description="How annotations are read: 'dom' (rendered page) or 'network' (notebook responses)"),
+    humanization: str = Query(None, description="Humanization profile: 'paranoid', 'normal', 'fast' or 'none'"),
+    force_refresh: str = Query(None, description="Scrape again even if a cached result is available"),
+    if_none_match: str = Header(None, description="ETag of a result the client already has"),
+    format: str = Query(None, description="Response format: 'json', 'csv', 'arrow' or 'parquet'"),
+    source: str = Query(None, description="'live' scrapes now; 'store' reads the last scheduled sync"),
+    asin: str = Query(None, description="Only these books (comma-separated ASINs)"),
+    title: str = Query(None, description="Only books whose title contains this text (case-insensitive)"),
+    annotated_since: str = Query(None, description="Only books annotated on or after this date (YYYY-MM-DD)"),
+    limit: int = Query(None, description="Maximum number of books, in library order"),
+    offset: int = Query(None, description="Matching books to skip"),
+    fields: str = Query(None, description="Fields to return ('book_title,text') or to drop ('-book_cover,-note')"),
+    resume_token: str = Query(None, description="Continue a partial scrape from meta.resume_token, or 'latest' for the account's last unfinished one")
 ):
-    return kindle_handler.get_highlights(encrypted, email, password, headless, manual_puzzle)
+    return await kindle_handler.get_highlights(
+        encrypted, email, password, headless, manual_puzzle, incremental, stream, concurrency, extraction, humanization, force_refresh, if_none_match, format, source,
+        asin, title, annotated_since, limit, offset, fields, resume_token
+    )
+
+@router.post("/kindle/jobs")
+async def create_kindle_job(
+    encrypted: str = Query(None, description="Use secure endpoint with encrypted credentials"),
+    email: str = Query(None, description="Amazon account email"),
+    password: str = Query(None, description="Amazon account password"),
+    headless: str = Query(None, description="Run browser in headless mode"),
+    manual_puzzle: str = Query(None, description="Enable manual puzzle solving"),
+    incremental: str = Query(None, description="Only return books whose annotations changed since the last sync"),
+    webhook_url: str = Query(None, description="URL that receives a POST with the job when it finishes"),
+    concurrency: int = Query(None, description="Number of notebook pages used to open books in parallel"),
+    extraction: str = Query(None, description="How annotations are read: 'dom' (rendered page) or 'network' (notebook responses)"),
+    humanization: str = Query(None, description="Humanization profile: 'paranoid', 'normal', 'fast' or 'none'"),
+    asin: str = Query(None, description="Only these books (comma-separated ASINs)"),
+    title: str = Query(None, description="Only books whose title contains this text (case-insensitive)"),
+    annotated_since: str = Query(None, description="Only books annotated on or after this date (YYYY-MM-DD)"),
+    limit: int = Query(None, description="Maximum number of books, in library order"),
+    offset: int = Query(None, description="Matching books to skip"),
+    fields: str = Query(None, description="Fields to return ('book_title,text') or to drop ('-book_cover,-note')"),
+    resume_token: str = Query(None, description="Continue a partial scrape from meta.resume_token, or 'latest' for the account's last unfinished one")
+):
+    return await kindle_handler.create_job(
+        encrypted, email, password, headless, manual_puzzle, incremental, webhook_url, concurrency, extraction, humanization,
+        asin, title, annotated_since, limit, offset, fields, resume_token
+    )
+
+@router.get("/kindle/jobs/{job_id}")
+async def get_kindle_job(
+    job_id: str,
+    format: str = Query(None, description="Format of a completed job's result: 'json', 'csv', 'arrow' or 'parquet'")
+):
+    return await kindle_handler.get_job(job_id, format)
+
+@router.get("/kindle/search")
+async def search_kindle_highlights(
+    encrypted: str = Query(None, description="Use secure endpoint with encrypted credentials"),
+    email: str = Query(None, description="Amazon account email"),
+    password: str = Query(None, description="Amazon account password"),
+    q: str = Query(None, description="Words or \"quoted phrases\" that must all match; word* matches a prefix"),
+    asin: str = Query(None, description="Only search these books (comma-separated ASINs)"),
+    page_from: int = Query(None, description="Lowest highlight location/page"),
+    page_to: int = Query(None, description="Highest highlight location/page"),
+    limit: int = Query(None, description="Results per page (default 20)"),
+    offset: int = Query(None, description="Results to skip")
+):
+    return await kindle_handler.search_highlights(encrypted, email, password, q, asin, page_from, page_to, limit, offset)
+
+@router.post("/kindle/sync")
+async def register_kindle_sync(
+    encrypted: str = Query(None, description="Use secure endpoint with encrypted credentials"),
+    email: str = Query(None, description="Amazon account email"),
+    password: str = Query(None, description="Amazon account password"),
+    interval: int = Query(None, description="Sync every this many seconds"),
+    cron: str = Query(None, description="Sync when this 5-field cron expression matches (UTC)")
+):
+    return await kindle_handler.register_sync(encrypted, email, password, interval, cron)
+
+@router.get("/kindle/sync")
+async def get_kindle_sync(
+    encrypted: str = Query(None, description="Use secure endpoint with encrypted credentials"),
+    email: str = Query(None, description="Amazon account email"),
+    password: str = Query(None, description="Amazon account password")
+):
+    return await kindle_handler.get_sync(encrypted, email, password)
+
+@router.delete("/kindle/sync")
+async def delete_kindle_sync(
+    encrypted: str = Query(None, description="Use secure endpoint with encrypted credentials"),
+    email: str = Query(None, description="Amazon account email"),
+    password: str = Query(None, description="Amazon account password")
+):
+    return await kindle_handler.delete_sync(encrypted, email, password)
+
+@router.get("/kindle/pool")
+def get_kindle_pool_stats():
+    return kindle_handler.get_pool_stats()
+
+@router.get("/kindle/admission")
+def get_kindle_admission_stats():
+    return kindle_handler.get_admission_stats()
 
 @router.get("/ping")
 def ping():
     return PingHandler().ping()
+
+@router.get("/metrics")
+def metrics():
+    return MetricsHandler().metrics()
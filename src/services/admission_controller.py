@@ -0,0 +1,254 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from src.utils import metrics
+from src.utils.account import account_key
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a scrape is not admitted; carries the HTTP status and Retry-After seconds"""
+
+    def __init__(self, reason: str, status_code: int, retry_after: int, message: str):
+        super().__init__(message)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def available_memory_mb() -> Optional[float]:
+    """MemAvailable from /proc/meminfo, falling back to free physical pages, or None if unknown"""
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def take(self) -> float:
+        """Take a token; return 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.refill_per_second
+
+    def full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class AdmissionController:
+    """Admission control in front of the scraper: how many browser scrapes run at once and in which order.
+
+    The global cap is derived from CPU count and available memory (or set explicitly) and
+    is never above the browser pool size. Each account has a token bucket limiting how
+    often it may start scrapes. When every slot is busy, requests wait in a weighted fair
+    queue: each gets a virtual finish tag of max(virtual time, the tenant's last tag) +
+    1/weight, and the lowest tag runs next, so a tenant with many queued requests cannot
+    starve the others.
+    """
+
+    def __init__(self, ceiling: Optional[int] = None):
+        self.memory_per_scrape_mb = float(os.getenv("ADMISSION_MEMORY_PER_SCRAPE_MB", "512"))
+        self.min_available_mb = float(os.getenv("ADMISSION_MIN_AVAILABLE_MB", "256"))
+        self.scrapes_per_cpu = float(os.getenv("ADMISSION_SCRAPES_PER_CPU", "1"))
+        self.max_queue = int(os.getenv("ADMISSION_MAX_QUEUE", "50"))
+        self.queue_timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "120"))
+        self.account_burst = float(os.getenv("ADMISSION_ACCOUNT_BURST", "5"))
+        self.account_rate = float(os.getenv("ADMISSION_ACCOUNT_RATE_PER_MINUTE", "6")) / 60
+        self.weights = self._parse_weights(os.getenv("ADMISSION_TENANT_WEIGHTS", ""))
+        self.capacity = self._capacity(ceiling)
+
+        self._active = 0
+        self._queued = 0
+        self._heap: List[Tuple[float, int, str, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._tenant_tags: Dict[str, float] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._average_hold = 60.0
+        self._admitted_total = 0
+        self._rejected: Dict[str, int] = {}
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        logger.info(
+            f"AdmissionController configured with capacity={self.capacity}, max_queue={self.max_queue}, "
+            f"account_burst={self.account_burst}, account_rate={self.account_rate * 60}/min"
+        )
+
+    @staticmethod
+    def _parse_weights(raw: str) -> Dict[str, float]:
+        """Parse "email=weight,email=weight" into weights keyed by account hash"""
+        weights = {}
+        for entry in raw.split(","):
+            email, _, weight = entry.strip().rpartition("=")
+            if email and weight:
+                weights[account_key(email)] = float(weight)
+        return weights
+
+    def _capacity(self, ceiling: Optional[int]) -> int:
+        configured = os.getenv("ADMISSION_MAX_CONCURRENT")
+        if configured:
+            return max(1, int(configured))
+
+        limits = [max(1, int((os.cpu_count() or 1) * self.scrapes_per_cpu))]
+        memory = available_memory_mb()
+        if memory is not None and self.memory_per_scrape_mb > 0:
+            limits.append(max(1, int((memory - self.min_available_mb) // self.memory_per_scrape_mb)))
+        if ceiling:
+            limits.append(ceiling)
+        return min(limits)
+
+    def _reject(self, reason: str, status_code: int, retry_after: float, message: str) -> AdmissionRejectedError:
+        self._rejected[reason] = self._rejected.get(reason, 0) + 1
+        metrics.ADMISSION_REJECTIONS.inc(reason=reason)
+        logger.warning(f"Scrape not admitted ({reason}): {message}")
+        return AdmissionRejectedError(reason, status_code, max(1, math.ceil(retry_after)), message)
+
+    def _estimated_wait(self) -> float:
+        return self._average_hold * (self._queued + 1) / self.capacity
+
+    def _take_token(self, tenant: str) -> float:
+        if self.account_rate <= 0:
+            return 0.0
+        bucket = self._buckets.get(tenant)
+        if bucket is None:
+            if len(self._buckets) > 1024:
+                self._buckets = {key: b for key, b in self._buckets.items() if not b.full()}
+            bucket = self._buckets[tenant] = TokenBucket(self.account_burst, self.account_rate)
+        return bucket.take()
+
+    def _tag(self, tenant: str) -> Tuple[float, float]:
+        """Virtual (start, finish) tags of a new request from the tenant"""
+        start = max(self._virtual_time, self._tenant_tags.get(tenant, 0.0))
+        finish = start + 1 / self.weights.get(tenant, 1.0)
+        self._tenant_tags[tenant] = finish
+        return start, finish
+
+    def _dispatch(self):
+        while self._active < self.capacity and self._heap:
+            finish, _, tenant, future = heapq.heappop(self._heap)
+            if future.done():
+                continue
+            self._virtual_time = max(self._virtual_time, finish - 1 / self.weights.get(tenant, 1.0))
+            self._queued -= 1
+            self._active += 1
+            future.set_result(None)
+        if not self._heap and self._active == 0:
+            self._virtual_time = 0.0
+            self._tenant_tags.clear()
+
+    def check(self, email: str, take_token: bool = True):
+        """Reject a scrape that cannot be admitted right now, without waiting for a slot
+
+        Takes the account's rate limit token, so a later acquire(email, checked=True) must not take it again.
+        Raises:
+            AdmissionRejectedError: Rate limited (429), or out of memory or queue full (503)
+        """
+        memory = available_memory_mb()
+        if memory is not None and memory < self.min_available_mb:
+            raise self._reject("low_memory", 503, 30, f"Only {memory:.0f} MB of memory available")
+
+        if self._active >= self.capacity and self._queued >= self.max_queue:
+            raise self._reject("queue_full", 503, self._estimated_wait(), f"Admission queue is full ({self._queued} waiting)")
+
+        if take_token:
+            wait = self._take_token(account_key(email))
+            if wait > 0:
+                raise self._reject("rate_limited", 429, wait, "Too many scrapes for this account")
+
+    async def acquire(self, email: str, checked: bool = False):
+        """Wait for a scrape slot
+        Args:
+            checked: check(email) already ran for this scrape, so its rate limit token is not taken again
+        Raises:
+            AdmissionRejectedError: Rate limited (429), or out of memory, queue full or waited too long (503)
+        """
+        tenant = account_key(email)
+        self.check(email, take_token=not checked)
+
+        start, finish = self._tag(tenant)
+        if self._active < self.capacity and not self._heap:
+            self._virtual_time = start
+            self._active += 1
+            self._admitted(0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (finish, next(self._sequence), tenant, future))
+        self._queued += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._queued -= 1
+            raise self._reject("queue_timeout", 503, self._estimated_wait(), f"Waited {self.queue_timeout:g}s for a scrape slot")
+        except BaseException:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                self._queued -= 1
+            raise
+        self._admitted(time.monotonic() - started)
+
+    def _admitted(self, waited: float):
+        self._admitted_total += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+        metrics.ADMISSION_WAIT.observe(waited)
+
+    def release(self, held: Optional[float] = None):
+        if held is not None:
+            self._average_hold = 0.8 * self._average_hold + 0.2 * held
+        self._active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, email: str, checked: bool = False) -> AsyncIterator[None]:
+        """Hold a scrape slot for the duration of the block"""
+        await self.acquire(email, checked)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "active": self._active,
+            "queued": self._queued,
+            "queue_max": self.max_queue,
+            "tenants_queued": len({tenant for _, _, tenant, future in self._heap if not future.done()}),
+            "admitted_total": self._admitted_total,
+            "rejected": dict(self._rejected),
+            "wait_seconds_avg": round(self._wait_seconds_total / self._admitted_total, 3) if self._admitted_total else 0.0,
+            "wait_seconds_max": round(self._wait_seconds_max, 3),
+            "average_scrape_seconds": round(self._average_hold, 3),
+        }
@@ -0,0 +1,219 @@
+from playwright.async_api import async_playwright
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+from src.utils import metrics
+import asyncio
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPoolTimeoutError(Exception):
+    """Raised when no pooled browser becomes available within the acquire timeout"""
+
+
+class BrowserSlot:
+    """A pooled Chromium instance and its usage counters"""
+
+    def __init__(self, slot_id: int):
+        self.slot_id = slot_id
+        self.browser = None
+        self.headless: Optional[bool] = None
+        self.uses = 0
+        self.launches = 0
+        self.launched_at: Optional[float] = None
+
+    async def launch(self, playwright, headless: bool):
+        logger.debug(f"Slot {self.slot_id}: launching browser (headless={headless})")
+        started = time.perf_counter()
+        self.browser = await playwright.chromium.launch(headless=headless)
+        metrics.PHASE_DURATION.observe(time.perf_counter() - started, phase="launch")
+        self.headless = headless
+        self.uses = 0
+        self.launches += 1
+        self.launched_at = time.monotonic()
+
+    async def close_browser(self):
+        """Close the current browser, ignoring errors from an already dead process"""
+        if self.browser is not None:
+            try:
+                await self.browser.close()
+            except Exception as e:
+                logger.debug(f"Slot {self.slot_id}: error closing browser: {e}")
+        self.browser = None
+        self.headless = None
+        self.launched_at = None
+
+    def needs_recycle(self, max_uses: int, max_age: float) -> Optional[str]:
+        """Return the reason this browser should be replaced, or None if it is healthy"""
+        if self.browser is None:
+            return None
+        if not self.browser.is_connected():
+            return "disconnected"
+        if max_uses and self.uses >= max_uses:
+            return f"reached {self.uses} uses"
+        if max_age and self.launched_at and time.monotonic() - self.launched_at >= max_age:
+            return "exceeded max age"
+        return None
+
+
+class BrowserPool:
+    """Long-lived pool of warm Chromium browsers handing out isolated contexts per request"""
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_uses: Optional[int] = None,
+        max_age: Optional[float] = None,
+        acquire_timeout: Optional[float] = None,
+    ):
+        self.size = size or int(os.getenv("BROWSER_POOL_SIZE", "2"))
+        self.max_uses = max_uses if max_uses is not None else int(os.getenv("BROWSER_MAX_USES", "50"))
+        self.max_age = max_age if max_age is not None else float(os.getenv("BROWSER_MAX_AGE_SECONDS", "1800"))
+        self.acquire_timeout = acquire_timeout if acquire_timeout is not None else float(os.getenv("BROWSER_ACQUIRE_TIMEOUT", "120"))
+
+        self._playwright = None
+        self._slots: List[BrowserSlot] = []
+        self._idle: List[BrowserSlot] = []
+        self._condition = asyncio.Condition()
+        self._waiting = 0
+        self._peak_in_use = 0
+        self._acquired_total = 0
+        self._timeouts_total = 0
+        self._recycled_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        logger.info(f"BrowserPool configured with size={self.size}, max_uses={self.max_uses}, max_age={self.max_age}s")
+
+    async def start(self, warm: Optional[bool] = None):
+        """Start Playwright, create the pool slots and optionally pre-launch headless browsers"""
+        if self._playwright is not None:
+            return
+        self._playwright = await async_playwright().start()
+        self._slots = [BrowserSlot(i) for i in range(self.size)]
+        self._idle = list(self._slots)
+
+        if warm is None:
+            warm = os.getenv("BROWSER_POOL_WARM", "True") == "True"
+        if not warm:
+            return
+
+        logger.info(f"Warming up {self.size} browsers")
+        results = await asyncio.gather(
+            *(slot.launch(self._playwright, True) for slot in self._slots),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error warming up browser: {result}")
+
+    async def stop(self):
+        """Close every browser and stop Playwright"""
+        slots = self._slots
+        self._slots = []
+        self._idle = []
+        await asyncio.gather(*(slot.close_browser() for slot in slots))
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        logger.info("BrowserPool stopped")
+
+    async def _acquire(self, headless: bool) -> BrowserSlot:
+        started = time.monotonic()
+        async with self._condition:
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: bool(self._idle)),
+                    timeout=self.acquire_timeout
+                )
+            except asyncio.TimeoutError:
+                self._timeouts_total += 1
+                metrics.POOL_TIMEOUTS.inc()
+                raise BrowserPoolTimeoutError(f"No browser available after {self.acquire_timeout}s")
+            finally:
+                self._waiting -= 1
+
+            # Prefer a browser already launched in the requested mode
+            slot = next((s for s in self._idle if s.headless == headless), self._idle[0])
+            self._idle.remove(slot)
+
+            waited = time.monotonic() - started
+            self._acquired_total += 1
+            self._wait_seconds_total += waited
+            self._wait_seconds_max = max(self._wait_seconds_max, waited)
+            metrics.POOL_WAIT.observe(waited)
+            self._peak_in_use = max(self._peak_in_use, len(self._slots) - len(self._idle))
+
+        if waited > 1:
+            logger.info(f"Waited {waited:.2f}s for a pooled browser")
+        return slot
+
+    async def _release(self, slot: BrowserSlot):
+        async with self._condition:
+            if slot in self._slots:
+                self._idle.append(slot)
+            self._condition.notify()
+
+    async def _prepare(self, slot: BrowserSlot, headless: bool):
+        """Health-check the slot's browser and (re)launch it in the requested mode"""
+        reason = slot.needs_recycle(self.max_uses, self.max_age)
+        if reason:
+            logger.info(f"Recycling browser in slot {slot.slot_id}: {reason}")
+            await slot.close_browser()
+            self._recycled_total += 1
+        elif slot.browser is not None and slot.headless != headless:
+            logger.debug(f"Relaunching browser in slot {slot.slot_id} with headless={headless}")
+            await slot.close_browser()
+
+        if slot.browser is None:
+            await slot.launch(self._playwright, headless)
+
+    @asynccontextmanager
+    async def context(self, headless: bool, **context_options) -> AsyncIterator[Any]:
+        """Yield an isolated BrowserContext from a pooled browser.
+
+        Args:
+            headless: Whether the browser should run headless
+            context_options: Extra options for new_context, e.g. storage_state
+        Yields:
+            A fresh BrowserContext that is closed when the block exits.
+        """
+        if self._playwright is None:
+            await self.start(warm=False)
+
+        slot = await self._acquire(headless)
+        try:
+            await self._prepare(slot, headless)
+            context = await slot.browser.new_context(**context_options)
+            slot.uses += 1
+            try:
+                yield context
+            finally:
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.debug(f"Slot {slot.slot_id}: error closing context: {e}")
+        finally:
+            await self._release(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool saturation metrics"""
+        size = len(self._slots)
+        in_use = size - len(self._idle)
+        return {
+            "size": size,
+            "in_use": in_use,
+            "idle": len(self._idle),
+            "waiting": self._waiting,
+            "saturation": round(in_use / size, 3) if size else 0.0,
+            "peak_in_use": self._peak_in_use,
+            "acquired_total": self._acquired_total,
+            "timeouts_total": self._timeouts_total,
+            "recycled_total": self._recycled_total,
+            "launches_total": sum(slot.launches for slot in self._slots),
+            "wait_seconds_avg": round(self._wait_seconds_total / self._acquired_total, 3) if self._acquired_total else 0.0,
+            "wait_seconds_max": round(self._wait_seconds_max, 3),
+        }
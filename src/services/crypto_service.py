@@ -1,70 +1,165 @@
 import base64
+import hashlib
 import os
+import threading
+import time
 import logging
+from collections import OrderedDict
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.exceptions import InvalidSignature
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+from src.utils import metrics
 
 logger = logging.getLogger(__name__)
 
+OAEP_PADDING = padding.OAEP(
+    mgf=padding.MGF1(algorithm=hashes.SHA256()),
+    algorithm=hashes.SHA256(),
+    label=None
+)
+
+# Hybrid envelope: "v1.<base64 RSA-OAEP wrapped AES-256 key>.<base64 nonce + AES-GCM ciphertext>".
+# Legacy payloads are a single base64 RSA-OAEP block, which never contains a ".".
+ENVELOPE_VERSION = "v1"
+ENVELOPE_AAD = b"paper-orbit-credentials-v1"
+
+
+def build_envelope(public_key, payload: Dict[str, Any]) -> str:
+    """Encrypt a JSON payload of any size into a v1 hybrid envelope"""
+    data_key = AESGCM.generate_key(bit_length=256)
+    nonce = os.urandom(12)
+    ciphertext = AESGCM(data_key).encrypt(nonce, json.dumps(payload).encode("utf-8"), ENVELOPE_AAD)
+    wrapped_key = public_key.encrypt(data_key, OAEP_PADDING)
+    return ".".join([
+        ENVELOPE_VERSION,
+        base64.b64encode(wrapped_key).decode("utf-8"),
+        base64.b64encode(nonce + ciphertext).decode("utf-8"),
+    ])
+
+
 class CryptoService:
-    def __init__(self):
-        self.private_key = self._load_private_key()
-    
+    """Decrypts client credentials with the service's RSA private key.
+
+    Accepts both the legacy single RSA block and the v1 hybrid envelope, whose AES-GCM
+    body can carry more than an RSA block fits (e.g. request options). The private key
+    is loaded on first use, and decrypted payloads are cached by ciphertext hash for a
+    short TTL so repeat callers skip the RSA operation.
+    """
+
+    def __init__(self, cache_ttl: Optional[float] = None, cache_max_entries: Optional[int] = None):
+        self.cache_ttl = cache_ttl if cache_ttl is not None else float(os.getenv("CREDENTIAL_CACHE_TTL_SECONDS", "300"))
+        self.cache_max_entries = cache_max_entries if cache_max_entries is not None else int(os.getenv("CREDENTIAL_CACHE_MAX_ENTRIES", "256"))
+        self._private_key = None
+        self._key_lock = threading.Lock()
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @property
+    def private_key(self):
+        if self._private_key is None:
+            with self._key_lock:
+                if self._private_key is None:
+                    self._private_key = self._load_private_key()
+        return self._private_key
+
     def _load_private_key(self):
         try:
             private_key_b64 = os.getenv('PRIVATE_KEY')
             if not private_key_b64:
                 raise ValueError("PRIVATE_KEY not found in environment variables")
-            
+
             private_key_pem = base64.b64decode(private_key_b64)
-            
+
             private_key = serialization.load_pem_private_key(
                 private_key_pem,
                 password=None,
             )
-            
+
             logger.info("RSA private key loaded successfully")
             return private_key
-            
+
         except Exception as e:
             logger.error(f"Error loading private key: {e}")
             raise
-    
-    def decrypt_credentials(self, encrypted_data: str) -> Dict[str, str]:
+
+    def _cache_get(self, digest: str) -> Optional[Dict[str, Any]]:
+        if self.cache_ttl <= 0:
+            return None
+        with self._cache_lock:
+            cached = self._cache.get(digest)
+            if cached is None:
+                return None
+            if time.monotonic() - cached[0] > self.cache_ttl:
+                del self._cache[digest]
+                return None
+            self._cache.move_to_end(digest)
+            return dict(cached[1])
+
+    def _cache_set(self, digest: str, credentials: Dict[str, Any]):
+        if self.cache_ttl <= 0:
+            return
+        with self._cache_lock:
+            self._cache[digest] = (time.monotonic(), dict(credentials))
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def _decrypt_legacy(self, encrypted_data: str) -> bytes:
+        return self.private_key.decrypt(base64.b64decode(encrypted_data), OAEP_PADDING)
+
+    def _decrypt_envelope(self, encrypted_data: str) -> bytes:
+        version, wrapped_key_b64, body_b64 = encrypted_data.split(".")
+        if version != ENVELOPE_VERSION:
+            raise ValueError(f"Unsupported envelope version: {version}")
+
+        data_key = self.private_key.decrypt(base64.b64decode(wrapped_key_b64), OAEP_PADDING)
+        body = base64.b64decode(body_b64)
+        return AESGCM(data_key).decrypt(body[:12], body[12:], ENVELOPE_AAD)
+
+    def encrypt_credentials(self, credentials: Dict[str, Any]) -> str:
+        """Seal credentials into a v1 envelope that only this service can open"""
+        return build_envelope(self.private_key.public_key(), credentials)
+
+    def decrypt_credentials(self, encrypted_data: str) -> Dict[str, Any]:
         try:
-            logger.info(f"Starting data decryption: {encrypted_data}")
-
-            encrypted_bytes = base64.b64decode(encrypted_data)
-            
-            decrypted_bytes = self.private_key.decrypt(
-                encrypted_bytes,
-                padding.OAEP(
-                    mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                    algorithm=hashes.SHA256(),
-                    label=None
-                )
-            )
-            
+            digest = hashlib.sha256(encrypted_data.encode("utf-8")).hexdigest()
+            cached = self._cache_get(digest)
+            if cached is not None:
+                metrics.CREDENTIAL_CACHE.inc(result="hit")
+                logger.info("Credentials served from decryption cache")
+                return cached
+            metrics.CREDENTIAL_CACHE.inc(result="miss")
+
+            logger.info(f"Starting data decryption: {encrypted_data[:20]}...")
+
+            if "." in encrypted_data:
+                decrypted_bytes = self._decrypt_envelope(encrypted_data)
+            else:
+                decrypted_bytes = self._decrypt_legacy(encrypted_data)
+
             decrypted_str = decrypted_bytes.decode('utf-8')
             credentials = json.loads(decrypted_str)
-            
+
             logger.info("Credentials decrypted successfully")
-            
+
             if 'email' not in credentials or 'password' not in credentials:
                 raise ValueError("Decrypted data does not contain email and password")
-            
+
+            self._cache_set(digest, credentials)
             return credentials
-            
+
         except Exception as e:
             logger.error(f"Error decrypting credentials: {e}")
             raise ValueError(f"Decryption failed: {str(e)}")
-    
+
     def is_encrypted_format(self, data: str) -> bool:
         try:
+            if data.startswith(f"{ENVELOPE_VERSION}."):
+                return True
             base64.b64decode(data)
             return len(data) > 100
         except:
-            return False
\ No newline at end of file
+            return False
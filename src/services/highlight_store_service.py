@@ -0,0 +1,473 @@
+import hmac
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from src.models.kindle_models import BookRecord, HighlightRecord
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    account_key TEXT NOT NULL,
+    asin TEXT NOT NULL,
+    title TEXT NOT NULL,
+    authors TEXT NOT NULL,
+    cover TEXT,
+    date TEXT,
+    annotated_date TEXT,
+    fingerprint TEXT,
+    highlight_count INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (account_key, asin)
+);
+CREATE TABLE IF NOT EXISTS highlights (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account_key TEXT NOT NULL,
+    asin TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    note TEXT,
+    type TEXT,
+    page INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_highlights_book ON highlights (account_key, asin, position);
+CREATE TABLE IF NOT EXISTS sync_accounts (
+    account_key TEXT PRIMARY KEY,
+    credential_key TEXT NOT NULL,
+    envelope TEXT NOT NULL,
+    schedule TEXT NOT NULL,
+    next_run_at REAL NOT NULL,
+    last_run_at REAL,
+    last_status TEXT,
+    last_error TEXT,
+    last_duration REAL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS account_logins (
+    account_key TEXT PRIMARY KEY,
+    credential_key TEXT NOT NULL,
+    logged_in_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scrape_runs (
+    token TEXT PRIMARY KEY,
+    account_key TEXT NOT NULL,
+    options TEXT NOT NULL DEFAULT '',
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scrape_runs_account ON scrape_runs (account_key, updated_at);
+CREATE TABLE IF NOT EXISTS scrape_run_books (
+    token TEXT NOT NULL,
+    asin TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    error TEXT,
+    attempts INTEGER NOT NULL,
+    PRIMARY KEY (token, asin)
+);
+"""
+
+# Full-text index over highlight text, note, book title and authors, with the highlight id
+# as rowid. Triggers keep it in step with the highlights table, so every saved book is
+# indexed as it is written.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS highlights_fts USING fts5(
+    text, note, title, authors,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+CREATE TRIGGER IF NOT EXISTS highlights_fts_insert AFTER INSERT ON highlights BEGIN
+    INSERT INTO highlights_fts (rowid, text, note, title, authors)
+    SELECT new.id, new.text, new.note, b.title, b.authors
+    FROM books b WHERE b.account_key = new.account_key AND b.asin = new.asin;
+END;
+CREATE TRIGGER IF NOT EXISTS highlights_fts_delete AFTER DELETE ON highlights BEGIN
+    DELETE FROM highlights_fts WHERE rowid = old.id;
+END;
+"""
+
+# bm25 column weights: text, note, title, authors
+SEARCH_WEIGHTS = (10.0, 5.0, 2.0, 2.0)
+SEARCH_TOKEN = re.compile(r'"([^"]+)"|(\S+)')
+
+
+class HighlightStoreService:
+    """Local SQLite store of scraped books and highlights, keyed by account and book ASIN"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.getenv("HIGHLIGHT_STORE_PATH", ".cache/highlights.db")
+        self.journal_ttl = float(os.getenv("SCRAPE_JOURNAL_TTL_SECONDS", "86400"))
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._conn.executescript(SEARCH_SCHEMA)
+        self._backfill_search_index()
+        logger.info(f"HighlightStoreService initialized at {self.db_path}")
+
+    def _migrate(self):
+        """Add columns introduced after a store was created"""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(scrape_runs)")}
+        if "options" not in columns:
+            with self._conn:
+                self._conn.execute("ALTER TABLE scrape_runs ADD COLUMN options TEXT NOT NULL DEFAULT ''")
+
+    def _backfill_search_index(self):
+        """Index highlights stored before the search index existed"""
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM highlights_fts LIMIT 1").fetchone():
+                return
+            indexed = self._conn.execute(
+                """
+                INSERT INTO highlights_fts (rowid, text, note, title, authors)
+                SELECT h.id, h.text, h.note, b.title, b.authors
+                FROM highlights h JOIN books b ON b.account_key = h.account_key AND b.asin = h.asin
+                """
+            ).rowcount
+        if indexed:
+            logger.info(f"Indexed {indexed} stored highlights for search")
+
+    @staticmethod
+    def build_match_query(query: str) -> str:
+        """Turn user input into an FTS5 query: every word or "quoted phrase" must match, word* matches a prefix"""
+        terms = []
+        for phrase, word in SEARCH_TOKEN.findall(query):
+            text = phrase or word
+            prefix = not phrase and text.endswith("*")
+            text = text.rstrip("*").replace('"', '""')
+            if text:
+                terms.append(f'"{text}"' + ("*" if prefix else ""))
+        return " ".join(terms)
+
+    def search(
+        self,
+        account_key: str,
+        credential_key: str,
+        query: str,
+        asins: Optional[List[str]] = None,
+        page_from: Optional[int] = None,
+        page_to: Optional[int] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Ranked full-text search over one account's highlights, for the credentials that last signed in to it
+        Returns:
+            (total matches, one page of matches with <mark> snippets and a bm25 score)
+        """
+        terms = self.build_match_query(query)
+        if not terms:
+            return 0, []
+        # The account is filtered on the joined highlights row rather than inside MATCH:
+        # bm25 scans the whole doclist of every phrase in the query, and an account phrase
+        # would make every search pay for the size of the account.
+        conditions = ["highlights_fts MATCH ?", "h.account_key = ?"]
+        params: List[Any] = [terms, account_key]
+        if asins:
+            conditions.append(f"h.asin IN ({', '.join('?' for _ in asins)})")
+            params.extend(asins)
+        if page_from is not None:
+            conditions.append("h.page >= ?")
+            params.append(page_from)
+        if page_to is not None:
+            conditions.append("h.page <= ?")
+            params.append(page_to)
+        where = " AND ".join(conditions)
+        weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+
+        with self._lock:
+            login = self._conn.execute(
+                "SELECT credential_key FROM account_logins WHERE account_key = ?", (account_key,)
+            ).fetchone()
+            if login is None or not hmac.compare_digest(login["credential_key"], credential_key):
+                return 0, []
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM highlights_fts CROSS JOIN highlights h ON h.id = highlights_fts.rowid WHERE {where}",
+                params
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f"""
+                SELECT h.asin, b.title, b.authors, h.position, h.text, h.note, h.type, h.page,
+                       snippet(highlights_fts, 0, '<mark>', '</mark>', '…', 24) AS text_snippet,
+                       snippet(highlights_fts, 1, '<mark>', '</mark>', '…', 24) AS note_snippet,
+                       bm25(highlights_fts, {weights}) AS rank
+                FROM highlights_fts
+                CROSS JOIN highlights h ON h.id = highlights_fts.rowid
+                CROSS JOIN books b ON b.account_key = h.account_key AND b.asin = h.asin
+                WHERE {where}
+                ORDER BY rank
+                LIMIT ? OFFSET ?
+                """,
+                params + [limit, offset]
+            ).fetchall()
+
+        return total, [
+            {
+                "book_id": row["asin"],
+                "book_title": row["title"],
+                "book_author": json.loads(row["authors"]),
+                "position": row["position"],
+                "text": row["text"],
+                "note": row["note"],
+                "type": row["type"],
+                "page": row["page"],
+                "text_snippet": row["text_snippet"],
+                "note_snippet": row["note_snippet"] if row["note"] else None,
+                "score": round(-row["rank"], 4),
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def fingerprint(annotated_date: Optional[str], highlight_count: int) -> str:
+        """Per-book change marker built from the last annotated date and the highlight count"""
+        return f"{annotated_date or ''}|{highlight_count}"
+
+    def get_book_states(self, account_key: str) -> Dict[str, Dict[str, Any]]:
+        """Return the stored annotated date and fingerprint of every book, keyed by ASIN"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT asin, annotated_date, fingerprint, synced_at FROM books WHERE account_key = ?",
+                (account_key,)
+            ).fetchall()
+        return {row["asin"]: dict(row) for row in rows}
+
+    def save_book(self, account_key: str, book: BookRecord, annotated_date: Optional[str], fingerprint: Optional[str]):
+        """Replace the stored copy of a book and its highlights"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO books (account_key, asin, title, authors, cover, date, annotated_date, fingerprint, highlight_count, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (account_key, asin) DO UPDATE SET
+                    title = excluded.title,
+                    authors = excluded.authors,
+                    cover = excluded.cover,
+                    date = excluded.date,
+                    annotated_date = excluded.annotated_date,
+                    fingerprint = excluded.fingerprint,
+                    highlight_count = excluded.highlight_count,
+                    synced_at = excluded.synced_at
+                """,
+                (
+                    account_key, book.book_id, book.book_title, json.dumps(book.book_author), book.book_cover,
+                    book.date, annotated_date, fingerprint, len(book.highlights), time.time()
+                )
+            )
+            self._conn.execute(
+                "DELETE FROM highlights WHERE account_key = ? AND asin = ?",
+                (account_key, book.book_id)
+            )
+            self._conn.executemany(
+                "INSERT INTO highlights (account_key, asin, position, text, note, type, page) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (account_key, book.book_id, position, item.text, item.note, item.type, item.page)
+                    for position, item in enumerate(book.highlights)
+                ]
+            )
+
+    def delete_books(self, account_key: str, asins: Iterable[str]):
+        asins = list(asins)
+        if not asins:
+            return
+        with self._lock, self._conn:
+            for asin in asins:
+                self._conn.execute("DELETE FROM highlights WHERE account_key = ? AND asin = ?", (account_key, asin))
+                self._conn.execute("DELETE FROM books WHERE account_key = ? AND asin = ?", (account_key, asin))
+        logger.info(f"Removed {len(asins)} books no longer in the library")
+
+    def get_books(self, account_key: str, asins: Optional[Iterable[str]] = None) -> List[BookRecord]:
+        """Load stored books with their highlights, optionally limited to some ASINs"""
+        condition = "account_key = ?"
+        params: List[Any] = [account_key]
+        if asins is not None:
+            asins = list(asins)
+            if not asins:
+                return []
+            condition += f" AND asin IN ({', '.join('?' for _ in asins)})"
+            params.extend(asins)
+
+        with self._lock:
+            book_rows = self._conn.execute(f"SELECT * FROM books WHERE {condition}", params).fetchall()
+            highlight_rows = self._conn.execute(
+                f"SELECT asin, text, note, type, page FROM highlights WHERE {condition} ORDER BY asin, position",
+                params
+            ).fetchall()
+
+        items_by_book: Dict[str, List[HighlightRecord]] = {}
+        for row in highlight_rows:
+            items_by_book.setdefault(row["asin"], []).append(
+                HighlightRecord(text=row["text"], note=row["note"], type=row["type"], page=row["page"])
+            )
+
+        return [
+            BookRecord(
+                book_id=row["asin"],
+                book_title=row["title"],
+                book_author=json.loads(row["authors"]),
+                book_cover=row["cover"],
+                highlights=items_by_book.get(row["asin"], []),
+                date=row["date"]
+            )
+            for row in book_rows
+        ]
+
+    def get_synced_at(self, account_key: str) -> Optional[float]:
+        """When the account's books were last written, or None if nothing is stored"""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(synced_at) AS synced_at FROM books WHERE account_key = ?", (account_key,)).fetchone()
+        return row["synced_at"]
+
+    def record_login(self, account_key: str, credential_key: str):
+        """Remember the credentials that last signed in to the account, which are the account's current ones"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO account_logins (account_key, credential_key, logged_in_at) VALUES (?, ?, ?)
+                ON CONFLICT (account_key) DO UPDATE SET
+                    credential_key = excluded.credential_key,
+                    logged_in_at = excluded.logged_in_at
+                """,
+                (account_key, credential_key, time.time())
+            )
+
+    def login_credential_key(self, account_key: str) -> Optional[str]:
+        """Credential key of the last successful sign-in to the account, or None if it never signed in"""
+        with self._lock:
+            row = self._conn.execute("SELECT credential_key FROM account_logins WHERE account_key = ?", (account_key,)).fetchone()
+        return row["credential_key"] if row else None
+
+    def save_sync_account(self, account_key: str, credential_key: str, envelope: str, schedule: str, next_run_at: float):
+        """Register an account for scheduled sync, or update its credentials and schedule"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO sync_accounts (account_key, credential_key, envelope, schedule, next_run_at, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (account_key) DO UPDATE SET
+                    credential_key = excluded.credential_key,
+                    envelope = excluded.envelope,
+                    schedule = excluded.schedule,
+                    next_run_at = excluded.next_run_at
+                """,
+                (account_key, credential_key, envelope, schedule, next_run_at, time.time())
+            )
+
+    def get_sync_account(self, account_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM sync_accounts WHERE account_key = ?", (account_key,)).fetchone()
+        return dict(row) if row else None
+
+    def delete_sync_account(self, account_key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sync_accounts WHERE account_key = ?", (account_key,))
+
+    def due_sync_accounts(self, now: float) -> List[Dict[str, Any]]:
+        """Registered accounts whose next run is due, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM sync_accounts WHERE next_run_at <= ? ORDER BY next_run_at", (now,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_sync_accounts(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sync_accounts").fetchone()[0]
+
+    def schedule_sync(self, account_key: str, next_run_at: float):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE sync_accounts SET next_run_at = ? WHERE account_key = ?", (next_run_at, account_key))
+
+    def record_sync_run(self, account_key: str, status: str, error: Optional[str], started_at: float, duration: float):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sync_accounts SET last_run_at = ?, last_status = ?, last_error = ?, last_duration = ? WHERE account_key = ?",
+                (started_at, status, error, duration, account_key)
+            )
+
+    def start_run(self, account_key: str, token: Optional[str] = None, options: str = "") -> Tuple[str, Dict[str, str]]:
+        """Open a scrape journal, or reopen the account's journal `token` to resume it
+
+        `options` identifies what the run covers (e.g. incremental flag and book filter); a
+        journal is only resumed by a run with the same options, since its "unchanged" books
+        are neither opened nor returned.
+        Returns:
+            (token, outcome of every book already finished in the run, keyed by ASIN)
+        Raises:
+            ValueError: The token is unknown, expired or was issued for different options
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._prune_runs(now)
+            if token is not None:
+                row = self._conn.execute(
+                    "SELECT options FROM scrape_runs WHERE token = ? AND account_key = ?", (token, account_key)
+                ).fetchone()
+                if row is None:
+                    raise ValueError("Unknown or expired resume token")
+                if row["options"] != options:
+                    raise ValueError("Resume token belongs to a scrape with different options")
+                self._conn.execute("UPDATE scrape_runs SET updated_at = ? WHERE token = ?", (now, token))
+                rows = self._conn.execute(
+                    "SELECT asin, outcome FROM scrape_run_books WHERE token = ? AND outcome != 'failed'", (token,)
+                ).fetchall()
+                return token, {row["asin"]: row["outcome"] for row in rows}
+
+            token = secrets.token_urlsafe(16)
+            self._conn.execute(
+                "INSERT INTO scrape_runs (token, account_key, options, started_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (token, account_key, options, now, now)
+            )
+        return token, {}
+
+    def _prune_runs(self, now: float):
+        expired = [
+            row["token"] for row in
+            self._conn.execute("SELECT token FROM scrape_runs WHERE updated_at < ?", (now - self.journal_ttl,)).fetchall()
+        ]
+        for token in expired:
+            self._conn.execute("DELETE FROM scrape_run_books WHERE token = ?", (token,))
+            self._conn.execute("DELETE FROM scrape_runs WHERE token = ?", (token,))
+
+    def run_options(self, account_key: str, token: str) -> Optional[str]:
+        """Options of the account's unfinished scrape `token`, or None if there is no such run"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT options FROM scrape_runs WHERE token = ? AND account_key = ? AND updated_at >= ?",
+                (token, account_key, time.time() - self.journal_ttl)
+            ).fetchone()
+        return row["options"] if row else None
+
+    def latest_run(self, account_key: str, options: str = "") -> Optional[str]:
+        """Token of the account's most recently active unfinished scrape with these options"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT token FROM scrape_runs WHERE account_key = ? AND options = ? AND updated_at >= ? ORDER BY updated_at DESC LIMIT 1",
+                (account_key, options, time.time() - self.journal_ttl)
+            ).fetchone()
+        return row["token"] if row else None
+
+    def record_run_book(self, token: str, asin: str, outcome: str, error: Optional[str] = None, attempts: int = 1):
+        """Checkpoint one book of a run: "changed", "unchanged" or "failed" """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrape_run_books (token, asin, outcome, error, attempts) VALUES (?, ?, ?, ?, ?)",
+                (token, asin, outcome, error, attempts)
+            )
+            self._conn.execute("UPDATE scrape_runs SET updated_at = ? WHERE token = ?", (time.time(), token))
+
+    def finish_run(self, token: str):
+        """Drop the journal of a run that completed every book"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scrape_run_books WHERE token = ?", (token,))
+            self._conn.execute("DELETE FROM scrape_runs WHERE token = ?", (token,))
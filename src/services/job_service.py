@@ -0,0 +1,255 @@
+import asyncio
+import ipaddress
+import os
+import socket
+import time
+import urllib.parse
+import urllib.request
+import uuid
+import logging
+from typing import Any, Dict, List, Optional
+from src.services.kindle_scraper_service import KindleScraperService
+from src.utils import serialization
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue is at its depth limit"""
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Turn redirects into HTTPErrors, so a webhook cannot be bounced to another host"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Job:
+    """A queued or running scrape and, once finished, its result"""
+
+    def __init__(self, params: Dict[str, Any], webhook_url: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.params: Optional[Dict[str, Any]] = params
+        self.webhook_url = webhook_url
+        self.books_processed = 0
+        self.books_total: Optional[int] = None
+        self.result: Optional[List[Dict[str, Any]]] = None
+        self.meta: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.expires_at: Optional[float] = None
+
+    def update_progress(self, books_processed: int, books_total: int):
+        self.books_processed = books_processed
+        self.books_total = books_total
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "progress": {
+                "books_processed": self.books_processed,
+                "books_total": self.books_total
+            },
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "expires_at": self.expires_at,
+            "error": self.error
+        }
+        if include_result and self.status == "completed":
+            data["result"] = self.result
+            if self.meta:
+                data["meta"] = self.meta
+        return data
+
+
+class JobService:
+    """Runs long scrapes in the background on a bounded worker pool
+
+    The queue and the job table are only touched from the event loop, so submit() and
+    get() must be called from async code (not from threadpool routes).
+    """
+
+    def __init__(
+        self,
+        scraper: KindleScraperService,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        result_ttl: Optional[float] = None
+    ):
+        self.scraper = scraper
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "2"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("JOB_QUEUE_MAX", "20"))
+        self.result_ttl = result_ttl if result_ttl is not None else float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+        self.webhook_timeout = float(os.getenv("JOB_WEBHOOK_TIMEOUT", "10"))
+        self.webhook_retries = int(os.getenv("JOB_WEBHOOK_RETRIES", "3"))
+        allowed_hosts = os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "")
+        self.webhook_allowed_hosts = {host.strip().lower() for host in allowed_hosts.split(",") if host.strip()}
+        self._opener = urllib.request.build_opener(_NoRedirectHandler)
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+        logger.info(f"JobService configured with workers={self.workers}, max_queue={self.max_queue}, result_ttl={self.result_ttl}s")
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._purge_loop()))
+        logger.info(f"Started {self.workers} job workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Job workers stopped")
+
+    def submit(self, params: Dict[str, Any], webhook_url: Optional[str] = None) -> Job:
+        """Queue a scrape with the given scraper arguments
+        Raises:
+            JobQueueFullError: The queue already holds max_queue jobs
+        """
+        job = Job(params, webhook_url)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f"Job queue is full ({self.max_queue} jobs waiting)")
+        self._jobs[job.id] = job
+        logger.info(f"Job {job.id} queued ({self._queue.qsize()} waiting)")
+        return job
+
+    def check_webhook_url(self, url: str):
+        """Make sure a webhook only reaches hosts the service may call
+
+        With JOB_WEBHOOK_ALLOWED_HOSTS set, the host must be one of them. Otherwise every
+        address the host resolves to must be public, so callers cannot make the service
+        POST to loopback, private or link-local endpoints (e.g. cloud metadata).
+        Raises:
+            ValueError: The URL is not http(s) or its host is not allowed
+        """
+        parsed = urllib.parse.urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError("Webhook URL must be an http(s) URL with a host")
+
+        host = parsed.hostname.lower()
+        if self.webhook_allowed_hosts:
+            if host not in self.webhook_allowed_hosts:
+                raise ValueError(f"Webhook host {host} is not in JOB_WEBHOOK_ALLOWED_HOSTS")
+            return
+
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(host, parsed.port or None, proto=socket.IPPROTO_TCP)}
+        except (socket.gaierror, UnicodeError) as e:
+            raise ValueError(f"Webhook host {host} does not resolve: {e}")
+        for address in addresses:
+            if not ipaddress.ip_address(address.split("%", 1)[0]).is_global:
+                raise ValueError(f"Webhook host {host} resolves to a non-public address")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job and job.expires_at and job.expires_at < time.time():
+            del self._jobs[job_id]
+            return None
+        return job
+
+    def retry_after(self) -> int:
+        """Rough number of seconds before a queue slot frees up"""
+        durations = [
+            job.finished_at - job.started_at
+            for job in self._jobs.values()
+            if job.finished and job.started_at and job.finished_at
+        ]
+        average = sum(durations) / len(durations) if durations else 60
+        return max(1, int(average * max(1, self._queue.qsize()) / self.workers))
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize(),
+            "queue_max": self.max_queue,
+            "jobs": counts
+        }
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        params = job.params
+        job.params = None  # Do not keep credentials around once the job has started
+        job.status = "running"
+        job.started_at = time.time()
+        logger.info(f"Job {job.id} started")
+
+        try:
+            result = await self.scraper.scrape(**params, progress=job.update_progress)
+            book_filter = params.get("book_filter")
+            job.result = [
+                book_filter.project(book) if book_filter is not None and book_filter.projects else book.to_dict()
+                for book in result["books"]
+            ]
+            job.meta = result["meta"] or None
+            job.status = "completed"
+            logger.info(f"Job {job.id} completed with {len(job.result)} books")
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            logger.error(f"Job {job.id} failed: {e}", exc_info=True)
+        finally:
+            job.finished_at = time.time()
+            job.expires_at = job.finished_at + self.result_ttl
+
+        if job.webhook_url:
+            await self._send_webhook(job)
+
+    async def _send_webhook(self, job: Job):
+        payload = serialization.dumps(job.to_dict())
+        for attempt in range(1, self.webhook_retries + 1):
+            try:
+                status = await asyncio.to_thread(self._post, job.webhook_url, payload)
+                logger.info(f"Webhook for job {job.id} delivered (HTTP {status})")
+                return
+            except Exception as e:
+                logger.warning(f"Webhook for job {job.id} failed (attempt {attempt}/{self.webhook_retries}): {e}")
+                await asyncio.sleep(2 ** attempt)
+        logger.error(f"Giving up on webhook for job {job.id}")
+
+    def _post(self, url: str, payload: bytes) -> int:
+        # Checked again at delivery, as DNS may have changed since the job was submitted
+        self.check_webhook_url(url)
+        request = urllib.request.Request(
+            url,
+            data=payload,
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with self._opener.open(request, timeout=self.webhook_timeout) as response:
+            return response.status
+
+    async def _purge_loop(self):
+        while True:
+            await asyncio.sleep(60)
+            now = time.time()
+            expired = [job_id for job_id, job in self._jobs.items() if job.expires_at and job.expires_at < now]
+            for job_id in expired:
+                del self._jobs[job_id]
+            if expired:
+                logger.info(f"Purged {len(expired)} expired jobs")
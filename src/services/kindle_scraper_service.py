@@ -1,31 +1,94 @@
-from playwright.sync_api import sync_playwright
-from src.models.kindle_models import Highlight, HighlightItem
+from src.services.browser_pool import BrowserPool, BrowserPoolTimeoutError
+from src.services.admission_controller import AdmissionController, AdmissionRejectedError
+from src.services.wait_strategy import WaitStrategy
+from src.services.session_cache_service import SessionCacheService
+from src.services.highlight_store_service import HighlightStoreService
+from src.services.request_filter import RequestFilter
+from src.utils.account import account_key, credential_key
+from src.utils.single_flight import SingleFlight
+from src.models.kindle_models import BookRecord, HighlightRecord
 from src.utils.response import create_response
-from src.utils.scraper import human_type, human_click
-from typing import List, Optional
-import random
-import time
+from src.utils.scraper import human_type, human_click, HumanizationProfile
+from src.utils.notebook_dom import LIBRARY_SCRIPT, ANNOTATIONS_SCRIPT, ANNOTATIONS_FOR_ASIN_SCRIPT, ANNOTATIONS_SETTLED_SCRIPT
+from src.utils.notebook_parser import parse_annotations_html
+from src.utils.timing import PhaseTimer
+from src.utils.book_filter import BookFilter
+from src.utils import metrics
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from fastapi.responses import JSONResponse
+import asyncio
+import json
+import os
 import logging
 import re
-from datetime import datetime
+import time
+import urllib.parse
+from datetime import date, datetime
 
 logger = logging.getLogger(__name__)
 
+ProgressCallback = Callable[[int, int], None]
+
+
+class ChallengeDetectedError(Exception):
+    """Raised when Amazon answers the sign-in with a puzzle/captcha"""
+
+    def __init__(self, selector: str, challenge_type: str = "puzzle"):
+        super().__init__(f"Challenge ({challenge_type}) detected with selector: {selector}")
+        self.selector = selector
+        self.challenge_type = challenge_type
+
+
+class AnnotationsResponseError(Exception):
+    """Raised when the notebook answers an annotations request with an error or the sign-in page"""
+
+    def __init__(self, book_id: str, status: int, url: str):
+        super().__init__(f"Annotations request for {book_id} failed (HTTP {status}, {url})")
+        self.book_id = book_id
+        self.status = status
+
+
 class KindleScraperService:
-    def __init__(self, headless: bool = True):
-        self.headless = headless
+    def __init__(
+        self,
+        browser_pool: BrowserPool,
+        session_cache: SessionCacheService,
+        highlight_store: HighlightStoreService,
+        request_filter: Optional[RequestFilter] = None,
+        admission: Optional[AdmissionController] = None,
+        wait_strategy: Optional[WaitStrategy] = None
+    ):
+        self.browser_pool = browser_pool
+        self.session_cache = session_cache
+        self.highlight_store = highlight_store
+        self.request_filter = request_filter or RequestFilter()
+        self.admission = admission or AdmissionController(browser_pool.size)
+        self.waits = wait_strategy or WaitStrategy()
+        self.single_flight = SingleFlight()
+        self.session_validation_timeout = int(os.getenv("SESSION_VALIDATION_TIMEOUT_MS", "15000"))
+        self.annotations_timeout = int(os.getenv("ANNOTATIONS_TIMEOUT_MS", "30000"))
+        self.settle_timeout = int(os.getenv("ANNOTATIONS_SETTLE_TIMEOUT_MS", "5000"))
+        self.library_timeout = int(os.getenv("LIBRARY_TIMEOUT_MS", "30000"))
+        self.annotations_max_pages = int(os.getenv("ANNOTATIONS_MAX_PAGES", "200"))
+        self.book_max_attempts = max(1, int(os.getenv("BOOK_MAX_ATTEMPTS", "3")))
+        self.book_retry_backoff = float(os.getenv("BOOK_RETRY_BACKOFF_SECONDS", "2"))
         self.kindle_notebook_url = "https://read.amazon.com/notebook"
-        self.puzzle_selectors = [
-            'text=puzzle',
-            'text=/puzzle/i',
-            'text="Solve this puzzle"',
-            'text="Authentication required"',
-            'iframe[title*="verification"]',
-            'iframe[title*="puzzle"]',
-            '.cvf-widget-container',
-            '#cvf-aamation-challenge-iframe'
-        ]
-        logger.info(f"KindleScraperService initialized with headless={headless}")
+        self.login_timeout = int(os.getenv("LOGIN_TIMEOUT_MS", "30000"))
+        # Challenge selectors and the challenge type they indicate, most specific first
+        self.challenge_selectors = {
+            '#auth-captcha-image': "captcha",
+            'input[name="cvf_captcha_input"]': "captcha",
+            '#auth-mfa-otpcode': "otp",
+            'input[name="otpCode"]': "otp",
+            '#cvf-aamation-challenge-iframe': "puzzle",
+            'iframe[title*="puzzle"]': "puzzle",
+            'text="Solve this puzzle"': "puzzle",
+            'text=/puzzle/i': "puzzle",
+            'iframe[title*="verification"]': "verification",
+            'text="Authentication required"': "verification",
+            '.cvf-widget-container': "verification"
+        }
+        logger.info("KindleScraperService initialized")
     
     def _parse_authors(self, author_text: str) -> List[str]:
         """Parse author text and split by common delimiters
@@ -45,6 +108,19 @@ class KindleScraperService:
         
         return authors if authors else ["Unknown Author"]
     
+    def _parse_day(self, date_input: Optional[str]) -> Optional[date]:
+        """Parse a notebook date like "Sunday August 17, 2025" or "August 17, 2025", or return None"""
+        if not date_input:
+            return None
+
+        date_parts = date_input.split(maxsplit=1)
+        for date_str in (date_parts[-1], date_input):
+            try:
+                return datetime.strptime(date_str.strip(), "%B %d, %Y").date()
+            except ValueError:
+                continue
+        return None
+
     def _parse_date(self, date_input: str) -> Optional[str]:
         """Parse date from input field value and convert to mm-dd-yyyy format
         Args:
@@ -54,255 +130,921 @@ class KindleScraperService:
         """
         if not date_input:
             return None
-        
-        try:
-            date_parts = date_input.split(maxsplit=1)
-            if len(date_parts) > 1:
-                date_str = date_parts[1]
-            else:
-                date_str = date_input
-            
-            parsed_date = datetime.strptime(date_str, "%B %d, %Y")
-            
-            return parsed_date.strftime("%m-%d-%Y")
-        except ValueError:
+
+        parsed_date = self._parse_day(date_input)
+        if parsed_date is None:
             logger.warning(f"Could not parse date: {date_input}")
             return None
+        return parsed_date.strftime("%m-%d-%Y")
     
-    def get_highlights(self, email: str, password: str, manual_puzzle: bool = False) -> dict:
+    def _parse_annotation_header(self, header_text: Optional[str]) -> Tuple[Optional[str], Optional[int]]:
+        """Parse the annotation header into highlight type and location
+        Args:
+            header_text: Expected format like "Yellow highlight | Location: 123"
+        Returns:
+            A (type, location) tuple, either of which may be None.
+        """
+        highlight_type = None
+        location = None
+        if not header_text:
+            return highlight_type, location
+
+        header_text = header_text.strip()
+        if " | " in header_text:
+            parts = header_text.split(" | ")
+            if parts[0].endswith(" highlight"):
+                highlight_type = parts[0].replace(" highlight", "")
+            else:
+                highlight_type = parts[0]
+            
+            if len(parts) > 1 and parts[1].startswith("Location:"):
+                try:
+                    location = int(parts[1].replace("Location:", "").replace("&nbsp;", "").replace("\xa0", "").strip())
+                except ValueError:
+                    location = None
+        else:
+            if header_text.endswith(" highlight"):
+                highlight_type = header_text.replace(" highlight", "")
+            else:
+                highlight_type = header_text
+
+        return highlight_type, location
+
+    def _build_highlight_items(self, annotations: List[Dict[str, Optional[str]]]) -> List[HighlightRecord]:
+        """Turn the raw annotation rows returned by ANNOTATIONS_SCRIPT into HighlightRecords
+        Args:
+            annotations: Dicts with the raw "header", "text" and "note" strings of each annotation
+        Returns:
+            A list of HighlightRecord, skipping annotations without highlighted text.
+        """
+        highlight_items = []
+        for j, annotation in enumerate(annotations):
+            if annotation['text'] is None:
+                continue
+
+            highlight_type, location = self._parse_annotation_header(annotation['header'])
+            note_text = annotation['note'].strip() if annotation['note'] else None
+            if not note_text:
+                note_text = None
+
+            highlight_items.append(HighlightRecord(
+                text=annotation['text'].strip(),
+                note=note_text,
+                type=highlight_type,
+                page=location
+            ))
+            logger.debug(f"Processed highlight {j+1}: Type: {highlight_type}, Location: {location}, Note: {'Yes' if note_text else 'No'}")
+
+        return highlight_items
+    
+    async def iter_highlights(
+        self,
+        email: str,
+        password: str,
+        headless: bool = True,
+        manual_puzzle: bool = False,
+        incremental: bool = False,
+        concurrency: int = 1,
+        extraction: str = "dom",
+        humanization: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        meta: Optional[Dict[str, Any]] = None,
+        book_filter: Optional[BookFilter] = None,
+        resume_token: Optional[str] = None,
+        request_key: Optional[str] = None
+    ) -> AsyncIterator[BookRecord]:
+        """Log in and yield each book's highlights as soon as it is parsed
+        Args:
+            concurrency: Number of notebook pages used to open books in parallel
+            extraction: "dom" to read the rendered annotations pane, "network" to parse the notebook's responses
+            humanization: HumanizationProfile preset name (defaults to HUMANIZATION_PROFILE)
+            progress: Called with (books_processed, total_books) as the library is walked
+            meta: Filled with information about the run (e.g. the incremental delta, request counters, phase timings) once iteration ends
+            book_filter: Only open the books it selects (all books by default)
+            resume_token: Journal of an earlier partial run; books it finished are loaded from the store instead of opened
+            request_key: credential_key(email, password) if the caller already computed it
+        Raises:
+            BrowserPoolTimeoutError: No pooled browser became available
+            ChallengeDetectedError: Amazon blocked the login with a puzzle/captcha
+        """
         logger.info("Starting highlights scraping process")
         
+        session_key = request_key or await asyncio.to_thread(credential_key, email, password)
+        cached_state = self.session_cache.load(session_key)
+        context_options = {"storage_state": cached_state} if cached_state else {}
+        timer = PhaseTimer("kindle.scrape")
+        profile = HumanizationProfile.preset(humanization)
+        started = time.perf_counter()
+        books_count = 0
+        highlights_count = 0
+        error = None
+
         try:
-            with sync_playwright() as p:
-                logger.debug("Launching browser")
-                browser = p.chromium.launch(headless=self.headless)
-                context = browser.new_context()
-                page = context.new_page()
-                logger.debug("Browser and page created successfully")
-
-                logger.info(f"Navigating to {self.kindle_notebook_url}")
-                page.goto(self.kindle_notebook_url)
-                logger.debug("Login page loaded")
+            async with self.browser_pool.context(headless, **context_options) as context:
+                timer.record("browser", time.perf_counter() - started)
+                request_stats = await self.request_filter.install(context)
+                async for book in self._iter_books(
+                    context, email, password, manual_puzzle, incremental, concurrency, extraction, cached_state is not None, progress, meta, timer, profile, book_filter,
+                    resume_token, session_key
+                ):
+                    books_count += 1
+                    highlights_count += len(book.highlights)
+                    yield book
 
-                logger.info("Filling email field")
-                email_input = page.locator('input[name="email"]')
-                human_type(email_input, email)
-                
-                delay = random.uniform(1, 2)
-                logger.debug(f"Waiting {delay:.2f}s before clicking continue")
-                time.sleep(delay)
-                page.click('input#continue')
-                logger.debug("Continue button clicked")
-
-                logger.info("Filling password field")
-                password_input = page.locator('input[name="password"]')
-                human_type(password_input, password)
-                
-                delay = random.uniform(1, 2)
-                logger.debug(f"Waiting {delay:.2f}s before clicking sign in")
-                time.sleep(delay)
-                page.click('input#signInSubmit')
-                logger.debug("Sign in button clicked")
+            logger.info(f"Humanization profile '{profile.name}' added {profile.total_delay:.2f}s of artificial delay")
+            if meta is not None:
+                meta["timings"] = timer.summary()
+                meta["humanization"] = profile.to_dict()
 
-                logger.info("Waiting for highlights page to load")
-                
-                if not manual_puzzle:
-                    try:
-                        for selector in self.puzzle_selectors:
-                            try:
-                                puzzle_element = page.wait_for_selector(selector, timeout=1000)
-                                if puzzle_element:
-                                    logger.error(f"Puzzle/captcha detected with selector: {selector}")
-                                    browser.close()
-                                    return create_response(
-                                        code=400,
-                                        message="Authentication blocked by puzzle/captcha. Please try again later.",
-                                        data=None
-                                    )
-                            except:
-                                continue
-                    except:
-                        # No puzzle found, continue normally
-                        pass
-                else:
-                    logger.info("Manual puzzle mode enabled - waiting for user to resolve any puzzles manually")
-                
-                page.wait_for_selector('.kp-notebook-library-each-book', timeout=60000 if manual_puzzle else 30000)
-                logger.debug("Highlights page loaded successfully")
+            if request_stats is not None:
+                logger.info(f"Requests allowed: {request_stats.allowed}, blocked: {request_stats.blocked} (~{request_stats.bytes_saved_estimate} bytes saved)")
+                if meta is not None:
+                    meta["requests"] = request_stats.to_dict()
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._record_scrape_metrics(timer, time.perf_counter() - started, books_count, highlights_count, error)
+            self.waits.save()
 
-                books = page.query_selector_all('.kp-notebook-library-each-book')
-                logger.info(f"Found {len(books)} books in library")
-                
-                book_data = []
-                for book in books:
-                    book_id = book.get_attribute('id')
-                    title_elem = book.query_selector('h2.kp-notebook-searchable')
-                    author_elem = book.query_selector('p.a-spacing-base.a-color-secondary')
-                    cover_elem = book.query_selector('img.kp-notebook-cover-image')
-                    
-                    if title_elem and book_id:
-                        title = title_elem.inner_text()
-                        authors = ["Unknown Author"]
-                        if author_elem:
-                            author_text = author_elem.inner_text().strip()
-                            authors = self._parse_authors(author_text)
-                        
-                        cover_url = None
-                        if cover_elem:
-                            cover_url = cover_elem.get_attribute('src')
-                        
-                        book_data.append({
-                            'id': book_id,
-                            'title': title,
-                            'authors': authors,
-                            'cover': cover_url
-                        })
-                
-                logger.debug(f"Mapped {len(book_data)} book titles")
+    def _record_scrape_metrics(self, timer: PhaseTimer, elapsed: float, books_count: int, highlights_count: int, error: Optional[BaseException]):
+        if error is None:
+            status = "completed"
+        elif isinstance(error, (GeneratorExit, asyncio.CancelledError)):
+            status = "cancelled"
+        else:
+            status = "failed"
 
-                logger.info("Starting to process books for highlights extraction")
-                all_books_highlights: List[Highlight] = []
-                books_processed = 0
-                
-                for i, book_info in enumerate(book_data):
-                    book_id = book_info['id']
-                    book_title = book_info['title']
-                    book_authors = book_info['authors']
-                    book_cover = book_info['cover']
-                    authors_str = ", ".join(book_authors)
-                    logger.info(f"Processing book {i+1}/{len(book_data)}: {book_title} by {authors_str}")
-                    
-                    page.evaluate(f"""
-                        const book = document.querySelector('#{book_id}');
-                        const scroller = document.querySelector('.a-scroller.kp-notebook-scroller-addon.a-scroller-vertical');
-                        if (book && scroller) {{
-                            const bookRect = book.getBoundingClientRect();
-                            const scrollerRect = scroller.getBoundingClientRect();
-                            const offset = bookRect.top - scrollerRect.top + scroller.scrollTop - 50;
-                            scroller.scrollTop = Math.max(0, offset);
-                        }}
-                    """)
-                    
-                    time.sleep(random.uniform(0.3, 0.8))
-                    
-                    clicked = False
-                    action_selector = f'#{book_id} span[data-action="get-annotations-for-asin"]'
-                    action_element = page.query_selector(action_selector)
-                    if action_element:
-                        delay = random.uniform(0.5, 1.5)
-                        logger.debug(f"Waiting {delay:.2f}s before clicking book action span")
-                        time.sleep(delay)
-                        human_click(page, action_element)
-                        clicked = True
-                        logger.debug(f"Successfully clicked action span for {book_id}")
-                    else:
-                        book_element = page.query_selector(f'#{book_id}')
-                        if book_element:
-                            delay = random.uniform(0.5, 1.5)
-                            time.sleep(delay)
-                            human_click(page, book_element)
-                            clicked = True
-                            logger.debug(f"Successfully clicked book container for {book_id}")
-                    
-                    if not clicked:
-                        logger.warning(f"Could not find any clickable element for book {book_id}")
-                        continue
-                    
-                    logger.debug("Waiting for highlights to load")
-                    page.wait_for_selector('.kp-notebook-highlight')
-                    
-                    delay = random.uniform(0.3, 0.8)
-                    logger.debug(f"Waiting {delay:.2f}s after highlights loaded")
-                    time.sleep(delay)
-                    
-                    highlights = page.query_selector_all('.kp-notebook-highlight')
-                    logger.info(f'Found {len(highlights)} highlights for book: {book_title}')
-                    
-                    date_span = page.query_selector('span#kp-notebook-annotated-date')
-                    highlight_date = None
-                    if date_span:
-                        date_text = date_span.inner_text().strip()
-                        highlight_date = self._parse_date(date_text)
-                        logger.debug(f"Extracted date: {date_text} -> {highlight_date}")
-                    
-                    annotation_containers = page.query_selector_all('#kp-notebook-annotations > div[id*="QTI"]')
-                    highlight_items = []
-                    
-                    for j, container in enumerate(annotation_containers):
-                        type_element = container.query_selector('span#annotationHighlightHeader')
-                        highlight_type = None
-                        location = None
-                        
-                        if type_element:
-                            header_text = type_element.inner_text().strip()
-                            if " | " in header_text:
-                                parts = header_text.split(" | ")
-                                if parts[0].endswith(" highlight"):
-                                    highlight_type = parts[0].replace(" highlight", "")
-                                else:
-                                    highlight_type = parts[0]
-                                
-                                if len(parts) > 1 and parts[1].startswith("Location:"):
-                                    try:
-                                        location = int(parts[1].replace("Location:", "").replace("&nbsp;", "").strip())
-                                    except ValueError:
-                                        location = None
-                            else:
-                                if header_text.endswith(" highlight"):
-                                    highlight_type = header_text.replace(" highlight", "")
-                                else:
-                                    highlight_type = header_text
-                        
-                        highlight_element = container.query_selector('.kp-notebook-highlight span#highlight')
-                        if not highlight_element:
-                            continue
-                            
-                        highlight_text = highlight_element.inner_text().strip()
-                        
-                        note_text = None
-                        note_element = container.query_selector('.kp-notebook-note span#note')
-                        if note_element:
-                            note_text = note_element.inner_text().strip()
-                            if not note_text:
-                                note_text = None
-                        
-                        highlight_item = HighlightItem(
-                            text=highlight_text,
-                            note=note_text,
-                            type=highlight_type,
-                            page=location
-                        )
-                        highlight_items.append(highlight_item)
-                        logger.debug(f"Processed highlight {j+1}: Type: {highlight_type}, Location: {location}, Note: {'Yes' if note_text else 'No'}")
-                    
-                    book_highlight = Highlight(
-                        book_title=book_title,
-                        book_author=book_authors,
-                        book_cover=book_cover,
-                        highlights=highlight_items,
-                        date=highlight_date
-                    )
-                    all_books_highlights.append(book_highlight)
-                    
-                    books_processed += 1
-                    logger.info(f"Completed processing book {i+1}: {book_title} ({len(highlight_items)} highlights)")
-                    
-
-                logger.debug("Closing browser")
-                browser.close()
-                
-                total_highlights = sum(len(book.highlights) for book in all_books_highlights)
-                logger.info(f"Scraping completed successfully. Total highlights: {total_highlights} from {books_processed} books")
-                return create_response(
-                    code=200,
-                    message="Highlights scraped successfully",
-                    data=[book.model_dump() for book in all_books_highlights]
-                )
+        metrics.SCRAPE_DURATION.observe(elapsed, status=status)
+        metrics.BOOKS_SCRAPED.inc(books_count)
+        metrics.HIGHLIGHTS_SCRAPED.inc(highlights_count)
+        if status == "completed" and elapsed > 0:
+            metrics.BOOKS_PER_SECOND.observe(books_count / elapsed)
+            metrics.HIGHLIGHTS_PER_SECOND.observe(highlights_count / elapsed)
+        if status == "failed":
+            phase = timer.failed_phase or ("browser" if isinstance(error, BrowserPoolTimeoutError) else "other")
+            metrics.PHASE_FAILURES.inc(phase=phase)
+        timer.finish(error if status == "failed" else None)
+
+    async def scrape(
+        self,
+        email: str,
+        password: str,
+        headless: bool = True,
+        manual_puzzle: bool = False,
+        incremental: bool = False,
+        concurrency: int = 1,
+        extraction: str = "dom",
+        humanization: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        book_filter: Optional[BookFilter] = None,
+        resume_token: Optional[str] = None,
+        request_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Scrape the whole library (or the books selected by `book_filter`) into memory
+        
+        Concurrent calls with the same credentials, incremental flag, extraction mode,
+        humanization profile, concurrency, filter and resume token share one scrape (and its
+        result, for SINGLE_FLIGHT_WINDOW_SECONDS after it ends); only the first caller's
+        progress callback is used. `request_key` is credential_key(email, password), computed
+        here if not given.
+        Returns:
+            A dict with the scraped "books" (list of BookRecord) and a "meta" dict. When some
+            books failed or the run stopped midway, meta has "partial", "errors" and the
+            "resume_token" that continues the run.
+        """
+        request_key = request_key or await asyncio.to_thread(credential_key, email, password)
+        profile_name = HumanizationProfile.preset(humanization).name
+        key = f"{request_key}|incremental={incremental}|extraction={extraction}|humanization={profile_name}|concurrency={concurrency}"
+        if book_filter is not None and book_filter.options():
+            key += f"|filter={sorted(book_filter.options().items())}"
+        if resume_token:
+            key += f"|resume={resume_token}"
+        return await self.single_flight.run(
+            key,
+            lambda: self._scrape(email, password, headless, manual_puzzle, incremental, concurrency, extraction, humanization, progress, book_filter, resume_token, request_key)
+        )
+
+    async def _scrape(
+        self,
+        email: str,
+        password: str,
+        headless: bool,
+        manual_puzzle: bool,
+        incremental: bool,
+        concurrency: int,
+        extraction: str,
+        humanization: Optional[str],
+        progress: Optional[ProgressCallback],
+        book_filter: Optional[BookFilter] = None,
+        resume_token: Optional[str] = None,
+        request_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        meta: Dict[str, Any] = {}
+        books: List[BookRecord] = []
+        try:
+            async with self.admission.admit(email):
+                async for book in self.iter_highlights(
+                    email, password, headless, manual_puzzle, incremental, concurrency, extraction, humanization,
+                    progress=progress, meta=meta, book_filter=book_filter, resume_token=resume_token, request_key=request_key
+                ):
+                    books.append(book)
+        except Exception as e:
+            # Once books are being opened the run is journaled, so keep what was parsed and hand out the token
+            if "resume_token" not in meta:
+                raise
+            logger.error(f"Scrape interrupted after {len(books)} books: {e}", exc_info=True)
+            meta["partial"] = True
+            meta["errors"].append({"book_id": None, "error": f"Scrape interrupted: {e}"})
+        return {"books": books, "meta": meta}
+
+    async def stream_highlights(
+        self,
+        email: str,
+        password: str,
+        headless: bool = True,
+        manual_puzzle: bool = False,
+        incremental: bool = False,
+        concurrency: int = 1,
+        extraction: str = "dom",
+        humanization: Optional[str] = None,
+        book_filter: Optional[BookFilter] = None,
+        resume_token: Optional[str] = None,
+        request_key: Optional[str] = None,
+        admission_checked: bool = False
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ("book", data) records as books are parsed, then one ("summary", data) or ("error", data) record
+
+        Pass admission_checked=True when AdmissionController.check already ran for the request
+        (e.g. before the response started), so its rate limit token is not taken twice.
+        """
+        book_filter = book_filter or BookFilter()
+        started = time.monotonic()
+        meta: Dict[str, Any] = {}
+        books_count = 0
+        highlights_count = 0
+
+        try:
+            async with self.admission.admit(email, admission_checked):
+                async for book in self.iter_highlights(
+                    email, password, headless, manual_puzzle, incremental, concurrency, extraction, humanization,
+                    meta=meta, book_filter=book_filter, resume_token=resume_token, request_key=request_key
+                ):
+                    books_count += 1
+                    highlights_count += len(book.highlights)
+                    yield "book", book_filter.project(book)
+        except AdmissionRejectedError as e:
+            yield "error", {"code": e.status_code, "message": str(e), "retry_after": e.retry_after}
+            return
+        except ChallengeDetectedError as e:
+            logger.error(str(e))
+            yield "error", {"code": 400, "message": "Authentication blocked by puzzle/captcha. Please try again later.", "challenge_type": e.challenge_type}
+            return
+        except BrowserPoolTimeoutError as e:
+            logger.warning(f"Browser pool saturated: {e}")
+            yield "error", {"code": 503, "message": "All browsers are busy. Please try again later."}
+            return
+        except Exception as e:
+            logger.error(f"Error during highlights streaming: {str(e)}", exc_info=True)
+            record = {"code": 500, "message": f"Error scraping highlights: {str(e)}"}
+            if "resume_token" in meta:
+                record.update({"resume_token": meta["resume_token"], "errors": meta["errors"]})
+            yield "error", record
+            return
+
+        yield "summary", {
+            "code": 200,
+            "message": "Highlights scraped successfully",
+            "books": books_count,
+            "highlights": highlights_count,
+            "elapsed_seconds": round(time.monotonic() - started, 3),
+            **meta
+        }
 
+    async def get_highlights(self, email: str, password: str, headless: bool = True, manual_puzzle: bool = False, incremental: bool = False, concurrency: int = 1, extraction: str = "dom", humanization: Optional[str] = None, book_filter: Optional[BookFilter] = None, resume_token: Optional[str] = None, request_key: Optional[str] = None) -> dict:
+        book_filter = book_filter or BookFilter()
+        try:
+            result = await self.scrape(
+                email, password, headless, manual_puzzle, incremental, concurrency, extraction, humanization,
+                book_filter=book_filter, resume_token=resume_token, request_key=request_key
+            )
+            return create_response(
+                code=200,
+                message=self.result_message(result),
+                data=[book_filter.project(book) for book in result["books"]] if book_filter.projects else result["books"],
+                meta=result["meta"] or None
+            )
         except Exception as e:
-            logger.error(f"Error during highlights scraping: {str(e)}", exc_info=True)
+            return self.error_response(e)
+
+    @staticmethod
+    def result_message(result: Dict[str, Any]) -> str:
+        if result["meta"].get("partial"):
+            return "Highlights partially scraped; pass meta.resume_token to continue"
+        return "Highlights scraped successfully"
+
+    @staticmethod
+    def error_response(e: Exception) -> JSONResponse:
+        """The error response for an exception raised by scrape()"""
+        if isinstance(e, ChallengeDetectedError):
+            logger.error(str(e))
+            return create_response(
+                code=400,
+                message="Authentication blocked by puzzle/captcha. Please try again later.",
+                data=None,
+                meta={"challenge_type": e.challenge_type}
+            )
+        if isinstance(e, AdmissionRejectedError):
             return create_response(
-                code=500,
-                message=f"Error scraping highlights: {str(e)}",
+                code=e.status_code,
+                message=f"{e}. Please try again later.",
+                data=None,
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        if isinstance(e, BrowserPoolTimeoutError):
+            logger.warning(f"Browser pool saturated: {e}")
+            return create_response(
+                code=503,
+                message="All browsers are busy. Please try again later.",
                 data=None
             )
+        logger.error(f"Error during highlights scraping: {str(e)}", exc_info=True)
+        return create_response(
+            code=500,
+            message=f"Error scraping highlights: {str(e)}",
+            data=None
+        )
+
+    async def _restore_session(self, page) -> bool:
+        """Check whether the cached session cookies land on the notebook library
+        Returns:
+            True if the library loaded, False if Amazon asked for credentials again.
+        """
+        library = page.locator('.kp-notebook-library-each-book')
+        sign_in = page.locator('input[name="email"], input[name="password"]')
+        try:
+            async with self.waits.wait("session", self.session_validation_timeout) as timeout:
+                await library.or_(sign_in).first.wait_for(timeout=timeout)
+        except Exception:
+            logger.info("Cached session did not reach the notebook in time")
+            return False
+
+        if await library.count() > 0:
+            logger.info("Cached session accepted, skipping login")
+            return True
+
+        logger.info("Cached session rejected by Amazon")
+        return False
+
+    async def _login(
+        self,
+        page,
+        email: str,
+        password: str,
+        manual_puzzle: bool,
+        timer: Optional[PhaseTimer] = None,
+        profile: Optional[HumanizationProfile] = None
+    ):
+        """Run the sign-in flow and wait for the library
+        Raises:
+            ChallengeDetectedError: A puzzle/captcha was shown instead of the library
+        """
+        timer = timer or PhaseTimer()
+        profile = profile or HumanizationProfile.preset()
+        logger.info("Filling email field")
+        email_input = page.locator('input[name="email"]')
+        await human_type(email_input, email, profile)
+        
+        delay = profile.delay(1, 2)
+        logger.debug(f"Waiting {delay:.2f}s before clicking continue")
+        await asyncio.sleep(delay)
+        await page.click('input#continue')
+        logger.debug("Continue button clicked")
+
+        logger.info("Filling password field")
+        password_input = page.locator('input[name="password"]')
+        await human_type(password_input, password, profile)
+        
+        delay = profile.delay(1, 2)
+        logger.debug(f"Waiting {delay:.2f}s before clicking sign in")
+        await asyncio.sleep(delay)
+        await page.click('input#signInSubmit')
+        logger.debug("Sign in button clicked")
+
+        logger.info("Waiting for highlights page to load")
+        
+        if not manual_puzzle:
+            with timer.phase("puzzle_probe"):
+                async with self.waits.wait("sign_in", self.login_timeout) as timeout:
+                    challenge = await self._wait_for_library_or_challenge(page, timeout)
+            if challenge:
+                selector, challenge_type = challenge
+                metrics.CAPTCHA_HITS.inc(type=challenge_type)
+                raise ChallengeDetectedError(selector, challenge_type)
+        else:
+            logger.info("Manual puzzle mode enabled - waiting for user to resolve any puzzles manually")
+            await page.wait_for_selector('.kp-notebook-library-each-book', timeout=2 * self.login_timeout)
+
+        logger.debug("Highlights page loaded successfully")
+
+    async def _wait_for_library_or_challenge(self, page, timeout: float) -> Optional[Tuple[str, str]]:
+        """Race the library against every challenge selector at once
+        Returns:
+            None once the library is shown, or the (selector, challenge_type) that appeared first.
+        Raises:
+            TimeoutError: Neither the library nor a known challenge appeared within timeout ms
+        """
+        library = page.locator('.kp-notebook-library-each-book')
+        challenges = [(selector, challenge_type, page.locator(selector)) for selector, challenge_type in self.challenge_selectors.items()]
+        either = library
+        for _, _, locator in challenges:
+            either = either.or_(locator)
+
+        deadline = time.monotonic() + timeout / 1000
+        while True:
+            # A timeout of 0 means "no timeout" to Playwright, so never go below 1ms
+            remaining = max(1.0, (deadline - time.monotonic()) * 1000)
+            await either.first.wait_for(timeout=remaining)
+            if await library.count() > 0:
+                return None
+            for selector, challenge_type, locator in challenges:
+                if await locator.count() > 0:
+                    logger.warning(f"Sign-in answered with a {challenge_type} challenge ({selector})")
+                    return selector, challenge_type
+            # The match disappeared while it was being classified (e.g. a redirect), wait again
+            await asyncio.sleep(0.1)
+
+    async def _iter_books(
+        self,
+        context,
+        email: str,
+        password: str,
+        manual_puzzle: bool,
+        incremental: bool = False,
+        concurrency: int = 1,
+        extraction: str = "dom",
+        use_cached_session: bool = False,
+        progress: Optional[ProgressCallback] = None,
+        meta: Optional[Dict[str, Any]] = None,
+        timer: Optional[PhaseTimer] = None,
+        profile: Optional[HumanizationProfile] = None,
+        book_filter: Optional[BookFilter] = None,
+        resume_token: Optional[str] = None,
+        session_key: Optional[str] = None
+    ) -> AsyncIterator[BookRecord]:
+        """Run the login and extraction flow inside an isolated browser context
+        
+        Highlight store reads and writes run in a worker thread, so sqlite does not block the
+        event loop shared by every concurrent scrape. Every finished book is checkpointed in a
+        journal in the highlight store. A book that still fails after BOOK_MAX_ATTEMPTS is
+        reported in meta["errors"] instead of ending the run, and the journal's token is left
+        in meta["resume_token"].
+        """
+        timer = timer or PhaseTimer()
+        profile = profile or HumanizationProfile.preset()
+        book_filter = book_filter or BookFilter()
+        session_key = session_key or await asyncio.to_thread(credential_key, email, password)
+        page = await context.new_page()
+        logger.debug("Page created successfully")
+
+        with timer.phase("navigation"):
+            logger.info(f"Navigating to {self.kindle_notebook_url}")
+            await page.goto(self.kindle_notebook_url)
+
+        with timer.phase("login"):
+            if use_cached_session and await self._restore_session(page):
+                logger.debug("Highlights page loaded from cached session")
+            else:
+                if use_cached_session:
+                    self.session_cache.invalidate(session_key)
+                    await context.clear_cookies()
+                    await page.goto(self.kindle_notebook_url)
+                logger.debug("Login page loaded")
+
+                await self._login(page, email, password, manual_puzzle, timer, profile)
+                self.session_cache.save(session_key, await context.storage_state())
+
+        library_started = time.perf_counter()
+        books = await page.evaluate(LIBRARY_SCRIPT)
+        logger.info(f"Found {len(books)} books in library")
+        
+        book_data = []
+        for book in books:
+            if book['title'] and book['id']:
+                authors = ["Unknown Author"]
+                if book['author']:
+                    authors = self._parse_authors(book['author'].strip())
+                
+                book_data.append({
+                    'id': book['id'],
+                    'title': book['title'],
+                    'authors': authors,
+                    'cover': book['cover'],
+                    'annotated_date': book['annotated_date']
+                })
+        
+        logger.debug(f"Mapped {len(book_data)} book titles")
+
+        user_key = account_key(email)
+        # The library only loads for a signed-in session, so these credentials are the account's current ones
+        await asyncio.to_thread(self.highlight_store.record_login, user_key, session_key)
+        known_books = await asyncio.to_thread(self.highlight_store.get_book_states, user_key)
+        library_ids = {book_info['id'] for book_info in book_data}
+        removed_books = [asin for asin in known_books if asin not in library_ids]
+        await asyncio.to_thread(self.highlight_store.delete_books, user_key, removed_books)
+        unchanged_books = []
+
+        # Removed books are detected against the whole library above; only the selected page is opened
+        selected_books, has_more = book_filter.page(self._matching_books(book_data, book_filter))
+        total_books = len(selected_books)
+        if total_books < len(book_data):
+            logger.info(f"Filter selected {total_books} of {len(book_data)} books")
+        if meta is not None and book_filter.options():
+            meta["filter"] = {**book_filter.options(), "selected": total_books, "has_more": has_more}
+
+        run_token, finished_books = await asyncio.to_thread(
+            self.highlight_store.start_run, user_key, resume_token, self.run_options(incremental, book_filter)
+        )
+        failed_books: List[Dict[str, Any]] = []
+        if meta is not None:
+            # Left in meta if the run stops midway, so the caller can return the token with the partial result
+            meta.update({"resume_token": run_token, "errors": failed_books})
+
+        restored_books = []
+        pending_books = []
+        for i, book_info in selected_books:
+            outcome = finished_books.get(book_info['id'])
+            if outcome == "unchanged":
+                unchanged_books.append(book_info['id'])
+                continue
+            if outcome == "changed":
+                restored_books.append((i, book_info['id']))
+                continue
+            known = known_books.get(book_info['id'])
+            if incremental and known and book_info['annotated_date'] and known['annotated_date'] == book_info['annotated_date']:
+                logger.info(f"Skipping unchanged book {i+1}: {book_info['title']}")
+                unchanged_books.append(book_info['id'])
+                continue
+            pending_books.append((i, book_info))
+        timer.record("library", time.perf_counter() - library_started)
+
+        logger.info("Starting to process books for highlights extraction")
+        changed_books = []
+        total_highlights = 0
+        books_processed = 0
+        books_visited = total_books - len(pending_books)
+        if progress:
+            progress(books_visited, total_books)
+
+        # Books finished by the resumed run come from the store, merged back in library order
+        if restored_books:
+            logger.info(f"Resuming scrape: {len(restored_books)} books already finished")
+            stored = await asyncio.to_thread(self.highlight_store.get_books, user_key, [asin for _, asin in restored_books])
+            records = {book.book_id: book for book in stored}
+            restored_books = [(i, records[asin]) for i, asin in restored_books if asin in records]
+
+        fetched_books = self._fetch_books(context, page, pending_books, total_books, concurrency, extraction, timer, profile)
+        async for i, book_info, annotations_data, error in fetched_books:
+            while restored_books and restored_books[0][0] < i:
+                book = restored_books.pop(0)[1]
+                changed_books.append(book.book_id)
+                total_highlights += len(book.highlights)
+                books_processed += 1
+                yield book
+
+            books_visited += 1
+            if progress:
+                progress(books_visited, total_books)
+
+            book_id = book_info['id']
+            if error is not None:
+                logger.error(f"Giving up on book {i+1} after {error['attempts']} attempts: {book_info['title']} ({error['error']})")
+                failed_books.append({"book_id": book_id, "book_title": book_info['title'], **error})
+                await asyncio.to_thread(self.highlight_store.record_run_book, run_token, book_id, "failed", error['error'], error['attempts'])
+                continue
+
+            book_title = book_info['title']
+            logger.info(f"Found {len(annotations_data['annotations'])} highlights for book: {book_title}")
+            
+            highlight_date = None
+            date_text = None
+            if annotations_data['date']:
+                date_text = annotations_data['date'].strip()
+                highlight_date = self._parse_date(date_text)
+                logger.debug(f"Extracted date: {date_text} -> {highlight_date}")
+            
+            highlight_items = self._build_highlight_items(annotations_data['annotations'])
+            
+            book_highlight = BookRecord(
+                book_id=book_id,
+                book_title=book_title,
+                book_author=book_info['authors'],
+                book_cover=book_info['cover'],
+                highlights=highlight_items,
+                date=highlight_date
+            )
+
+            fingerprint = self.highlight_store.fingerprint(date_text, len(highlight_items))
+            if annotations_data.get('truncated'):
+                # Stored without its change markers, so the next incremental run opens the book again
+                logger.warning(f"Book {i+1} was only partially loaded: {book_title}")
+                await asyncio.to_thread(self.highlight_store.save_book, user_key, book_highlight, None, None)
+            else:
+                await asyncio.to_thread(self.highlight_store.save_book, user_key, book_highlight, book_info['annotated_date'], fingerprint)
+            known = known_books.get(book_id)
+            if incremental and known and known['fingerprint'] == fingerprint:
+                logger.info(f"Book {i+1} has no new annotations: {book_title}")
+                await asyncio.to_thread(self.highlight_store.record_run_book, run_token, book_id, "unchanged")
+                unchanged_books.append(book_id)
+                continue
+
+            await asyncio.to_thread(self.highlight_store.record_run_book, run_token, book_id, "changed")
+            changed_books.append(book_id)
+            total_highlights += len(highlight_items)
+            books_processed += 1
+            logger.info(f"Completed processing book {i+1}: {book_title} ({len(highlight_items)} highlights)")
+            yield book_highlight
+
+        for _, book in restored_books:
+            changed_books.append(book.book_id)
+            total_highlights += len(book.highlights)
+            books_processed += 1
+            yield book
+
+        if failed_books:
+            logger.warning(f"Scraping finished with {len(failed_books)} failed books; journal kept for resuming")
+            if meta is not None:
+                meta["partial"] = True
+        else:
+            await asyncio.to_thread(self.highlight_store.finish_run, run_token)
+            if meta is not None:
+                del meta["resume_token"], meta["errors"]
+
+        logger.info(f"Scraping completed successfully. Total highlights: {total_highlights} from {books_processed} books")
+
+        if incremental and meta is not None:
+            meta.update({
+                "incremental": True,
+                "changed": changed_books,
+                "unchanged": unchanged_books,
+                "removed": removed_books
+            })
+            logger.info(f"Incremental sync: {len(changed_books)} changed, {len(unchanged_books)} unchanged, {len(removed_books)} removed")
+
+    @staticmethod
+    def run_options(incremental: bool, book_filter: Optional[BookFilter] = None) -> str:
+        """What a scrape journal covers: the incremental flag and the book selection (projection does not matter)"""
+        selection = {name: value for name, value in (book_filter or BookFilter()).options().items() if name != "fields"}
+        return json.dumps({"incremental": bool(incremental), **selection}, sort_keys=True)
+
+    def _matching_books(self, book_data: List[Dict[str, Any]], book_filter: BookFilter) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Lazily yield (index, book_info) of the library books the filter matches"""
+        for i, book_info in enumerate(book_data):
+            annotated_on = self._parse_day(book_info['annotated_date']) if book_filter.annotated_since else None
+            if book_filter.matches(book_info['id'], book_info['title'], annotated_on):
+                yield i, book_info
+
+    async def _open_notebook_page(self, context, worker_id: int, profile: HumanizationProfile):
+        """Open another notebook tab in the logged-in context and wait for the library"""
+        delay = profile.delay(0.5 * worker_id, 1.5 * worker_id)
+        logger.debug(f"Waiting {delay:.2f}s before opening notebook page {worker_id + 1}")
+        await asyncio.sleep(delay)
+
+        page = await context.new_page()
+        await page.goto(self.kindle_notebook_url)
+        async with self.waits.wait("library", self.library_timeout) as timeout:
+            await page.wait_for_selector('.kp-notebook-library-each-book', timeout=timeout)
+        logger.debug(f"Notebook page {worker_id + 1} ready")
+        return page
+
+    async def _recover_page(self, context, page):
+        """Bring a page back to the notebook library after a failed book, replacing it if it crashed"""
+        if page.is_closed():
+            page = await context.new_page()
+        await page.goto(self.kindle_notebook_url)
+        async with self.waits.wait("library", self.library_timeout) as timeout:
+            await page.wait_for_selector('.kp-notebook-library-each-book', timeout=timeout)
+        return page
+
+    async def _fetch_books(
+        self,
+        context,
+        page,
+        pending_books: List[Tuple[int, Dict[str, Any]]],
+        total_books: int,
+        concurrency: int,
+        extraction: str = "dom",
+        timer: Optional[PhaseTimer] = None,
+        profile: Optional[HumanizationProfile] = None
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """Open each pending book and yield (index, book_info, annotations_data, error) in library order
+        
+        With concurrency > 1 the books are spread across several pages of the same context,
+        which share the login cookies. Results are buffered so they still come out in order.
+        A book that fails is retried up to BOOK_MAX_ATTEMPTS times with backoff, on a page
+        reloaded to the library; if it never succeeds, error is {"error", "attempts"}.
+        """
+        timer = timer or PhaseTimer()
+        profile = profile or HumanizationProfile.preset()
+        pages = [page]
+
+        async def fetch(worker_id: int, book_info: Dict[str, Any], i: int) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+            for attempt in range(1, self.book_max_attempts + 1):
+                try:
+                    with timer.phase("book"):
+                        annotations_data = await self._fetch_book(pages[worker_id], book_info, i, total_books, extraction, profile)
+                    if annotations_data is not None:
+                        return annotations_data, None
+                    error = "Book could not be opened from the library list"
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+
+                if attempt == self.book_max_attempts:
+                    return None, {"error": error, "attempts": attempt}
+                metrics.BOOK_RETRIES.inc()
+                backoff = self.book_retry_backoff * 2 ** (attempt - 1)
+                logger.warning(f"Attempt {attempt} for book {i+1} failed ({error}); retrying in {backoff:g}s")
+                await asyncio.sleep(backoff)
+                # A page that cannot even be reloaded means the browser is gone, which ends the run
+                pages[worker_id] = await self._recover_page(context, pages[worker_id])
+
+        workers = max(1, min(concurrency, len(pending_books)))
+        if workers == 1:
+            for i, book_info in pending_books:
+                yield (i, book_info, *await fetch(0, book_info, i))
+            return
+
+        logger.info(f"Processing {len(pending_books)} books on {workers} pages")
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in pending_books:
+            queue.put_nowait(item)
+        loop = asyncio.get_running_loop()
+        results = {i: loop.create_future() for i, _ in pending_books}
+        pages.extend([None] * (workers - 1))
+
+        async def worker(worker_id: int):
+            if worker_id > 0:
+                pages[worker_id] = await self._open_notebook_page(context, worker_id, profile)
+            while True:
+                try:
+                    i, book_info = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results[i].set_result(await fetch(worker_id, book_info, i))
+                except Exception as e:
+                    results[i].set_exception(e)
+
+        tasks = [asyncio.create_task(worker(worker_id)) for worker_id in range(workers)]
+        try:
+            for i, book_info in pending_books:
+                while not results[i].done():
+                    running = [task for task in tasks if not task.done()]
+                    if not running:
+                        # Every worker died (e.g. a page failed to open) before reaching this book
+                        raise next((task.exception() for task in tasks if task.exception()), None) or RuntimeError("Book workers stopped early")
+                    await asyncio.wait([results[i], *running], return_when=asyncio.FIRST_COMPLETED)
+                yield (i, book_info, *results[i].result())
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for future in results.values():
+                if future.done() and not future.cancelled():
+                    future.exception()
+            for extra_page in pages[1:]:
+                if extra_page is None:
+                    continue
+                try:
+                    await extra_page.close()
+                except Exception as e:
+                    logger.debug(f"Error closing notebook page: {e}")
+
+    async def _click_book(self, page, book_id: str, profile: HumanizationProfile) -> bool:
+        """Scroll a book into view in the library list and click it like a user would"""
+        await page.evaluate(f"""
+            const book = document.querySelector('#{book_id}');
+            const scroller = document.querySelector('.a-scroller.kp-notebook-scroller-addon.a-scroller-vertical');
+            if (book && scroller) {{
+                const bookRect = book.getBoundingClientRect();
+                const scrollerRect = scroller.getBoundingClientRect();
+                const offset = bookRect.top - scrollerRect.top + scroller.scrollTop - 50;
+                scroller.scrollTop = Math.max(0, offset);
+            }}
+        """)
+        
+        await profile.pause(0.3, 0.8)
+        
+        action_selector = f'#{book_id} span[data-action="get-annotations-for-asin"]'
+        action_element = await page.query_selector(action_selector)
+        if action_element:
+            delay = profile.delay(0.5, 1.5)
+            logger.debug(f"Waiting {delay:.2f}s before clicking book action span")
+            await asyncio.sleep(delay)
+            await human_click(page, action_element, profile)
+            logger.debug(f"Successfully clicked action span for {book_id}")
+            return True
+
+        book_element = await page.query_selector(f'#{book_id}')
+        if book_element:
+            delay = profile.delay(0.5, 1.5)
+            await asyncio.sleep(delay)
+            await human_click(page, book_element, profile)
+            logger.debug(f"Successfully clicked book container for {book_id}")
+            return True
+
+        logger.warning(f"Could not find any clickable element for book {book_id}")
+        return False
+
+    async def _fetch_book(self, page, book_info: Dict[str, Any], i: int, total_books: int, extraction: str = "dom", profile: Optional[HumanizationProfile] = None) -> Optional[Dict[str, Any]]:
+        """Click a book in the library and read all of its annotations
+        
+        In "dom" mode the rendered annotations pane is read once it shows the book. In "network"
+        mode the annotations fragment is taken from the notebook's own response to the
+        click and parsed in Python, without waiting for layout and paint.
+        Returns:
+            The annotations data (see ANNOTATIONS_SCRIPT), or None if the book could not be opened.
+        """
+        profile = profile or HumanizationProfile.preset()
+        book_id = book_info['id']
+        authors_str = ", ".join(book_info['authors'])
+        logger.info(f"Processing book {i+1}/{total_books}: {book_info['title']} by {authors_str}")
+
+        if extraction == "network":
+            # Listen before clicking so the response cannot be missed, but only time the wait from the click on:
+            # the humanization pauses of the click are not network latency
+            response_waiter = asyncio.ensure_future(page.wait_for_event(
+                "response",
+                predicate=lambda response: f"asin={book_id}" in response.url,
+                timeout=0
+            ))
+            try:
+                if not await self._click_book(page, book_id, profile):
+                    return None
+                async with self.waits.wait("annotations_response", self.annotations_timeout) as timeout:
+                    response = await asyncio.wait_for(response_waiter, timeout / 1000)
+            finally:
+                response_waiter.cancel()
+            logger.debug(f"Captured annotations response for {book_id} (HTTP {response.status})")
+            self._check_annotations_response(response, book_id)
+            annotations_data = parse_annotations_html(await response.text())
+        else:
+            if not await self._click_book(page, book_id, profile):
+                return None
+            
+            # The pane keeps the previous book's rows until the new one arrives, so wait for its ASIN rather than for any row
+            logger.debug("Waiting for highlights to load")
+            async with self.waits.wait("annotations", self.annotations_timeout) as timeout:
+                await page.wait_for_function(ANNOTATIONS_FOR_ASIN_SCRIPT, arg=book_id, timeout=timeout)
+            
+            # The pane can keep rendering rows after it is swapped in; wait for it to stop changing
+            async with self.waits.wait("settle", self.settle_timeout) as timeout:
+                settled_ms = await page.evaluate(ANNOTATIONS_SETTLED_SCRIPT, [self.waits.dom_quiet, timeout])
+            logger.debug(f"Annotations pane settled after {settled_ms}ms")
+            
+            annotations_data = await page.evaluate(ANNOTATIONS_SCRIPT)
+            if not annotations_data['annotations']:
+                logger.info(f"Book {book_id} has no highlights")
+
+        await self._fetch_remaining_annotation_pages(page, book_id, annotations_data)
+        return annotations_data
+
+    def _check_annotations_response(self, response, book_id: str):
+        """Reject error statuses and redirects to sign-in, which would otherwise parse as an empty book
+        Raises:
+            AnnotationsResponseError: The response does not hold the book's annotations
+        """
+        if not response.ok or "/ap/signin" in response.url:
+            raise AnnotationsResponseError(book_id, response.status, response.url)
+
+    async def _fetch_remaining_annotation_pages(self, page, book_id: str, annotations_data: Dict[str, Any]):
+        """Follow the notebook's next-page token until every annotation of a long book is loaded
+
+        If pagination has to stop early, annotations_data["truncated"] is set.
+        """
+        pages = 1
+        seen_tokens = set()
+        while annotations_data.get('next_page_token'):
+            token = annotations_data['next_page_token']
+            if token in seen_tokens or pages >= self.annotations_max_pages:
+                logger.warning(f"Stopping annotation pagination for {book_id} after {pages} pages")
+                annotations_data['truncated'] = True
+                break
+            seen_tokens.add(token)
+
+            query = urllib.parse.urlencode({
+                "asin": book_id,
+                "token": token,
+                "contentLimitState": annotations_data.get('content_limit_state') or ""
+            })
+            async with self.waits.wait("annotations_page", self.annotations_timeout) as timeout:
+                response = await page.request.get(f"{self.kindle_notebook_url}?{query}", timeout=timeout)
+            self._check_annotations_response(response, book_id)
+            next_page = parse_annotations_html(await response.text())
+            annotations_data['annotations'].extend(next_page['annotations'])
+            annotations_data['next_page_token'] = next_page['next_page_token']
+            annotations_data['content_limit_state'] = next_page['content_limit_state']
+            pages += 1
+
+        if pages > 1:
+            logger.info(f"Loaded {len(annotations_data['annotations'])} annotations for {book_id} across {pages} pages")
@@ -0,0 +1,109 @@
+from typing import Any, Dict, List, Optional
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_TYPES = "image,media,font"
+DEFAULT_BLOCK_PATTERNS = (
+    "fls-na.amazon.com,unagi.amazon.com,unagi-na.amazon.com,amazon-adsystem.com,"
+    "google-analytics.com,googletagmanager.com,doubleclick.net,/uedata,/rd/uedata"
+)
+# Sign-in challenges are rendered with images from these hosts and must keep working
+DEFAULT_ALLOW_PATTERNS = "arkoselabs.com,funcaptcha.com,captcha,/ap/cvf"
+
+# Rough transfer size of a blocked request, by resource type, used to estimate bytes saved
+ESTIMATED_BYTES = {
+    "image": 25_000,
+    "media": 250_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 40_000,
+}
+DEFAULT_ESTIMATED_BYTES = 2_000
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class RequestFilterStats:
+    """Blocked and allowed request counters for one browser context"""
+
+    def __init__(self):
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.bytes_received = 0
+        self.bytes_saved_estimate = 0
+
+    def record_blocked(self, resource_type: str):
+        self.blocked += 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        self.bytes_saved_estimate += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+
+    def record_response(self, response):
+        content_length = response.headers.get("content-length")
+        if content_length and content_length.isdigit():
+            self.bytes_received += int(content_length)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "blocked_by_type": self.blocked_by_type,
+            "bytes_received": self.bytes_received,
+            "bytes_saved_estimate": self.bytes_saved_estimate
+        }
+
+
+class RequestFilter:
+    """Aborts requests the scraper never reads (images, fonts, media, trackers) in a browser context.
+
+    Requests are blocked by Playwright resource type or by a URL substring, unless the URL
+    matches the allowlist, which keeps sign-in challenges renderable. Only the cover image
+    URL is read from the notebook, so its images are never needed.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        block_types: Optional[List[str]] = None,
+        block_patterns: Optional[List[str]] = None,
+        allow_patterns: Optional[List[str]] = None
+    ):
+        self.enabled = enabled if enabled is not None else os.getenv("REQUEST_BLOCKING_ENABLED", "True") == "True"
+        self.block_types = set(block_types if block_types is not None else _split(os.getenv("REQUEST_BLOCK_TYPES", DEFAULT_BLOCK_TYPES)))
+        self.block_patterns = block_patterns if block_patterns is not None else _split(os.getenv("REQUEST_BLOCK_PATTERNS", DEFAULT_BLOCK_PATTERNS))
+        self.allow_patterns = allow_patterns if allow_patterns is not None else _split(os.getenv("REQUEST_ALLOW_PATTERNS", DEFAULT_ALLOW_PATTERNS))
+        logger.info(f"RequestFilter initialized (enabled={self.enabled}, block_types={sorted(self.block_types)})")
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        if any(pattern in url for pattern in self.allow_patterns):
+            return False
+        if resource_type in self.block_types:
+            return True
+        return any(pattern in url for pattern in self.block_patterns)
+
+    async def install(self, context) -> Optional[RequestFilterStats]:
+        """Route every request of the context through the filter
+        Returns:
+            The counters for this context, or None when blocking is disabled.
+        """
+        if not self.enabled:
+            return None
+
+        stats = RequestFilterStats()
+
+        async def handle(route):
+            request = route.request
+            if self.should_block(request.url, request.resource_type):
+                stats.record_blocked(request.resource_type)
+                await route.abort("blockedbyclient")
+            else:
+                stats.allowed += 1
+                await route.continue_()
+
+        await context.route("**/*", handle)
+        context.on("response", stats.record_response)
+        return stats
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResult:
+    """A serialized /kindle/highlights response body and its ETag"""
+
+    def __init__(self, etag: str, body: bytes, created_at: float):
+        self.etag = etag
+        self.body = body
+        self.created_at = created_at
+
+    @property
+    def age(self) -> int:
+        return max(0, int(time.time() - self.created_at))
+
+
+class MemoryResultBackend:
+    """In-process LRU of cached results"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResult):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLiteResultBackend:
+    """Cached results in a SQLite file, shared by every worker process on the host"""
+
+    def __init__(self, db_path: str, max_entries: int):
+        self.max_entries = max_entries
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                etag TEXT NOT NULL,
+                body BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT etag, body, created_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return CachedResult(row[0], bytes(row[1]), row[2])
+
+    def set(self, key: str, entry: CachedResult):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, etag, body, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, entry.etag, entry.body, entry.created_at, time.time())
+            )
+            self._conn.execute(
+                "DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+
+class ResultCacheService:
+    """Caches full highlight responses per account so repeated polls skip the browser.
+
+    Entries are keyed by a hash of the credentials and the options that change the result,
+    expire after a TTL and are evicted least recently used beyond max_entries. The ETag
+    is computed from the returned books only, so it stays the same while the library
+    does not change even though run metadata (timings, counters) differs.
+    """
+
+    def __init__(self, backend: Optional[str] = None, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.backend_name = backend or os.getenv("RESULT_CACHE_BACKEND", "memory")
+        self.ttl = ttl if ttl is not None else float(os.getenv("RESULT_CACHE_TTL_SECONDS", "300"))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "100"))
+        self.enabled = self.backend_name != "none" and self.ttl > 0
+
+        self._backend = None
+        if self.enabled:
+            if self.backend_name == "sqlite":
+                self._backend = SQLiteResultBackend(os.getenv("RESULT_CACHE_PATH", ".cache/results.db"), self.max_entries)
+            elif self.backend_name == "memory":
+                self._backend = MemoryResultBackend(self.max_entries)
+            else:
+                raise ValueError(f"Unknown RESULT_CACHE_BACKEND: {self.backend_name}")
+
+        logger.info(f"ResultCacheService initialized (backend={self.backend_name}, ttl={self.ttl}s, max_entries={self.max_entries})")
+
+    @staticmethod
+    def key(credential_key: str, **options) -> str:
+        raw = json.dumps({"credentials": credential_key, **options}, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def etag(data_json: bytes) -> str:
+        """ETag of the encoded "data" of a response"""
+        digest = hashlib.sha256(data_json).hexdigest()
+        return f'"{digest[:32]}"'
+
+    @staticmethod
+    def matches(if_none_match: Optional[str], etag: str) -> bool:
+        """Evaluate an If-None-Match header against an ETag (weak comparison)"""
+        if not if_none_match:
+            return False
+        candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+        return "*" in candidates or etag in [candidate.removeprefix("W/") for candidate in candidates]
+
+    def cache_control(self) -> str:
+        if not self.enabled:
+            return "private, no-cache"
+        return f"private, max-age={int(self.ttl)}"
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        if not self.enabled:
+            return None
+        entry = self._backend.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.created_at > self.ttl:
+            self._backend.delete(key)
+            return None
+        return entry
+
+    def set(self, key: str, body: bytes, data_json: bytes) -> CachedResult:
+        """Store a response body and return the cached entry, tagged from the body's encoded data"""
+        entry = CachedResult(self.etag(data_json), body, time.time())
+        if self.enabled:
+            self._backend.set(key, entry)
+        return entry
+
+    def invalidate(self, key: str):
+        if self.enabled:
+            self._backend.delete(key)
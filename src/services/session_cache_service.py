@@ -0,0 +1,133 @@
+import base64
+import json
+import os
+import time
+import logging
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SessionCacheService:
+    """Encrypted on-disk cache of Playwright storage_state, keyed by a credential key.
+
+    The key is `credential_key(email, password)`, so a cached session is only reused by
+    callers presenting the password it was created with. Entries expire after a TTL and
+    the least recently used ones are evicted once the cache holds more than max_entries.
+    Recency is tracked with the file mtime, which is bumped on every successful load.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.cache_dir = cache_dir or os.getenv("SESSION_CACHE_DIR", ".cache/sessions")
+        self.ttl = ttl if ttl is not None else float(os.getenv("SESSION_CACHE_TTL_SECONDS", "43200"))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "100"))
+        self.enabled = os.getenv("SESSION_CACHE_ENABLED", "True") == "True"
+        self._aesgcm = None
+
+        if self.enabled:
+            key = self._load_key()
+            if key is None:
+                logger.warning("No SESSION_CACHE_KEY or PRIVATE_KEY available, session cache disabled")
+                self.enabled = False
+            else:
+                self._aesgcm = AESGCM(key)
+                os.makedirs(self.cache_dir, exist_ok=True)
+
+        logger.info(f"SessionCacheService initialized (enabled={self.enabled}, dir={self.cache_dir}, ttl={self.ttl}s)")
+
+    def _load_key(self) -> Optional[bytes]:
+        """Use SESSION_CACHE_KEY (base64, 32 bytes) or derive a key from PRIVATE_KEY"""
+        key_b64 = os.getenv("SESSION_CACHE_KEY")
+        if key_b64:
+            return base64.b64decode(key_b64)
+
+        private_key_b64 = os.getenv("PRIVATE_KEY")
+        if not private_key_b64:
+            return None
+
+        return HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"paper-orbit-session-cache",
+        ).derive(private_key_b64.encode("utf-8"))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.session")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached storage_state for the credential key, or None if missing or expired"""
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            logger.debug("No cached session for account")
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+            decrypted = self._aesgcm.decrypt(blob[:12], blob[12:], key.encode("utf-8"))
+            entry = json.loads(decrypted.decode("utf-8"))
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cached session: {e}")
+            self.invalidate(key)
+            return None
+
+        age = time.time() - entry.get("saved_at", 0)
+        if self.ttl and age > self.ttl:
+            logger.info(f"Cached session expired ({age:.0f}s old)")
+            self.invalidate(key)
+            return None
+
+        os.utime(path)
+        logger.info(f"Using cached session ({age:.0f}s old)")
+        return entry["storage_state"]
+
+    def save(self, key: str, storage_state: Dict[str, Any]):
+        """Encrypt and persist the storage_state, then evict least recently used entries"""
+        if not self.enabled:
+            return
+
+        payload = json.dumps({"saved_at": time.time(), "storage_state": storage_state}).encode("utf-8")
+        nonce = os.urandom(12)
+        blob = nonce + self._aesgcm.encrypt(nonce, payload, key.encode("utf-8"))
+
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+        logger.info("Session saved to cache")
+
+        self._evict()
+
+    def invalidate(self, key: str):
+        try:
+            os.remove(self._path(key))
+            logger.info("Cached session invalidated")
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        if not self.max_entries:
+            return
+        entries = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(".session")
+        ]
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+                logger.debug(f"Evicted cached session {os.path.basename(path)}")
+            except FileNotFoundError:
+                pass
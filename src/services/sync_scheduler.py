@@ -0,0 +1,168 @@
+import asyncio
+import os
+import random
+import time
+import logging
+from typing import Any, Dict, List, Optional, Set
+from src.services.kindle_scraper_service import KindleScraperService, ChallengeDetectedError
+from src.services.highlight_store_service import HighlightStoreService
+from src.services.crypto_service import CryptoService
+from src.services.admission_controller import AdmissionRejectedError
+from src.utils.schedule import Schedule
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SyncScheduler:
+    """Re-syncs registered accounts into the highlight store in the background.
+
+    Accounts are registered with an interval or cron schedule and their credentials
+    sealed in a v1 envelope, so no plaintext password is stored. A polling loop starts
+    due runs with random jitter added to each next run time and at most `concurrency`
+    runs at once. Runs are incremental, so only changed books are opened and the store
+    always holds the whole library for reads.
+    """
+
+    def __init__(
+        self,
+        scraper: KindleScraperService,
+        store: HighlightStoreService,
+        crypto: CryptoService,
+        concurrency: Optional[int] = None,
+        jitter: Optional[float] = None,
+        poll_interval: Optional[float] = None
+    ):
+        self.scraper = scraper
+        self.store = store
+        self.crypto = crypto
+        self.enabled = os.getenv("SYNC_ENABLED", "True") == "True"
+        self.concurrency = concurrency or int(os.getenv("SYNC_CONCURRENCY", "1"))
+        self.jitter = jitter if jitter is not None else float(os.getenv("SYNC_JITTER_SECONDS", "300"))
+        self.poll_interval = poll_interval if poll_interval is not None else float(os.getenv("SYNC_POLL_SECONDS", "30"))
+        self.min_interval = int(os.getenv("SYNC_MIN_INTERVAL_SECONDS", "900"))
+        self.scrape_options = {
+            "concurrency": int(os.getenv("BOOK_CONCURRENCY", "1")),
+            "extraction": os.getenv("EXTRACTION_MODE", "dom"),
+        }
+
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._loop_task: Optional[asyncio.Task] = None
+        logger.info(f"SyncScheduler configured with enabled={self.enabled}, concurrency={self.concurrency}, jitter={self.jitter}s")
+
+    async def start(self):
+        if not self.enabled or self._loop_task is not None:
+            return
+        self._loop_task = asyncio.create_task(self._loop())
+        logger.info("Sync scheduler started")
+
+    async def stop(self):
+        tasks: List[asyncio.Task] = list(self._tasks)
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+            self._loop_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        logger.info("Sync scheduler stopped")
+
+    def _next_run(self, schedule: Schedule, after: float) -> float:
+        # Never sooner than min_interval, even for a schedule stored before the floor applied to it
+        return max(schedule.next_after(after), after + self.min_interval) + random.uniform(0, self.jitter)
+
+    def register(self, account_key: str, credential_key: str, email: str, password: str, schedule: Schedule) -> Dict[str, Any]:
+        """Register or update an account; its first run is due within the jitter window"""
+        envelope = self.crypto.encrypt_credentials({"email": email, "password": password})
+        self.store.save_sync_account(account_key, credential_key, envelope, str(schedule), time.time() + random.uniform(0, self.jitter))
+        logger.info(f"Account registered for scheduled sync ({schedule})")
+        return self.status(account_key)
+
+    def unregister(self, account_key: str):
+        self.store.delete_sync_account(account_key)
+        logger.info("Account removed from scheduled sync")
+
+    def status(self, account_key: str) -> Optional[Dict[str, Any]]:
+        account = self.store.get_sync_account(account_key)
+        if account is None:
+            return None
+        return {
+            "schedule": account["schedule"],
+            "next_run_at": account["next_run_at"],
+            "last_run_at": account["last_run_at"],
+            "last_status": account["last_status"],
+            "last_error": account["last_error"],
+            "last_duration_seconds": account["last_duration"],
+            "running": account_key in self._running,
+            "synced_at": self.store.get_synced_at(account_key),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "accounts": self.store.count_sync_accounts(),
+            "running": len(self._running),
+            "concurrency": self.concurrency,
+        }
+
+    async def _loop(self):
+        while True:
+            try:
+                await self._start_due_runs()
+            except Exception as e:
+                logger.error(f"Error starting scheduled syncs: {e}", exc_info=True)
+            await asyncio.sleep(self.poll_interval)
+
+    async def _start_due_runs(self):
+        now = time.time()
+        for account in await asyncio.to_thread(self.store.due_sync_accounts, now):
+            key = account["account_key"]
+            if key in self._running:
+                continue
+            try:
+                # Book the next run right away so a slow run is not picked up again by the next poll
+                next_run_at = self._next_run(Schedule.parse(account["schedule"]), now)
+                await asyncio.to_thread(self.store.schedule_sync, key, next_run_at)
+            except Exception as e:
+                # One unusable row (e.g. a cron that never fires) must not keep the accounts after it from syncing
+                logger.error(f"Cannot schedule sync '{account['schedule']}': {e}")
+                await asyncio.to_thread(self.store.schedule_sync, key, now + self.min_interval)
+                await asyncio.to_thread(self.store.record_sync_run, key, "invalid", str(e), now, 0.0)
+                continue
+            self._running.add(key)
+            task = asyncio.create_task(self._run(account))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, account: Dict[str, Any]):
+        key = account["account_key"]
+        started_at = time.time()
+        status, error = "completed", None
+        try:
+            async with self._semaphore:
+                credentials = self.crypto.decrypt_credentials(account["envelope"])
+                logger.info("Scheduled sync started")
+                result = await self.scraper.scrape(
+                    credentials["email"], credentials["password"], headless=True, manual_puzzle=False, incremental=True,
+                    **self.scrape_options
+                )
+                logger.info(f"Scheduled sync completed ({len(result['books'])} changed books)")
+                if result["meta"].get("partial"):
+                    # Failed books keep their old annotated date in the store, so the next run retries them
+                    status, error = "partial", f"{len(result['meta']['errors'])} books failed"
+        except asyncio.CancelledError:
+            status, error = "cancelled", None
+            raise
+        except ChallengeDetectedError as e:
+            status, error = "challenge", f"Sign-in challenge: {e.challenge_type}"
+        except AdmissionRejectedError as e:
+            status, error = "rejected", str(e)
+        except Exception as e:
+            status, error = "failed", str(e)
+            logger.error(f"Scheduled sync failed: {e}", exc_info=True)
+        finally:
+            self._running.discard(key)
+            metrics.SYNC_RUNS.inc(status=status)
+            await asyncio.to_thread(self.store.record_sync_run, key, status, error, started_at, time.time() - started_at)
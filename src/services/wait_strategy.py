@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class WaitStrategy:
+    """Timeouts for page waits, learned from how long the same waits took before.
+
+    Each wait phase (session check, sign-in, library, annotations, ...) keeps a rolling
+    window of observed latencies. Once a phase has enough samples its timeout is the
+    window's p95 times a multiplier, clamped to [WAIT_MIN_TIMEOUT_MS, WAIT_MAX_TIMEOUT_MS];
+    until then the configured default is used. A wait that times out is recorded at its
+    timeout, so a slow site pushes the p95, and the next timeout, up. The windows are
+    saved to WAIT_STATS_PATH so restarts keep what was learned.
+    """
+
+    def __init__(self, stats_path: Optional[str] = None):
+        self.enabled = os.getenv("WAIT_ADAPTIVE", "True") == "True"
+        self.stats_path = stats_path if stats_path is not None else os.getenv("WAIT_STATS_PATH", ".cache/wait_stats.json")
+        self.window = int(os.getenv("WAIT_WINDOW", "200"))
+        self.min_samples = int(os.getenv("WAIT_MIN_SAMPLES", "10"))
+        self.multiplier = float(os.getenv("WAIT_TIMEOUT_MULTIPLIER", "3"))
+        self.min_timeout = float(os.getenv("WAIT_MIN_TIMEOUT_MS", "2000"))
+        self.max_timeout = float(os.getenv("WAIT_MAX_TIMEOUT_MS", "120000"))
+        self.dom_quiet = float(os.getenv("WAIT_DOM_QUIET_MS", "100"))
+
+        self._samples: Dict[str, Deque[float]] = {}
+        self._defaults: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+        logger.info(f"WaitStrategy configured with enabled={self.enabled}, multiplier={self.multiplier}, stats_path={self.stats_path or None}")
+
+    def _load(self):
+        if not self.stats_path or not os.path.exists(self.stats_path):
+            return
+        try:
+            with open(self.stats_path, encoding="utf-8") as f:
+                stored = json.load(f)
+            for phase, samples in stored.items():
+                self._samples[phase] = deque((float(sample) for sample in samples), maxlen=self.window)
+            logger.info(f"Loaded wait latencies for {len(self._samples)} phases")
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable wait stats at {self.stats_path}: {e}")
+
+    def save(self):
+        """Write the latency windows to disk if they changed since the last save"""
+        if not self.stats_path or not self._dirty:
+            return
+        with self._lock:
+            snapshot = {phase: list(samples) for phase, samples in self._samples.items()}
+            self._dirty = False
+        try:
+            directory = os.path.dirname(self.stats_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = f"{self.stats_path}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(temporary, self.stats_path)
+        except OSError as e:
+            logger.warning(f"Could not save wait stats: {e}")
+
+    def record(self, phase: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(phase)
+            if samples is None:
+                samples = self._samples[phase] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._dirty = True
+
+    def p95(self, phase: str) -> Optional[float]:
+        """p95 latency of the phase in seconds, or None until it has WAIT_MIN_SAMPLES samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(phase, ()))
+        if len(samples) < max(1, self.min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def timeout(self, phase: str, default_ms: float) -> float:
+        """Timeout in ms for the next wait of the phase"""
+        self._defaults[phase] = default_ms
+        p95 = self.p95(phase) if self.enabled else None
+        if p95 is None:
+            return default_ms
+        return min(self.max_timeout, max(self.min_timeout, p95 * 1000 * self.multiplier))
+
+    @asynccontextmanager
+    async def wait(self, phase: str, default_ms: float) -> AsyncIterator[float]:
+        """Time a wait: yields its timeout in ms and records how long the block took"""
+        timeout = self.timeout(phase, default_ms)
+        started = time.perf_counter()
+        try:
+            yield timeout
+        except (PlaywrightTimeoutError, asyncio.TimeoutError):
+            logger.info(f"Wait '{phase}' timed out after {timeout:.0f}ms")
+            self.record(phase, timeout / 1000)
+            raise
+        self.record(phase, time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Samples, p95 and current timeout of every phase seen so far"""
+        result = {}
+        for phase in sorted(set(self._samples) | set(self._defaults)):
+            p95 = self.p95(phase)
+            result[phase] = {
+                "samples": len(self._samples.get(phase, ())),
+                "p95_seconds": round(p95, 3) if p95 is not None else None,
+                "timeout_ms": round(self.timeout(phase, self._defaults[phase])) if phase in self._defaults else None,
+            }
+        return result
@@ -0,0 +1,16 @@
+import hashlib
+
+
+def account_key(email: str) -> str:
+    """Stable, non-reversible identifier for an Amazon account"""
+    return hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()
+
+
+def credential_key(email: str, password: str) -> str:
+    """Identifier for an account and password pair, slow to brute-force if it leaks
+
+    Used wherever a result is shared between requests, so a caller only gets data
+    scraped with the same credentials it presented.
+    """
+    salt = account_key(email).encode("utf-8")
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 100_000).hex()
@@ -0,0 +1,140 @@
+"""Book selection and field projection for /kindle/highlights."""
+
+from datetime import date
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TypeVar
+from src.models.kindle_models import BookRecord
+
+BOOK_FIELDS = ("book_id", "book_title", "book_author", "book_cover", "highlights", "date")
+HIGHLIGHT_FIELDS = ("text", "note", "type", "page")
+
+T = TypeVar("T")
+
+
+def _parse_fields(fields: Optional[str]) -> Tuple[Optional[Tuple[str, ...]], Optional[Tuple[str, ...]]]:
+    """Resolve "a,b" (keep only these) or "-a,-b" (drop these) into the book and highlight fields to output"""
+    if not fields:
+        return None, None
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    dropped = [name[1:] for name in names if name.startswith("-")]
+    if dropped and len(dropped) != len(names):
+        raise ValueError("Param 'fields' must either list fields to keep or -fields to drop, not both")
+
+    chosen = set(dropped or names)
+    unknown = sorted(chosen - set(BOOK_FIELDS) - set(HIGHLIGHT_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(BOOK_FIELDS + HIGHLIGHT_FIELDS)})")
+
+    if dropped:
+        return (
+            tuple(name for name in BOOK_FIELDS if name not in chosen),
+            tuple(name for name in HIGHLIGHT_FIELDS if name not in chosen),
+        )
+
+    # Naming a highlight field implies the highlights list; naming only "highlights" keeps all of its fields
+    highlight_fields = tuple(name for name in HIGHLIGHT_FIELDS if name in chosen)
+    if highlight_fields:
+        chosen.add("highlights")
+    return tuple(name for name in BOOK_FIELDS if name in chosen), highlight_fields or HIGHLIGHT_FIELDS
+
+
+class BookFilter:
+    """Which books of the library a request wants, and which of their fields.
+
+    Books are matched by ASIN, case-insensitive title substring and minimum annotated
+    date, then paged with offset/limit in library order. The scraper picks the page
+    before opening any book, so books outside it are never clicked and the library
+    walk stops as soon as the page is full.
+    """
+
+    def __init__(
+        self,
+        asins: Optional[Iterable[str]] = None,
+        title: Optional[str] = None,
+        annotated_since: Optional[date] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        fields: Optional[str] = None
+    ):
+        self.asins = frozenset(asins) if asins else None
+        self.title = title.casefold() if title else None
+        self.annotated_since = annotated_since
+        self.limit = limit
+        self.offset = offset
+        self.fields = fields or None
+        self.book_fields, self.highlight_fields = _parse_fields(self.fields)
+
+    @classmethod
+    def parse(
+        cls,
+        asin: Optional[str] = None,
+        title: Optional[str] = None,
+        annotated_since: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        fields: Optional[str] = None
+    ) -> "BookFilter":
+        """Build a filter from the query params
+        Raises:
+            ValueError: A param is malformed
+        """
+        asins = [value.strip() for value in asin.split(",") if value.strip()] if asin else None
+
+        since = None
+        if annotated_since:
+            try:
+                since = date.fromisoformat(annotated_since)
+            except ValueError:
+                raise ValueError("Param 'annotated_since' must be a date (YYYY-MM-DD)")
+
+        if limit is not None and limit < 1:
+            raise ValueError("Param 'limit' must be at least 1")
+
+        if offset is not None and offset < 0:
+            raise ValueError("Param 'offset' must not be negative")
+
+        return cls(asins, title.strip() if title else None, since, limit, offset or 0, fields)
+
+    @property
+    def projects(self) -> bool:
+        return self.book_fields is not None
+
+    def options(self) -> Dict[str, Any]:
+        """The non-default options, e.g. to tell cached or shared results of different filters apart"""
+        options = {
+            "asin": sorted(self.asins) if self.asins else None,
+            "title": self.title,
+            "annotated_since": self.annotated_since.isoformat() if self.annotated_since else None,
+            "limit": self.limit,
+            "offset": self.offset or None,
+            "fields": self.fields,
+        }
+        return {name: value for name, value in options.items() if value is not None}
+
+    def matches(self, asin: Optional[str], title: Optional[str], annotated_on: Optional[date] = None) -> bool:
+        if self.asins is not None and asin not in self.asins:
+            return False
+        if self.title is not None and self.title not in (title or "").casefold():
+            return False
+        if self.annotated_since is not None and (annotated_on is None or annotated_on < self.annotated_since):
+            return False
+        return True
+
+    def page(self, matching: Iterable[T]) -> Tuple[List[T], bool]:
+        """Take offset/limit from lazily matched books; returns the page and whether more books match"""
+        if self.limit is None:
+            return list(islice(matching, self.offset, None)), False
+        selected = list(islice(matching, self.offset, self.offset + self.limit + 1))
+        return selected[:self.limit], len(selected) > self.limit
+
+    def project(self, book: BookRecord) -> Any:
+        """The book with only the requested fields (the record itself when there is no projection)"""
+        if self.book_fields is None:
+            return book
+        projected = {name: getattr(book, name) for name in self.book_fields}
+        if "highlights" in projected:
+            projected["highlights"] = [
+                {name: getattr(item, name) for name in self.highlight_fields} for item in book.highlights
+            ]
+        return projected
@@ -0,0 +1,168 @@
+"""Response compression negotiated through Accept-Encoding (zstd or gzip).
+
+zstd needs the optional zstandard package and is preferred when the client accepts
+both. Streamed responses are flushed chunk by chunk so NDJSON and exports still reach
+the client incrementally; Server-Sent Events, already encoded responses and small
+bodies are passed through untouched.
+"""
+
+import os
+import zlib
+from typing import List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SKIPPED_MEDIA_TYPES = ("text/event-stream", "application/vnd.apache.parquet")
+
+
+def parse_accept_encoding(header: str) -> List[Tuple[str, float]]:
+    """Return (coding, q) pairs from an Accept-Encoding header"""
+    codings = []
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings.append((coding.strip().lower(), q))
+    return codings
+
+
+def choose_encoding(header: Optional[str]) -> Optional[str]:
+    if not header:
+        return None
+    available = ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+    accepted = {coding: q for coding, q in parse_accept_encoding(header)}
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def add_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """Return headers with Accept-Encoding added to Vary, keeping the fields already listed"""
+    fields = []
+    for name, value in headers:
+        if name.lower() == b"vary":
+            fields.extend(field.strip() for field in value.decode("latin-1").split(",") if field.strip())
+    if "*" not in fields and "accept-encoding" not in (field.lower() for field in fields):
+        fields.append("Accept-Encoding")
+    return [(name, value) for name, value in headers if name.lower() != b"vary"] + [(b"vary", ", ".join(fields).encode("latin-1"))]
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, zstd_level: int):
+        if encoding == "zstd":
+            self._zstd = zstandard.ZstdCompressor(level=zstd_level).compressobj()
+            self._zlib = None
+        else:
+            self._zstd = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        """Compress a chunk; with flush=True everything written so far is made decodable"""
+        if self._zstd is not None:
+            out = self._zstd.compress(data)
+            return out + self._zstd.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else out
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        if self._zstd is not None:
+            return self._zstd.flush()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with the best encoding the client accepts"""
+
+    def __init__(self, app, minimum_size: Optional[int] = None, gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.enabled = os.getenv("COMPRESSION_ENABLED", "True") == "True"
+        self.minimum_size = minimum_size if minimum_size is not None else int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressingSender(send, encoding, self).send)
+
+
+class _CompressingSender:
+    def __init__(self, send, encoding: str, middleware: CompressionMiddleware):
+        self._send = send
+        self.encoding = encoding
+        self.middleware = middleware
+        self.start_message = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = {name.lower(): value for name, value in message.get("headers", [])}
+            media_type = headers.get(b"content-type", b"").decode("latin-1")
+            if (
+                b"content-encoding" in headers
+                or message["status"] in (204, 304)
+                or message["status"] < 200
+                or media_type.startswith(SKIPPED_MEDIA_TYPES)
+            ):
+                self.passthrough = True
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.zstd_level)
+            headers = add_vary([
+                (name, value) for name, value in self.start_message.get("headers", [])
+                if name.lower() != b"content-length"
+            ])
+            headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+
+            if not more_body:
+                compressed = self.compressor.compress(body, flush=False) + self.compressor.finish()
+                headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+                await self._send({**self.start_message, "headers": headers})
+                await self._send({"type": "http.response.body", "body": compressed, "more_body": False})
+                return
+
+            await self._send({**self.start_message, "headers": headers})
+
+        if more_body:
+            chunk = self.compressor.compress(body, flush=True)
+        else:
+            chunk = self.compressor.compress(body, flush=False) + self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
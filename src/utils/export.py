@@ -0,0 +1,140 @@
+"""Flat, row-per-highlight exports of scraped books (CSV, Arrow IPC, Parquet).
+
+Arrow and Parquet need the optional pyarrow package (`poetry install --with export`).
+CSV and Arrow IPC are written book by book, so the response starts before the whole
+library is encoded; Parquet keeps its metadata in a footer and is built in memory first.
+"""
+
+import csv
+import io
+from typing import Any, Dict, Iterable, Iterator, Optional
+from fastapi.responses import StreamingResponse
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+EXPORT_MEDIA_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+HIGHLIGHT_COLUMNS = ["book_id", "book_title", "book_author", "book_cover", "date", "position", "text", "note", "type", "page"]
+
+CHUNK_SIZE = 64 * 1024
+
+
+def export_unavailable(export_format: str) -> Optional[str]:
+    """Reason the format cannot be produced in this environment, or None"""
+    if export_format in ("arrow", "parquet") and pa is None:
+        return f"Format '{export_format}' requires the optional pyarrow package"
+    return None
+
+
+def iter_highlight_rows(book: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Flatten one book (as returned by Highlight.model_dump) into one row per highlight"""
+    for position, item in enumerate(book.get("highlights") or []):
+        yield {
+            "book_id": book.get("book_id"),
+            "book_title": book.get("book_title"),
+            "book_author": book.get("book_author") or [],
+            "book_cover": book.get("book_cover"),
+            "date": book.get("date"),
+            "position": position,
+            "text": item.get("text"),
+            "note": item.get("note"),
+            "type": item.get("type"),
+            "page": item.get("page"),
+        }
+
+
+def _csv_chunks(books: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HIGHLIGHT_COLUMNS)
+    for book in books:
+        for row in iter_highlight_rows(book):
+            row["book_author"] = "; ".join(row["book_author"])
+            writer.writerow([row[column] for column in HIGHLIGHT_COLUMNS])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _arrow_schema():
+    return pa.schema([
+        ("book_id", pa.string()),
+        ("book_title", pa.string()),
+        ("book_author", pa.list_(pa.string())),
+        ("book_cover", pa.string()),
+        ("date", pa.string()),
+        ("position", pa.int32()),
+        ("text", pa.string()),
+        ("note", pa.string()),
+        ("type", pa.string()),
+        ("page", pa.int64()),
+    ])
+
+
+def _record_batch(book: Dict[str, Any], schema):
+    rows = list(iter_highlight_rows(book))
+    return pa.RecordBatch.from_pylist(rows, schema=schema)
+
+
+def _arrow_chunks(books: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    schema = _arrow_schema()
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for book in books:
+            if not book.get("highlights"):
+                continue
+            writer.write_batch(_record_batch(book, schema))
+            if sink.tell() >= CHUNK_SIZE:
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+    yield sink.getvalue()
+
+
+def _parquet_chunks(books: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    schema = _arrow_schema()
+    batches = [_record_batch(book, schema) for book in books if book.get("highlights")]
+    sink = io.BytesIO()
+    pq.write_table(pa.Table.from_batches(batches, schema=schema), sink, compression="zstd")
+    data = sink.getvalue()
+    for start in range(0, len(data), CHUNK_SIZE):
+        yield data[start:start + CHUNK_SIZE]
+
+
+EXPORT_WRITERS = {
+    "csv": (_csv_chunks, "csv"),
+    "arrow": (_arrow_chunks, "arrow"),
+    "parquet": (_parquet_chunks, "parquet"),
+}
+
+
+def create_export_response(books: Iterable[Dict[str, Any]], export_format: str, filename: str = "highlights") -> StreamingResponse:
+    """
+    Stream books as a flat, row-per-highlight file.
+
+    Args:
+        books (Iterable): Books as dicts in the Highlight.model_dump() shape
+        export_format (str): "csv", "arrow" or "parquet"
+        filename (str): Download name without extension
+
+    Returns:
+        StreamingResponse: Response writing the file chunk by chunk
+    """
+    writer, extension = EXPORT_WRITERS[export_format]
+    return StreamingResponse(
+        writer(books),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'}
+    )
@@ -0,0 +1,181 @@
+"""Process-wide Prometheus metrics rendered in the text exposition format.
+
+Kept dependency-free: counters and histograms are plain dicts keyed by label values,
+which is all the /metrics endpoint needs for a single-process service.
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+RATE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = [(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for name, value in pairs]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._sums[key] = self._sums.get(key, 0) + value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, counts in sorted(self._counts.items()):
+                for bound, count in zip(self.buckets, counts):
+                    labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+                lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge whose values are read from a callback when metrics are rendered"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._callbacks: List[Callable[[], Dict[LabelValues, float]]] = []
+
+    def set_function(self, callback: Callable[[], Dict[LabelValues, float]]):
+        self._callbacks.append(callback)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for callback in self._callbacks:
+            for key, value in sorted(callback().items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics.setdefault(metric.name, metric)
+        return self._metrics[metric.name]
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+SCRAPE_DURATION = REGISTRY.histogram(
+    "kindle_scrape_duration_seconds", "Wall-clock duration of a whole scrape", ["status"]
+)
+PHASE_DURATION = REGISTRY.histogram(
+    "kindle_scrape_phase_seconds", "Duration of each scrape phase (launch, navigation, login, puzzle_probe, library, book)", ["phase"]
+)
+PHASE_FAILURES = REGISTRY.counter(
+    "kindle_scrape_failures_total", "Scrapes that failed, by the phase that raised", ["phase"]
+)
+BOOKS_SCRAPED = REGISTRY.counter("kindle_books_scraped_total", "Books returned by scrapes")
+HIGHLIGHTS_SCRAPED = REGISTRY.counter("kindle_highlights_scraped_total", "Highlights returned by scrapes")
+BOOK_RETRIES = REGISTRY.counter("kindle_book_retries_total", "Book fetches retried after a failed attempt")
+BOOKS_PER_SECOND = REGISTRY.histogram(
+    "kindle_scrape_books_per_second", "Books per second of each completed scrape", buckets=RATE_BUCKETS
+)
+HIGHLIGHTS_PER_SECOND = REGISTRY.histogram(
+    "kindle_scrape_highlights_per_second", "Highlights per second of each completed scrape", buckets=RATE_BUCKETS
+)
+CAPTCHA_HITS = REGISTRY.counter("kindle_captcha_detected_total", "Sign-ins answered with a challenge, by type (captcha, otp, puzzle, verification)", ["type"])
+POOL_WAIT = REGISTRY.histogram("browser_pool_wait_seconds", "Time spent waiting for a pooled browser")
+POOL_TIMEOUTS = REGISTRY.counter("browser_pool_timeouts_total", "Requests that gave up waiting for a pooled browser")
+POOL_STATE = REGISTRY.gauge("browser_pool_slots", "Pooled browsers by state", ["state"])
+JOB_QUEUE_DEPTH = REGISTRY.gauge("kindle_job_queue_depth", "Background jobs waiting for a worker")
+COALESCED_REQUESTS = REGISTRY.counter(
+    "kindle_coalesced_requests_total", "Scrape requests served by another request's scrape (in_flight or within the window)", ["state"]
+)
+SCRAPES_IN_FLIGHT = REGISTRY.gauge("kindle_scrapes_in_flight", "Distinct account scrapes currently running")
+CREDENTIAL_CACHE = REGISTRY.counter("credential_decryption_cache_total", "Encrypted credential lookups by cache result (hit, miss)", ["result"])
+SYNC_RUNS = REGISTRY.counter(
+    "kindle_sync_runs_total", "Scheduled sync runs by outcome (completed, partial, failed, challenge, rejected, cancelled)", ["status"]
+)
+WAIT_TIMEOUTS = REGISTRY.gauge("kindle_wait_timeout_seconds", "Current adaptive timeout of each page wait phase", ["phase"])
+ADMISSION_SLOTS = REGISTRY.gauge("kindle_admission_scrapes", "Scrapes by admission state (active, queued, capacity)", ["state"])
+ADMISSION_WAIT = REGISTRY.histogram("kindle_admission_wait_seconds", "Time scrapes waited in the admission queue")
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    "kindle_admission_rejections_total", "Scrapes refused by admission control (rate_limited, queue_full, queue_timeout, low_memory)", ["reason"]
+)
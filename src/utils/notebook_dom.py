@@ -0,0 +1,86 @@
+"""In-page extraction scripts for the Kindle notebook.
+
+Each script runs in a single page.evaluate call and returns plain JSON, so reading
+a whole library or a whole book costs one CDP round trip instead of several per
+element. Parsing of the returned strings stays in Python.
+"""
+
+# Returns [{id, title, author, cover, annotated_date}] for every book in the library list
+LIBRARY_SCRIPT = """
+() => Array.from(document.querySelectorAll('.kp-notebook-library-each-book')).map(book => {
+    const title = book.querySelector('h2.kp-notebook-searchable');
+    const author = book.querySelector('p.a-spacing-base.a-color-secondary');
+    const cover = book.querySelector('img.kp-notebook-cover-image');
+    const annotatedDate = book.querySelector('input[id^="kp-notebook-annotated-date"]');
+    return {
+        id: book.getAttribute('id'),
+        title: title ? title.innerText : null,
+        author: author ? author.innerText : null,
+        cover: cover ? cover.getAttribute('src') : null,
+        annotated_date: annotatedDate ? annotatedDate.getAttribute('value') : null
+    };
+})
+"""
+
+# Returns {date, annotations: [{header, text, note}], next_page_token, content_limit_state}
+# for the book open in the annotations pane
+ANNOTATIONS_SCRIPT = """
+() => {
+    const date = document.querySelector('span#kp-notebook-annotated-date');
+    const containers = document.querySelectorAll('#kp-notebook-annotations > div[id*="QTI"]');
+    const nextPage = document.querySelector('input.kp-notebook-annotations-next-page-start');
+    const limitState = document.querySelector('input.kp-notebook-content-limit-state');
+    return {
+        date: date ? date.innerText : null,
+        next_page_token: nextPage && nextPage.value ? nextPage.value : null,
+        content_limit_state: limitState ? limitState.value : '',
+        annotations: Array.from(containers).map(container => {
+            const header = container.querySelector('span#annotationHighlightHeader');
+            const highlight = container.querySelector('.kp-notebook-highlight span#highlight');
+            const note = container.querySelector('.kp-notebook-note span#note');
+            return {
+                header: header ? header.innerText : null,
+                text: highlight ? highlight.innerText : null,
+                note: note ? note.innerText : null
+            };
+        })
+    };
+}
+"""
+
+# True once the annotations pane shows the book with the given ASIN. Right after a click the
+# pane still holds the previous book, whose rows would otherwise satisfy any row selector.
+ANNOTATIONS_FOR_ASIN_SCRIPT = """
+(asin) => {
+    const marker = document.querySelector('#kp-notebook-annotations-asin');
+    return !!marker && (marker.value || marker.getAttribute('value') || marker.dataset.asin) === asin;
+}
+"""
+
+# Resolves once the annotations pane has gone [quiet] ms without a DOM mutation, or after
+# [limit] ms, with the elapsed ms. Replaces a fixed sleep after the first highlight renders.
+ANNOTATIONS_SETTLED_SCRIPT = """
+([quiet, limit]) => new Promise(resolve => {
+    const pane = document.querySelector('#kp-notebook-annotations') || document.body;
+    const started = performance.now();
+    let settled = false;
+    let quietTimer = null;
+    let limitTimer = null;
+    const done = () => {
+        if (settled) return;
+        settled = true;
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(limitTimer);
+        resolve(Math.round(performance.now() - started));
+    };
+    const arm = () => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(done, quiet);
+    };
+    const observer = new MutationObserver(arm);
+    observer.observe(pane, {childList: true, subtree: true, characterData: true});
+    limitTimer = setTimeout(done, limit);
+    arm();
+})
+"""
@@ -0,0 +1,100 @@
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class _AnnotationsParser(HTMLParser):
+    """Collects the same fields as ANNOTATIONS_SCRIPT from a raw annotations fragment"""
+
+    # span ids whose text is captured, mapped to the annotation field they fill
+    FIELDS = {
+        "annotationHighlightHeader": "header",
+        "highlight": "text",
+        "note": "note",
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.date: Optional[str] = None
+        self.next_page_token: Optional[str] = None
+        self.content_limit_state: Optional[str] = None
+        self.annotations: List[Dict[str, Optional[str]]] = []
+        self._container_depth: Optional[int] = None
+        self._depth = 0
+        self._capture: Optional[str] = None
+        self._capture_depth = 0
+        self._buffer: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+        element_id = attributes.get("id") or ""
+        classes = (attributes.get("class") or "").split()
+
+        if tag == "input":
+            if "kp-notebook-annotations-next-page-start" in classes:
+                self.next_page_token = attributes.get("value") or None
+            elif "kp-notebook-content-limit-state" in classes:
+                self.content_limit_state = attributes.get("value") or ""
+            return
+        if tag in VOID_ELEMENTS:
+            if tag == "br" and self._capture:
+                self._buffer.append("\n")
+            return
+
+        self._depth += 1
+        if self._capture:
+            return
+
+        if tag == "div" and "QTI" in element_id and self._container_depth is None:
+            self._container_depth = self._depth
+            self.annotations.append({"header": None, "text": None, "note": None})
+        elif tag == "span" and element_id == "kp-notebook-annotated-date":
+            self._start_capture("date")
+        elif tag == "span" and self._container_depth is not None and element_id in self.FIELDS:
+            self._start_capture(self.FIELDS[element_id])
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        if self._capture and self._depth == self._capture_depth:
+            self._finish_capture()
+        if self._container_depth is not None and self._depth == self._container_depth:
+            self._container_depth = None
+        self._depth -= 1
+
+    def handle_data(self, data):
+        if self._capture:
+            self._buffer.append(data)
+
+    def _start_capture(self, field: str):
+        self._capture = field
+        self._capture_depth = self._depth
+        self._buffer = []
+
+    def _finish_capture(self):
+        text = "".join(self._buffer)
+        if self._capture == "date":
+            self.date = text
+        else:
+            self.annotations[-1][self._capture] = text
+        self._capture = None
+
+
+def parse_annotations_html(html: str) -> Dict[str, Any]:
+    """Parse an annotations pane fragment as served by the notebook
+    Args:
+        html: The HTML returned by the notebook for one page of a book's annotations
+    Returns:
+        A dict with "date", "annotations" ([{header, text, note}]), "next_page_token"
+        and "content_limit_state", in the same shape as ANNOTATIONS_SCRIPT.
+    """
+    parser = _AnnotationsParser()
+    parser.feed(html)
+    parser.close()
+    return {
+        "date": parser.date,
+        "annotations": parser.annotations,
+        "next_page_token": parser.next_page_token,
+        "content_limit_state": parser.content_limit_state,
+    }
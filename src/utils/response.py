@@ -1,7 +1,13 @@
-from typing import Any, Optional
-from fastapi.responses import JSONResponse
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from fastapi.responses import JSONResponse, StreamingResponse
+from src.utils.serialization import FastJSONResponse, dumps
 
-def create_response(code: int, message: str, data: Optional[Any] = None) -> JSONResponse:
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+def create_response(code: int, message: str, data: Optional[Any] = None, meta: Optional[dict] = None, headers: Optional[dict] = None) -> JSONResponse:
     """
     Create a standardized JSON response with proper HTTP status code.
     
@@ -9,6 +15,8 @@ def create_response(code: int, message: str, data: Optional[Any] = None) -> JSON
         code (int): HTTP status code
         message (str): Response message
         data (Optional[Any]): Response data
+        meta (Optional[dict]): Extra information about the result, omitted when None
+        headers (Optional[dict]): Extra HTTP headers, e.g. Retry-After
     
     Returns:
         JSONResponse: FastAPI response with proper status code
@@ -18,5 +26,51 @@ def create_response(code: int, message: str, data: Optional[Any] = None) -> JSON
         "message": message,
         "data": data
     }
+    if meta is not None:
+        response_data["meta"] = meta
+    
+    return FastJSONResponse(content=response_data, status_code=code, headers=headers)
+
+
+def encode_response_body(code: int, message: str, data_json: bytes, meta: Optional[dict] = None) -> bytes:
+    """
+    Encode a create_response() body around data that is already JSON encoded.
+    
+    Args:
+        code (int): HTTP status code
+        message (str): Response message
+        data_json (bytes): Response data, encoded with serialization.dumps
+        meta (Optional[dict]): Extra information about the result, omitted when None
+    
+    Returns:
+        bytes: The same JSON create_response() would render, without encoding data again
+    """
+    body = b'{"code":' + dumps(code) + b',"message":' + dumps(message) + b',"data":' + data_json
+    if meta is not None:
+        body += b',"meta":' + dumps(meta)
+    return body + b"}"
+
+
+def create_stream_response(records: AsyncIterator[Tuple[str, Dict[str, Any]]], stream_format: str) -> StreamingResponse:
+    """
+    Stream (record_type, data) records as NDJSON lines or Server-Sent Events.
     
-    return JSONResponse(content=response_data, status_code=code)
\ No newline at end of file
+    Args:
+        records (AsyncIterator): Async iterator of (record_type, data) tuples
+        stream_format (str): "ndjson" or "sse"
+    
+    Returns:
+        StreamingResponse: Response that writes each record as soon as it is produced
+    """
+    async def encode():
+        async for record_type, data in records:
+            if stream_format == "sse":
+                yield b"event: " + record_type.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+            else:
+                yield dumps({"type": record_type, "data": data}) + b"\n"
+
+    return StreamingResponse(
+        encode(),
+        media_type=STREAM_MEDIA_TYPES[stream_format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,101 @@
+"""Sync schedules: a fixed interval or a five-field cron expression (evaluated in UTC)."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Set
+
+CRON_FIELDS = [("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7)]
+CRON_SEARCH_LIMIT = timedelta(days=5 * 366)
+
+
+def _parse_cron_field(expression: str, name: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in expression.split(","):
+        step = 1
+        has_step = "/" in part
+        if has_step:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Invalid step in cron {name}: {expression}")
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = high if has_step else start
+
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron {name} out of range ({low}-{high}): {expression}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class Schedule:
+    """When an account is synced next: every `interval` seconds or whenever `cron` matches"""
+
+    def __init__(self, interval: Optional[int] = None, cron: Optional[str] = None):
+        if (interval is None) == (cron is None):
+            raise ValueError("Exactly one of interval or cron is required")
+        self.interval = interval
+        self.cron = cron
+        if cron is not None:
+            fields = cron.split()
+            if len(fields) != 5:
+                raise ValueError("Cron expressions need 5 fields: minute hour day month weekday")
+            parsed = [_parse_cron_field(field, name, low, high) for field, (name, low, high) in zip(fields, CRON_FIELDS)]
+            self.minutes, self.hours, self.days, self.months, weekdays = parsed
+            self.weekdays = {day % 7 for day in weekdays}
+            self.day_restricted = fields[2] != "*"
+            self.weekday_restricted = fields[4] != "*"
+        elif interval <= 0:
+            raise ValueError("Interval must be positive")
+
+    @classmethod
+    def parse(cls, value: str) -> "Schedule":
+        """Inverse of str(): "interval:<seconds>" or "cron:<expression>" """
+        kind, _, expression = value.partition(":")
+        if kind == "interval":
+            return cls(interval=int(expression))
+        return cls(cron=expression)
+
+    def __str__(self) -> str:
+        return f"interval:{self.interval}" if self.interval is not None else f"cron:{self.cron}"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        # Like cron: when both day fields are restricted, either one matching is enough
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def min_gap(self) -> float:
+        """Shortest time in seconds between two runs; for cron, between two matching times of day (or across midnight)"""
+        if self.interval is not None:
+            return self.interval
+        times = sorted(hour * 60 + minute for hour in self.hours for minute in self.minutes)
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])] + [times[0] + 24 * 60 - times[-1]]
+        return min(gaps) * 60
+
+    def next_after(self, timestamp: float) -> float:
+        """Unix time of the first run strictly after `timestamp`"""
+        if self.interval is not None:
+            return timestamp + self.interval
+
+        start = datetime.fromtimestamp(timestamp, timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        moment = start
+        while moment - start < CRON_SEARCH_LIMIT:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"Cron expression never matches: {self.cron}")
@@ -1,60 +1,117 @@
+import asyncio
+import os
 import random
-import time
 import logging
+from typing import Any, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
 
-def human_type(element, text: str):
+class HumanizationProfile:
+    """How human the browser automation looks, and how much latency that costs.
+
+    Every pause is drawn from the ranges in the code below and multiplied by delay_scale.
+    A profile instance belongs to one scrape and adds up the artificial delay it caused.
+    """
+
+    # name: (delay_scale, typo_rate, thinking_pause_rate, type_per_character)
+    PRESETS = {
+        "paranoid": (2.0, 0.05, 0.1, True),
+        "normal": (1.0, 0.03, 0.05, True),
+        "fast": (0.25, 0.0, 0.0, True),
+        "none": (0.0, 0.0, 0.0, False),
+    }
+
+    def __init__(self, name: str, delay_scale: float, typo_rate: float, thinking_pause_rate: float, type_per_character: bool):
+        self.name = name
+        self.delay_scale = delay_scale
+        self.typo_rate = typo_rate
+        self.thinking_pause_rate = thinking_pause_rate
+        self.type_per_character = type_per_character
+        self.total_delay = 0.0
+
+    @classmethod
+    def preset(cls, name: Optional[str] = None) -> "HumanizationProfile":
+        """Build a fresh profile from a preset name (defaults to HUMANIZATION_PROFILE)"""
+        name = name or os.getenv("HUMANIZATION_PROFILE", "normal")
+        if name not in cls.PRESETS:
+            raise ValueError(f"Unknown humanization profile: {name}")
+        return cls(name, *cls.PRESETS[name])
+
+    def delay(self, low: float, high: float) -> float:
+        """Pause length in seconds between low and high, scaled and added to total_delay"""
+        if not self.delay_scale:
+            return 0.0
+        delay = random.uniform(low, high) * self.delay_scale
+        self.total_delay += delay
+        return delay
+
+    async def pause(self, low: float, high: float):
+        delay = self.delay(low, high)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"profile": self.name, "artificial_delay_seconds": round(self.total_delay, 3)}
+
+
+async def human_type(element, text: str, profile: Optional[HumanizationProfile] = None):
     """Simulate human-like typing with random delays, errors, and variable speed"""
     logger.info(f"Starting human_type for text of length {len(text)}")
+    profile = profile or HumanizationProfile.preset()
     
     try:
-        element.click()
-        element.fill('')  # Clear field first
+        await element.click()
+        if not profile.type_per_character:
+            await element.fill(text)
+            logger.info(f"Filled text of length {len(text)} without typing delays")
+            return
+
+        await element.fill('')  # Clear field first
         logger.debug("Element clicked and cleared")
         
         i = 0
         while i < len(text):
             char = text[i]
             
-            # 3% chance of typing a wrong character first
-            if random.random() < 0.03 and i > 0:
+            # Occasionally type a wrong character first (3% with the normal profile)
+            if random.random() < profile.typo_rate and i > 0:
                 wrong_chars = 'abcdefghijklmnopqrstuvwxyz'
                 wrong_char = random.choice(wrong_chars)
-                element.type(wrong_char)
+                await element.type(wrong_char)
                 logger.debug(f"Typed wrong character '{wrong_char}' at position {i}")
                 
                 # Pause as if realizing the mistake
-                time.sleep(random.uniform(0.2, 0.5))
+                await profile.pause(0.2, 0.5)
                 
                 # Backspace to correct
-                element.press('Backspace')
-                time.sleep(random.uniform(0.1, 0.3))
+                await element.press('Backspace')
+                await profile.pause(0.1, 0.3)
                 logger.debug("Corrected typing mistake")
             
             # Type the correct character
-            element.type(char)
+            await element.type(char)
             
             # Variable typing speed - faster for common sequences, slower for complex parts
             if char.isalpha() and i > 0 and text[i-1].isalpha():
                 # Faster for letter sequences (words)
-                delay = random.uniform(0.03, 0.08)
+                delay = profile.delay(0.03, 0.08)
             elif char.isdigit():
                 # Slower for numbers
-                delay = random.uniform(0.08, 0.15)
+                delay = profile.delay(0.08, 0.15)
             elif char in '@._-':
                 # Slower for special characters in emails
-                delay = random.uniform(0.1, 0.2)
+                delay = profile.delay(0.1, 0.2)
             else:
                 # Normal speed for other characters
-                delay = random.uniform(0.05, 0.12)
+                delay = profile.delay(0.05, 0.12)
             
             # Add occasional longer pauses (thinking)
-            if random.random() < 0.05:
-                delay += random.uniform(0.3, 0.8)
+            if random.random() < profile.thinking_pause_rate:
+                delay += profile.delay(0.3, 0.8)
             
-            time.sleep(delay)
+            if delay:
+                await asyncio.sleep(delay)
             i += 1
         
         logger.info(f"Successfully typed text of length {len(text)}")
@@ -63,13 +120,14 @@ def human_type(element, text: str):
         raise
 
 
-def human_click(page, element):
+async def human_click(page, element, profile: Optional[HumanizationProfile] = None):
     """Simulate human-like clicking with slight movement"""
     logger.info("Starting human_click")
+    profile = profile or HumanizationProfile.preset()
     
     try:
         # Get element bounding box for realistic clicking
-        bbox = element.bounding_box()
+        bbox = await element.bounding_box()
         if bbox:
             # Click at a random position within the element (not always center)
             x = bbox['x'] + random.uniform(0.2, 0.8) * bbox['width']
@@ -78,16 +136,16 @@ def human_click(page, element):
             logger.debug(f"Element bbox found, clicking at coordinates ({x:.1f}, {y:.1f})")
             
             # Move mouse to position with some randomness
-            page.mouse.move(x + random.uniform(-2, 2), y + random.uniform(-2, 2))
-            time.sleep(random.uniform(0.1, 0.3))
+            await page.mouse.move(x + random.uniform(-2, 2), y + random.uniform(-2, 2))
+            await profile.pause(0.1, 0.3)
             
             # Click
-            page.mouse.click(x, y)
+            await page.mouse.click(x, y)
             logger.debug("Mouse click completed")
         else:
             logger.warning("Element bbox not found, using fallback click")
             # Fallback to regular click
-            element.click()
+            await element.click()
         
         logger.info("Successfully completed human_click")
     except Exception as e:
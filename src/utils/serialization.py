@@ -0,0 +1,24 @@
+"""JSON encoding for response bodies, backed by orjson.
+
+orjson encodes dicts, lists and the slotted record dataclasses in one pass straight to
+bytes, which avoids both pydantic's model_dump and a second stdlib json encoding.
+"""
+
+from typing import Any
+from fastapi.responses import JSONResponse
+import orjson
+
+
+def dumps(content: Any, sort_keys: bool = False) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+
+def loads(data: Any) -> Any:
+    return orjson.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
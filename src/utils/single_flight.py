@@ -0,0 +1,52 @@
+import asyncio
+import os
+import time
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Shares one running call between concurrent callers with the same key.
+
+    The call runs in its own task, so a caller that goes away does not cancel it for the
+    others. A successful result is also handed to callers arriving within `window`
+    seconds after it finished; failures are only shared with callers already waiting.
+    """
+
+    def __init__(self, window: Optional[float] = None):
+        self.window = window if window is not None else float(os.getenv("SINGLE_FLIGHT_WINDOW_SECONDS", "5"))
+        self._calls: Dict[str, Tuple[asyncio.Task, Optional[float]]] = {}
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is not None:
+            task, finished_at = call
+            if finished_at is None or time.monotonic() - finished_at <= self.window:
+                state = "in_flight" if finished_at is None else "window"
+                metrics.COALESCED_REQUESTS.inc(state=state)
+                logger.info(f"Joining {state.replace('_', '-')} call instead of starting a new one")
+                return await asyncio.shield(task)
+
+        task = asyncio.create_task(factory())
+        self._calls[key] = (task, None)
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key, (None,))[0] is not task:
+            return
+        if task.cancelled() or task.exception() is not None or self.window <= 0:
+            del self._calls[key]
+            return
+        self._calls[key] = (task, time.monotonic())
+        asyncio.get_running_loop().call_later(self.window, self._expire, key, task)
+
+    def _expire(self, key: str, task: asyncio.Task):
+        if self._calls.get(key, (None,))[0] is task:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        return sum(1 for _, finished_at in self._calls.values() if finished_at is None)
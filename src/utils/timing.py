@@ -0,0 +1,54 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from src.utils import metrics, tracing
+
+
+class PhaseTimer:
+    """Collects wall-clock durations of the phases of one scrape (login, library, each book, ...)
+
+    Every phase is also observed in the kindle_scrape_phase_seconds histogram and, when
+    tracing is enabled, recorded as a span under the scrape's root span.
+    """
+
+    def __init__(self, span_name: Optional[str] = None):
+        self.durations: Dict[str, List[float]] = {}
+        self.failed_phase: Optional[str] = None
+        self._root = tracing.start_span(span_name) if span_name else None
+
+    def record(self, phase: str, seconds: float):
+        self.durations.setdefault(phase, []).append(seconds)
+        metrics.PHASE_DURATION.observe(seconds, phase=phase)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            with tracing.span(f"kindle.{name}", parent=self._root):
+                yield
+        except Exception:
+            # Nested phases fail from the inside out; keep the innermost one
+            if self.failed_phase is None:
+                self.failed_phase = name
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def finish(self, error: Optional[BaseException] = None):
+        """End the root span, marking it failed when the scrape raised"""
+        tracing.end_span(self._root, error)
+        self._root = None
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-phase count, total, average, p95 and max in seconds"""
+        result = {}
+        for phase, durations in self.durations.items():
+            ordered = sorted(durations)
+            result[phase] = {
+                "count": len(ordered),
+                "total": round(sum(ordered), 4),
+                "avg": round(sum(ordered) / len(ordered), 4),
+                "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+                "max": round(ordered[-1], 4)
+            }
+        return result
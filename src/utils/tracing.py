@@ -0,0 +1,73 @@
+"""Optional OpenTelemetry tracing for scrape phases.
+
+Tracing is off unless OTEL_TRACING_ENABLED=True and the OpenTelemetry packages are
+installed (opentelemetry-sdk and opentelemetry-exporter-otlp for export). The exporter
+is configured through the standard OTEL_EXPORTER_OTLP_* environment variables.
+"""
+
+import os
+import logging
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+_tracer = None
+
+
+def setup_tracing():
+    """Install an OTLP-exporting tracer provider when tracing is enabled"""
+    global _tracer
+    if os.getenv("OTEL_TRACING_ENABLED", "False") != "True":
+        return
+    if trace is None:
+        logger.warning("OTEL_TRACING_ENABLED is set but opentelemetry is not installed, tracing disabled")
+        return
+
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "paper-orbit-scraper")}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        trace.set_tracer_provider(provider)
+    except ImportError:
+        logger.warning("opentelemetry-sdk or the OTLP exporter is not installed, using the globally configured tracer provider")
+
+    _tracer = trace.get_tracer("paper-orbit-scraper")
+    logger.info("OpenTelemetry tracing enabled")
+
+
+def start_span(name: str) -> Optional[Any]:
+    """Start a span that is not made current, e.g. the root span of a scrape"""
+    if _tracer is None:
+        return None
+    return _tracer.start_span(name)
+
+
+def end_span(span: Optional[Any], error: Optional[BaseException] = None):
+    if span is None:
+        return
+    if error is not None:
+        span.record_exception(error)
+        span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+    span.end()
+
+
+@contextmanager
+def span(name: str, parent: Optional[Any] = None) -> Iterator[Optional[Any]]:
+    """Run a block inside a span, as a child of parent when given"""
+    if _tracer is None:
+        yield None
+        return
+
+    context = trace.set_span_in_context(parent) if parent is not None else None
+    with _tracer.start_as_current_span(name, context=context) as current:
+        yield current
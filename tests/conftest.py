@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    """A KindleHandler with its stores in a temp dir and no background services"""
+    monkeypatch.setenv("HIGHLIGHT_STORE_PATH", str(tmp_path / "highlights.db"))
+    monkeypatch.setenv("RESULT_CACHE_BACKEND", "memory")
+    monkeypatch.setenv("SESSION_CACHE_ENABLED", "False")
+    monkeypatch.setenv("WAIT_STATS_PATH", "")
+    monkeypatch.setenv("SYNC_ENABLED", "False")
+    monkeypatch.setenv("SINGLE_FLIGHT_WINDOW_SECONDS", "0")
+    monkeypatch.setenv("ADMISSION_MAX_CONCURRENT", "1")
+    from src.handlers.kindle_handler import KindleHandler
+    return KindleHandler()
@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from src.services import admission_controller
+from src.services.admission_controller import AdmissionController, AdmissionRejectedError
+from src.utils import serialization
+
+
+@pytest.fixture
+def make_controller(monkeypatch):
+    monkeypatch.setattr(admission_controller, "available_memory_mb", lambda: None)
+
+    def make(capacity=1, burst=5, rate_per_minute=0, max_queue=50, queue_timeout=120, weights=""):
+        monkeypatch.setenv("ADMISSION_MAX_CONCURRENT", str(capacity))
+        monkeypatch.setenv("ADMISSION_ACCOUNT_BURST", str(burst))
+        monkeypatch.setenv("ADMISSION_ACCOUNT_RATE_PER_MINUTE", str(rate_per_minute))
+        monkeypatch.setenv("ADMISSION_MAX_QUEUE", str(max_queue))
+        monkeypatch.setenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", str(queue_timeout))
+        monkeypatch.setenv("ADMISSION_TENANT_WEIGHTS", weights)
+        return AdmissionController()
+
+    return make
+
+
+def test_rate_limit_is_per_account(make_controller):
+    controller = make_controller(capacity=10, burst=2, rate_per_minute=1)
+
+    async def scenario():
+        for _ in range(2):
+            async with controller.admit("a@example.com"):
+                pass
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            await controller.acquire("a@example.com")
+        async with controller.admit("b@example.com"):
+            pass
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+
+    assert (rejected.reason, rejected.status_code) == ("rate_limited", 429)
+    assert 1 <= rejected.retry_after <= 60
+    assert controller.stats()["rejected"] == {"rate_limited": 1}
+
+
+def test_checked_scrape_takes_one_token(make_controller):
+    controller = make_controller(capacity=10, burst=1, rate_per_minute=1)
+
+    async def scenario():
+        controller.check("a@example.com")
+        async with controller.admit("a@example.com", checked=True):
+            pass
+
+    asyncio.run(scenario())
+
+    with pytest.raises(AdmissionRejectedError):
+        controller.check("a@example.com")
+
+
+def test_full_queue_and_low_memory_are_503(make_controller, monkeypatch):
+    controller = make_controller(capacity=1, max_queue=0)
+
+    async def scenario():
+        async with controller.admit("a@example.com"):
+            with pytest.raises(AdmissionRejectedError) as rejected:
+                await controller.acquire("b@example.com")
+            return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert (rejected.reason, rejected.status_code) == ("queue_full", 503)
+
+    monkeypatch.setattr(admission_controller, "available_memory_mb", lambda: 1.0)
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        controller.check("a@example.com")
+    assert (rejected.value.reason, rejected.value.status_code, rejected.value.retry_after) == ("low_memory", 503, 30)
+
+
+def test_queue_timeout_is_503(make_controller):
+    controller = make_controller(capacity=1, queue_timeout=0.05)
+
+    async def scenario():
+        async with controller.admit("a@example.com"):
+            with pytest.raises(AdmissionRejectedError) as rejected:
+                await controller.acquire("b@example.com")
+            return rejected.value
+
+    rejected = asyncio.run(scenario())
+
+    assert (rejected.reason, rejected.status_code) == ("queue_timeout", 503)
+    assert controller.stats()["queued"] == 0
+
+
+def test_fair_queue_interleaves_accounts(make_controller):
+    controller = make_controller(capacity=1)
+    order = []
+
+    async def scrape(email: str):
+        async with controller.admit(email):
+            order.append(email[0])
+            await asyncio.sleep(0)
+
+    async def scenario():
+        async with controller.admit("first@example.com"):
+            tasks = [asyncio.create_task(scrape("a@example.com")) for _ in range(3)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(scrape("b@example.com")))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+
+    # b queued after all of a's requests but runs after a's first one, not after all three
+    assert order == ["a", "b", "a", "a"]
+    assert controller.stats()["active"] == 0
+
+
+def test_weighted_tenant_gets_more_turns(make_controller):
+    controller = make_controller(capacity=1, weights="a@example.com=2")
+    order = []
+
+    async def scrape(email: str):
+        async with controller.admit(email):
+            order.append(email[0])
+            await asyncio.sleep(0)
+
+    async def scenario():
+        async with controller.admit("first@example.com"):
+            tasks = [asyncio.create_task(scrape(email)) for email in ["b@example.com"] * 3 + ["a@example.com"] * 4]
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+
+    assert order[:3].count("a") == 2
+
+
+def test_cancelled_waiter_frees_its_place(make_controller):
+    controller = make_controller(capacity=1)
+
+    async def scenario():
+        async with controller.admit("a@example.com"):
+            waiter = asyncio.create_task(controller.acquire("b@example.com"))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert (stats["active"], stats["queued"]) == (0, 0)
+
+
+def test_streamed_scrape_is_rejected_before_the_stream_starts(handler):
+    handler.admission_controller.account_rate = 1 / 60
+    handler.admission_controller.account_burst = 0
+
+    response = asyncio.run(handler.get_highlights(None, "reader@example.com", "secret", stream="ndjson"))
+
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert serialization.loads(response.body)["data"] is None
@@ -0,0 +1,97 @@
+from datetime import date
+
+import pytest
+
+from src.models.kindle_models import BookRecord, HighlightRecord
+from src.utils.book_filter import BookFilter, HIGHLIGHT_FIELDS
+
+
+def make_book() -> BookRecord:
+    return BookRecord(
+        book_id="B1",
+        book_title="Dune",
+        book_author=["Frank Herbert"],
+        book_cover="cover.jpg",
+        highlights=[HighlightRecord(text="Fear is the mind-killer.", note="n", type="Yellow", page=5)],
+        date="08-17-2025",
+    )
+
+
+def test_parse_defaults_select_everything():
+    book_filter = BookFilter.parse()
+
+    assert book_filter.options() == {}
+    assert not book_filter.projects
+    assert book_filter.matches("B1", "Anything")
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"annotated_since": "17/08/2025"}, "annotated_since"),
+    ({"limit": 0}, "limit"),
+    ({"offset": -1}, "offset"),
+    ({"fields": "book_title,-note"}, "not both"),
+    ({"fields": "isbn"}, "Unknown fields: isbn"),
+])
+def test_parse_rejects_bad_params(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        BookFilter.parse(**kwargs)
+
+
+def test_matches_asin_title_and_date():
+    book_filter = BookFilter.parse(asin="B1, B2", title="  DUNE ", annotated_since="2025-08-01")
+
+    assert book_filter.matches("B1", "Dune Messiah", date(2025, 8, 1))
+    assert not book_filter.matches("B3", "Dune", date(2025, 8, 1))
+    assert not book_filter.matches("B1", "Emma", date(2025, 8, 1))
+    assert not book_filter.matches("B1", "Dune", date(2025, 7, 31))
+    assert not book_filter.matches("B1", "Dune", None)
+
+
+def test_page_reports_more_without_consuming_everything():
+    consumed = []
+
+    def books():
+        for i in range(100):
+            consumed.append(i)
+            yield i
+
+    page, has_more = BookFilter(limit=3, offset=2).page(books())
+
+    assert page == [2, 3, 4]
+    assert has_more
+    assert consumed == [0, 1, 2, 3, 4, 5]
+
+
+def test_page_at_the_end():
+    assert BookFilter(limit=3, offset=2).page(iter(range(5))) == ([2, 3, 4], False)
+    assert BookFilter(offset=3).page(iter(range(5))) == ([3, 4], False)
+
+
+def test_project_keeps_listed_fields():
+    projected = BookFilter.parse(fields="book_title,text").project(make_book())
+
+    assert projected == {"book_title": "Dune", "highlights": [{"text": "Fear is the mind-killer."}]}
+
+
+def test_project_drops_fields():
+    projected = BookFilter.parse(fields="-book_cover,-note,-date").project(make_book())
+
+    assert set(projected) == {"book_id", "book_title", "book_author", "highlights"}
+    assert set(projected["highlights"][0]) == {"text", "type", "page"}
+
+
+def test_highlights_alone_keeps_all_highlight_fields():
+    projected = BookFilter.parse(fields="highlights").project(make_book())
+
+    assert set(projected["highlights"][0]) == set(HIGHLIGHT_FIELDS)
+
+
+def test_no_projection_returns_the_record():
+    book = make_book()
+
+    assert BookFilter().project(book) is book
+
+
+def test_options_tell_filters_apart():
+    assert BookFilter.parse(asin="B2,B1").options() == BookFilter.parse(asin="B1,B2").options()
+    assert BookFilter.parse(limit=2).options() != BookFilter.parse(limit=3).options()
@@ -0,0 +1,96 @@
+import asyncio
+import gzip
+
+import pytest
+import zstandard
+
+from src.utils.compression import CompressionMiddleware, choose_encoding, add_vary
+
+BODY = b'{"books": []}' * 200
+
+
+def make_app(body: bytes, headers=None, chunks: int = 1, media_type: bytes = b"application/json"):
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", media_type), (b"content-length", str(len(body)).encode())] + (headers or []),
+        })
+        size = len(body) // chunks
+        for i in range(chunks):
+            last = i == chunks - 1
+            await send({"type": "http.response.body", "body": body[i * size:] if last else body[i * size:(i + 1) * size], "more_body": not last})
+    return app
+
+
+def call(app, accept_encoding: str = None, minimum_size: int = 100):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request"}
+
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    asyncio.run(CompressionMiddleware(app, minimum_size=minimum_size)({"type": "http", "headers": headers}, receive, send))
+    start = messages[0]
+    return dict(start["headers"]), b"".join(message.get("body", b"") for message in messages[1:])
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, zstd", "zstd"),
+    ("zstd;q=0.5, gzip", "gzip"),
+    ("*", "zstd"),
+    ("gzip;q=0", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_gzip_response():
+    headers, body = call(make_app(BODY), "gzip")
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert int(headers[b"content-length"]) == len(body)
+    assert gzip.decompress(body) == BODY
+
+
+def test_streamed_zstd_response():
+    headers, body = call(make_app(BODY, chunks=4), "zstd")
+
+    assert headers[b"content-encoding"] == b"zstd"
+    assert b"content-length" not in headers
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(body) == BODY
+
+
+def test_small_event_stream_and_unaccepted_bodies_are_untouched():
+    for app, accept in [
+        (make_app(b"{}"), "gzip"),
+        (make_app(BODY, media_type=b"text/event-stream"), "gzip"),
+        (make_app(BODY), None),
+    ]:
+        headers, body = call(app, accept)
+        assert b"content-encoding" not in headers
+        assert body in (b"{}", BODY)
+
+
+def test_existing_vary_is_kept():
+    headers, _ = call(make_app(BODY, headers=[(b"vary", b"Origin")]), "gzip")
+
+    assert headers[b"vary"] == b"Origin, Accept-Encoding"
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ([], b"Accept-Encoding"),
+    ([(b"Vary", b"Origin, Cookie")], b"Origin, Cookie, Accept-Encoding"),
+    ([(b"vary", b"accept-encoding")], b"accept-encoding"),
+    ([(b"vary", b"*")], b"*"),
+    ([(b"vary", b"Origin"), (b"vary", b"Cookie")], b"Origin, Cookie, Accept-Encoding"),
+])
+def test_add_vary(headers, expected):
+    assert [value for name, value in add_vary(headers) if name == b"vary"] == [expected]
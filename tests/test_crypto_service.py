@@ -0,0 +1,110 @@
+import base64
+import json
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.services.crypto_service import CryptoService, build_envelope, OAEP_PADDING
+
+
+@pytest.fixture(scope="module")
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture
+def crypto(private_key, monkeypatch):
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    monkeypatch.setenv("PRIVATE_KEY", base64.b64encode(pem).decode("utf-8"))
+    return CryptoService(cache_ttl=60, cache_max_entries=2)
+
+
+def count_rsa_decryptions(crypto, monkeypatch):
+    calls = []
+    decrypt = crypto.private_key.decrypt
+
+    class CountingKey:
+        def decrypt(self, *args):
+            calls.append(1)
+            return decrypt(*args)
+
+    monkeypatch.setattr(crypto, "_private_key", CountingKey())
+    return calls
+
+
+def test_legacy_rsa_payload(crypto, private_key):
+    payload = json.dumps({"email": "reader@example.com", "password": "secret"}).encode("utf-8")
+    encrypted = base64.b64encode(private_key.public_key().encrypt(payload, OAEP_PADDING)).decode("utf-8")
+
+    assert crypto.decrypt_credentials(encrypted) == {"email": "reader@example.com", "password": "secret"}
+
+
+def test_envelope_carries_options_larger_than_an_rsa_block(crypto, private_key):
+    credentials = {"email": "reader@example.com", "password": "secret", "options": {"incremental": True, "padding": "x" * 4096}}
+    envelope = build_envelope(private_key.public_key(), credentials)
+
+    assert envelope.startswith("v1.")
+    assert crypto.is_encrypted_format(envelope)
+    assert crypto.decrypt_credentials(envelope) == credentials
+
+
+def test_encrypt_credentials_round_trip(crypto):
+    sealed = crypto.encrypt_credentials({"email": "reader@example.com", "password": "secret"})
+
+    assert crypto.decrypt_credentials(sealed)["password"] == "secret"
+
+
+def flip_body_byte(envelope: str) -> str:
+    version, wrapped_key, body = envelope.split(".")
+    data = bytearray(base64.b64decode(body))
+    data[-1] ^= 1
+    return ".".join([version, wrapped_key, base64.b64encode(bytes(data)).decode("utf-8")])
+
+
+@pytest.mark.parametrize("tamper", [
+    lambda envelope: "v2." + envelope.split(".", 1)[1],
+    flip_body_byte,
+    lambda envelope: envelope + ".extra",
+])
+def test_tampered_envelopes_are_rejected(crypto, private_key, tamper):
+    envelope = build_envelope(private_key.public_key(), {"email": "reader@example.com", "password": "secret"})
+
+    with pytest.raises(ValueError):
+        crypto.decrypt_credentials(tamper(envelope))
+
+
+def test_payload_without_password_is_rejected(crypto, private_key):
+    with pytest.raises(ValueError, match="email and password"):
+        crypto.decrypt_credentials(build_envelope(private_key.public_key(), {"email": "reader@example.com"}))
+
+
+def test_repeat_payloads_skip_rsa(crypto, private_key, monkeypatch):
+    envelopes = [build_envelope(private_key.public_key(), {"email": f"reader{i}@example.com", "password": "secret"}) for i in range(3)]
+    calls = count_rsa_decryptions(crypto, monkeypatch)
+
+    crypto.decrypt_credentials(envelopes[0])
+    first = crypto.decrypt_credentials(envelopes[0])
+    first["password"] = "changed"
+
+    assert len(calls) == 1
+    assert crypto.decrypt_credentials(envelopes[0])["password"] == "secret"
+
+    # Least recently used entries are evicted beyond cache_max_entries
+    crypto.decrypt_credentials(envelopes[1])
+    crypto.decrypt_credentials(envelopes[2])
+    crypto.decrypt_credentials(envelopes[0])
+    assert len(calls) == 4
+
+
+def test_cache_can_be_disabled(crypto, private_key, monkeypatch):
+    crypto.cache_ttl = 0
+    envelope = build_envelope(private_key.public_key(), {"email": "reader@example.com", "password": "secret"})
+    calls = count_rsa_decryptions(crypto, monkeypatch)
+
+    crypto.decrypt_credentials(envelope)
+    crypto.decrypt_credentials(envelope)
+
+    assert len(calls) == 2
@@ -0,0 +1,87 @@
+import asyncio
+import csv
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.utils.export import create_export_response, export_unavailable, HIGHLIGHT_COLUMNS, CHUNK_SIZE
+
+BOOKS = [
+    {
+        "book_id": "B1",
+        "book_title": "Dune",
+        "book_author": ["Frank Herbert"],
+        "book_cover": "cover.jpg",
+        "date": "08-17-2025",
+        "highlights": [
+            {"text": "Fear is the mind-killer.", "note": None, "type": "Yellow", "page": 5},
+            {"text": "Line one,\n\"quoted\"", "note": "n", "type": "Blue", "page": None},
+        ],
+    },
+    {"book_id": "B2", "book_title": "Empty", "book_author": [], "book_cover": None, "date": None, "highlights": []},
+    {"book_id": "B3", "book_title": "Emma", "book_author": ["Jane Austen", "Editor"], "book_cover": None, "date": None,
+     "highlights": [{"text": "x", "note": None, "type": "Pink", "page": 1}]},
+]
+
+
+def read(export_format: str, books=BOOKS):
+    response = create_export_response(books, export_format)
+
+    async def collect():
+        return [chunk async for chunk in response.body_iterator]
+
+    return response, asyncio.run(collect())
+
+
+def test_csv_has_one_row_per_highlight():
+    response, chunks = read("csv")
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+
+    assert response.media_type.startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="highlights.csv"'
+    assert rows[0] == HIGHLIGHT_COLUMNS
+    assert [(row[0], row[5], row[6]) for row in rows[1:]] == [("B1", "0", "Fear is the mind-killer."), ("B1", "1", 'Line one,\n"quoted"'), ("B3", "0", "x")]
+    assert rows[3][2] == "Jane Austen; Editor"
+
+
+def test_csv_is_written_book_by_book_in_chunks():
+    books = [
+        {**BOOKS[0], "book_id": f"B{i}", "highlights": [{"text": "a" * 1000, "note": None, "type": "Yellow", "page": page} for page in range(10)]}
+        for i in range(20)
+    ]
+
+    _, chunks = read("csv", books)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) < 2 * CHUNK_SIZE for chunk in chunks)
+
+
+def test_arrow_stream():
+    _, chunks = read("arrow")
+    table = pa.ipc.open_stream(b"".join(chunks)).read_all()
+
+    assert table.column_names == HIGHLIGHT_COLUMNS
+    assert table.num_rows == 3
+    assert table.column("book_author").to_pylist()[2] == ["Jane Austen", "Editor"]
+    assert table.column("page").to_pylist() == [5, None, 1]
+
+
+def test_parquet_file():
+    _, chunks = read("parquet")
+    table = pq.read_table(io.BytesIO(b"".join(chunks)))
+
+    assert table.num_rows == 3
+    assert table.column("text").to_pylist()[0] == "Fear is the mind-killer."
+
+
+def test_empty_library():
+    _, chunks = read("parquet", [])
+
+    assert pq.read_table(io.BytesIO(b"".join(chunks))).num_rows == 0
+
+
+@pytest.mark.parametrize("export_format", ["csv", "json"])
+def test_formats_without_pyarrow_are_available(export_format):
+    assert export_unavailable(export_format) is None
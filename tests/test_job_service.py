@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+import pytest
+
+from src.services.job_service import JobService
+
+
+class FakeScraper:
+    async def scrape(self, **params):
+        return {"books": [], "meta": {}}
+
+
+def test_submitted_job_starts_right_away():
+    async def scenario():
+        service = JobService(FakeScraper(), workers=1, max_queue=5, result_ttl=60)
+        await service.start()
+        try:
+            await asyncio.sleep(0.05)  # Workers are idle, waiting on the queue
+            submitted = time.monotonic()
+            job = service.submit({"email": "reader@example.com", "password": "secret"})
+            while not job.finished:
+                await asyncio.sleep(0.01)
+            return job, time.monotonic() - submitted
+        finally:
+            await service.stop()
+
+    job, elapsed = asyncio.run(scenario())
+
+    assert job.status == "completed"
+    assert job.params is None
+    assert elapsed < 1
+
+
+@pytest.mark.parametrize("url", [
+    "ftp://example.com/hook",
+    "http:///hook",
+    "http://127.0.0.1:8080/hook",
+    "http://169.254.169.254/latest/meta-data",
+    "http://10.0.0.5/hook",
+    "http://[::1]/hook",
+])
+def test_webhooks_to_internal_addresses_are_refused(url, monkeypatch):
+    monkeypatch.delenv("JOB_WEBHOOK_ALLOWED_HOSTS", raising=False)
+
+    with pytest.raises(ValueError):
+        JobService(FakeScraper()).check_webhook_url(url)
+
+
+def test_webhook_allowlist(monkeypatch):
+    monkeypatch.setenv("JOB_WEBHOOK_ALLOWED_HOSTS", "hooks.internal, localhost")
+    service = JobService(FakeScraper())
+
+    service.check_webhook_url("http://localhost:9000/hook")
+    with pytest.raises(ValueError):
+        service.check_webhook_url("https://example.com/hook")
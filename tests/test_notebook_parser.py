@@ -0,0 +1,58 @@
+from src.utils.notebook_parser import parse_annotations_html
+
+FRAGMENT = """
+<div id="kp-notebook-annotations-asin" data-asin="B000000001">
+  <span id="kp-notebook-annotated-date" class="a-color-secondary">Sunday August 17, 2025</span>
+  <input type="hidden" class="kp-notebook-annotations-next-page-start" value="token-2">
+  <input type="hidden" class="kp-notebook-content-limit-state" value="">
+  <div id="kp-notebook-annotations" class="a-row">
+    <div id="QTI1" class="a-row">
+      <div class="a-row"><span id="annotationHighlightHeader">Yellow highlight | Location:&nbsp;120</span></div>
+      <div class="a-row kp-notebook-highlight"><span id="highlight">First line<br>second <b>bold</b> line &amp; more</span></div>
+      <div class="a-row kp-notebook-note"><span id="note-label">Note:</span><span id="note">A note</span></div>
+    </div>
+    <div id="QTI2" class="a-row">
+      <div class="a-row"><span id="annotationHighlightHeader">Blue highlight | Location:&nbsp;300</span></div>
+      <div class="a-row kp-notebook-highlight"><span id="highlight">Second highlight</span></div>
+      <div class="a-row kp-notebook-note"><span id="note"></span></div>
+    </div>
+  </div>
+</div>
+"""
+
+
+def test_parses_date_pagination_and_annotations():
+    data = parse_annotations_html(FRAGMENT)
+
+    assert data["date"] == "Sunday August 17, 2025"
+    assert data["next_page_token"] == "token-2"
+    assert data["content_limit_state"] == ""
+    assert [annotation["header"] for annotation in data["annotations"]] == [
+        "Yellow highlight | Location:\xa0120",
+        "Blue highlight | Location:\xa0300",
+    ]
+
+
+def test_keeps_nested_markup_text_and_line_breaks():
+    first, second = parse_annotations_html(FRAGMENT)["annotations"]
+
+    assert first["text"] == "First line\nsecond bold line & more"
+    assert first["note"] == "A note"
+    assert second["text"] == "Second highlight"
+    assert second["note"] == ""
+
+
+def test_last_page_and_empty_book():
+    data = parse_annotations_html(
+        '<span id="kp-notebook-annotated-date">August 1, 2025</span>'
+        '<input class="kp-notebook-annotations-next-page-start" value="">'
+    )
+
+    assert data == {"date": "August 1, 2025", "annotations": [], "next_page_token": None, "content_limit_state": None}
+
+
+def test_sign_in_page_has_no_annotations():
+    data = parse_annotations_html('<form><input type="email" name="email"><input id="continue"></form>')
+
+    assert data["date"] is None
+    assert data["annotations"] == []
@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.request_filter import RequestFilter, ESTIMATED_BYTES
+
+
+class FakeRoute:
+    def __init__(self, url: str, resource_type: str):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type)
+        self.outcome = None
+
+    async def abort(self, error_code: str):
+        self.outcome = error_code
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+class FakeContext:
+    def __init__(self):
+        self.handler = None
+        self.listeners = {}
+
+    async def route(self, pattern: str, handler):
+        self.handler = handler
+
+    def on(self, event: str, listener):
+        self.listeners[event] = listener
+
+
+@pytest.fixture
+def request_filter():
+    return RequestFilter(enabled=True, block_types=["image", "font"], block_patterns=["/uedata"], allow_patterns=["arkoselabs.com", "/ap/cvf"])
+
+
+@pytest.mark.parametrize("url, resource_type, blocked", [
+    ("https://m.media-amazon.com/images/cover.jpg", "image", True),
+    ("https://read.amazon.com/fonts/ember.woff2", "font", True),
+    ("https://read.amazon.com/uedata?ul=1", "xhr", True),
+    ("https://read.amazon.com/notebook", "document", False),
+    ("https://read.amazon.com/notebook?asin=B1", "fetch", False),
+    ("https://client-api.arkoselabs.com/fc/gc/tile.png", "image", False),
+    ("https://www.amazon.com/ap/cvf/request?arb=1", "image", False),
+])
+def test_should_block(request_filter, url, resource_type, blocked):
+    assert request_filter.should_block(url, resource_type) is blocked
+
+
+def test_install_routes_and_counts(request_filter):
+    context = FakeContext()
+
+    async def scenario():
+        stats = await request_filter.install(context)
+        routes = [
+            FakeRoute("https://m.media-amazon.com/images/cover.jpg", "image"),
+            FakeRoute("https://client-api.arkoselabs.com/fc/gc/tile.png", "image"),
+            FakeRoute("https://read.amazon.com/notebook", "document"),
+        ]
+        for route in routes:
+            await context.handler(route)
+        context.listeners["response"](SimpleNamespace(headers={"content-length": "1200"}))
+        context.listeners["response"](SimpleNamespace(headers={}))
+        return stats, routes
+
+    stats, routes = asyncio.run(scenario())
+
+    assert [route.outcome for route in routes] == ["blockedbyclient", "continued", "continued"]
+    assert stats.to_dict() == {
+        "allowed": 2,
+        "blocked": 1,
+        "blocked_by_type": {"image": 1},
+        "bytes_received": 1200,
+        "bytes_saved_estimate": ESTIMATED_BYTES["image"],
+    }
+
+
+def test_disabled_filter_installs_nothing():
+    context = FakeContext()
+
+    assert asyncio.run(RequestFilter(enabled=False).install(context)) is None
+    assert context.handler is None
+
+
+def test_patterns_from_environment(monkeypatch):
+    monkeypatch.setenv("REQUEST_BLOCK_TYPES", "media, stylesheet")
+    monkeypatch.setenv("REQUEST_BLOCK_PATTERNS", "tracker.example")
+    monkeypatch.setenv("REQUEST_ALLOW_PATTERNS", "")
+    request_filter = RequestFilter(enabled=True)
+
+    assert request_filter.block_types == {"media", "stylesheet"}
+    assert request_filter.should_block("https://tracker.example/pixel", "xhr")
+    assert not request_filter.should_block("https://read.amazon.com/cover.jpg", "image")
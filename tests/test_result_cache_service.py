@@ -0,0 +1,47 @@
+from src.models.kindle_models import BookRecord, HighlightRecord
+from src.services.result_cache_service import ResultCacheService
+from src.utils import serialization
+from src.utils.account import credential_key
+from src.utils.response import create_response, encode_response_body
+
+
+def test_result_cache_key_covers_credentials_and_options():
+    secret = credential_key("reader@example.com", "secret")
+    guess = credential_key("reader@example.com", "guess")
+
+    assert ResultCacheService.key(secret) == ResultCacheService.key(secret)
+    assert ResultCacheService.key(secret) != ResultCacheService.key(guess)
+    assert ResultCacheService.key(secret, limit=2) != ResultCacheService.key(secret)
+    assert ResultCacheService.key(secret, limit=2, offset=1) == ResultCacheService.key(secret, offset=1, limit=2)
+
+
+def test_result_cache_entries_are_per_key():
+    cache = ResultCacheService(backend="memory", ttl=60, max_entries=10)
+    secret = cache.key(credential_key("reader@example.com", "secret"))
+    cache.set(secret, b'{"data": []}', b"[]")
+
+    assert cache.get(secret).body == b'{"data": []}'
+    assert cache.get(cache.key(credential_key("reader@example.com", "guess"))) is None
+
+
+
+def test_encoded_body_matches_create_response():
+    books = [BookRecord(book_id="B1", book_title="Dune", book_author=["Frank Herbert"], highlights=[HighlightRecord(text="é \u2028 \"x\"")])]
+    meta = {"partial": False, "timings": {"total": 1.5}}
+
+    for meta in (meta, None):
+        body = encode_response_body(200, "Highlights scraped successfully", serialization.dumps(books), meta)
+        assert body == create_response(200, "Highlights scraped successfully", books, meta).body
+
+
+def test_etag_ignores_run_metadata():
+    data_json = serialization.dumps([BookRecord(book_id="B1", book_title="Dune", book_author=[])])
+    cache = ResultCacheService(backend="memory", ttl=60, max_entries=10)
+
+    first = cache.set("a", encode_response_body(200, "ok", data_json, {"timings": {"total": 1.0}}), data_json)
+    second = cache.set("b", encode_response_body(200, "ok", data_json, {"timings": {"total": 9.0}}), data_json)
+
+    assert first.etag == second.etag
+    assert first.etag != cache.etag(serialization.dumps([]))
+    assert cache.matches(f'W/{first.etag}, "other"', first.etag)
+    assert not cache.matches('"other"', first.etag)
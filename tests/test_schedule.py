@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.utils.schedule import Schedule
+
+
+def at(*args) -> float:
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def test_interval():
+    assert Schedule(interval=900).next_after(1000.0) == 1900.0
+
+
+@pytest.mark.parametrize("cron, after, expected", [
+    ("*/15 * * * *", at(2025, 8, 17, 10, 7, 30), at(2025, 8, 17, 10, 15)),
+    ("0 3 * * *", at(2025, 8, 17, 3, 0), at(2025, 8, 18, 3, 0)),
+    ("30 6 * * 1", at(2025, 8, 17, 12, 0), at(2025, 8, 18, 6, 30)),  # Sunday -> Monday
+    ("0 0 1 * *", at(2025, 12, 15, 0, 0), at(2026, 1, 1, 0, 0)),
+    ("0 0 29 2 *", at(2025, 3, 1, 0, 0), at(2028, 2, 29, 0, 0)),
+    ("0 12 * * 7", at(2025, 8, 16, 12, 0), at(2025, 8, 17, 12, 0)),  # 7 is Sunday too
+])
+def test_cron_next_after(cron, after, expected):
+    assert Schedule(cron=cron).next_after(after) == expected
+
+
+def test_cron_day_and_weekday_match_either():
+    # Like cron: the 1st of the month or any Monday
+    schedule = Schedule(cron="0 0 1 * 1")
+
+    assert schedule.next_after(at(2025, 8, 1, 0, 0)) == at(2025, 8, 4, 0, 0)
+    assert schedule.next_after(at(2025, 8, 25, 0, 0)) == at(2025, 9, 1, 0, 0)
+
+
+def test_cron_that_never_fires_raises():
+    with pytest.raises(ValueError, match="never matches"):
+        Schedule(cron="0 0 31 2 *").next_after(at(2025, 1, 1))
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"interval": 60, "cron": "* * * * *"},
+    {"interval": 0},
+    {"cron": "* * * *"},
+    {"cron": "60 * * * *"},
+    {"cron": "*/0 * * * *"},
+    {"cron": "5-1 * * * *"},
+])
+def test_invalid_schedules(kwargs):
+    with pytest.raises(ValueError):
+        Schedule(**kwargs)
+
+
+@pytest.mark.parametrize("value", ["interval:3600", "cron:0 3 * * 1-5"])
+def test_parse_round_trip(value):
+    assert str(Schedule.parse(value)) == value
+
+
+@pytest.mark.parametrize("schedule, gap", [
+    (Schedule(interval=900), 900),
+    (Schedule(cron="* * * * *"), 60),
+    (Schedule(cron="*/15 * * * *"), 900),
+    (Schedule(cron="0,5 3 * * *"), 300),
+    (Schedule(cron="0 0,23 * * *"), 3600),  # 23:00 to midnight
+    (Schedule(cron="0 3 * * 1"), 86400),
+])
+def test_min_gap(schedule, gap):
+    assert schedule.min_gap() == gap
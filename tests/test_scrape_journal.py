@@ -0,0 +1,122 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from src.services.highlight_store_service import HighlightStoreService
+from src.services.kindle_scraper_service import KindleScraperService
+from src.utils.account import account_key
+from src.utils.book_filter import BookFilter
+
+FULL = KindleScraperService.run_options(False)
+INCREMENTAL = KindleScraperService.run_options(True)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HighlightStoreService(str(tmp_path / "highlights.db"))
+
+
+def test_run_options_identify_what_a_run_covers():
+    assert FULL != INCREMENTAL
+    assert KindleScraperService.run_options(False, BookFilter()) == FULL
+    assert KindleScraperService.run_options(False, BookFilter.parse(asin="B2,B1")) == KindleScraperService.run_options(False, BookFilter.parse(asin="B1,B2"))
+    assert KindleScraperService.run_options(False, BookFilter.parse(asin="B1")) != FULL
+    # Projection does not change which books a run opens
+    assert KindleScraperService.run_options(False, BookFilter.parse(fields="book_title")) == FULL
+
+
+def test_resumed_run_skips_finished_books_but_retries_failed_ones(store):
+    token, finished = store.start_run("account", options=FULL)
+    assert finished == {}
+
+    store.record_run_book(token, "B1", "changed")
+    store.record_run_book(token, "B2", "unchanged")
+    store.record_run_book(token, "B3", "failed", "timeout", 3)
+
+    assert store.start_run("account", token, FULL) == (token, {"B1": "changed", "B2": "unchanged"})
+
+
+def test_resume_requires_the_same_account_and_options(store):
+    token, _ = store.start_run("account", options=FULL)
+
+    with pytest.raises(ValueError, match="Unknown"):
+        store.start_run("other-account", token, FULL)
+    with pytest.raises(ValueError, match="different options"):
+        store.start_run("account", token, INCREMENTAL)
+    with pytest.raises(ValueError, match="Unknown"):
+        store.start_run("account", "no-such-token", FULL)
+
+
+def test_latest_run_and_its_options(store):
+    full, _ = store.start_run("account", options=FULL)
+    time.sleep(0.01)
+    incremental, _ = store.start_run("account", options=INCREMENTAL)
+
+    assert store.latest_run("account", FULL) == full
+    assert store.latest_run("account", INCREMENTAL) == incremental
+    assert store.run_options("account", full) == FULL
+    assert store.run_options("other-account", full) is None
+
+    store.finish_run(full)
+    assert store.latest_run("account", FULL) is None
+    assert store.run_options("account", full) is None
+
+
+def test_journals_expire(store):
+    token, _ = store.start_run("account", options=FULL)
+    store.journal_ttl = -1
+
+    assert store.latest_run("account", FULL) is None
+    with pytest.raises(ValueError):
+        store.start_run("account", token, FULL)
+
+
+def test_stores_without_options_are_migrated(tmp_path):
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE scrape_runs (token TEXT PRIMARY KEY, account_key TEXT NOT NULL, started_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO scrape_runs VALUES ('old', 'account', ?, ?)", (time.time(), time.time()))
+
+    store = HighlightStoreService(path)
+
+    # Journals from before options were recorded only resume with the empty options they were given
+    assert store.run_options("account", "old") == ""
+    with pytest.raises(ValueError, match="different options"):
+        store.start_run("account", "old", FULL)
+
+
+@pytest.mark.parametrize("resume_token, params, status", [
+    ("latest", {"incremental": "True"}, 404),
+    ("latest", {"asin": "B1"}, 404),
+    ("unknown", {}, 404),
+    ("token", {"incremental": "True"}, 409),
+    ("token", {"asin": "B1"}, 409),
+])
+def test_handler_rejects_mismatched_resume_tokens(handler, resume_token, params, status):
+    token, _ = handler.highlight_store_service.start_run(account_key("reader@example.com"), options=FULL)
+    handler.kindle_scraper_service.scrape = None  # Never reached
+
+    response = asyncio.run(handler.get_highlights(
+        None, "reader@example.com", "secret", resume_token=token if resume_token == "token" else resume_token, **params
+    ))
+
+    assert response.status_code == status
+
+
+def test_handler_resumes_a_matching_run(handler):
+    token, _ = handler.highlight_store_service.start_run(account_key("reader@example.com"), options=FULL)
+    calls = []
+
+    async def scrape(**params):
+        calls.append(params["resume_token"])
+        return {"books": [], "meta": {}}
+
+    handler.kindle_scraper_service.scrape = scrape
+    response = asyncio.run(handler.get_highlights(None, "reader@example.com", "secret", resume_token="latest", fields="book_title"))
+
+    assert response.status_code == 200
+    assert calls == [token]
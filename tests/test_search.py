@@ -0,0 +1,139 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from src.models.kindle_models import BookRecord, HighlightRecord
+from src.services.highlight_store_service import HighlightStoreService
+from src.utils import serialization
+from src.utils.account import account_key, credential_key
+
+ACCOUNT = "account"
+CREDENTIALS = "credentials"
+
+
+def make_book(asin: str, title: str, *highlights: HighlightRecord, authors=("Frank Herbert",)) -> BookRecord:
+    return BookRecord(book_id=asin, book_title=title, book_author=list(authors), highlights=list(highlights))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HighlightStoreService(str(tmp_path / "highlights.db"))
+    store.record_login(ACCOUNT, CREDENTIALS)
+    store.save_book(ACCOUNT, make_book(
+        "B1", "Dune",
+        HighlightRecord(text="Fear is the mind-killer.", note="litany", page=10),
+        HighlightRecord(text="The spice must flow.", note=None, page=200),
+    ), None, None)
+    store.save_book(ACCOUNT, make_book(
+        "B2", "Children of Dune",
+        HighlightRecord(text="Café society and fear of change", note="about fear", page=5),
+    ), None, None)
+    return store
+
+
+def search(store, query, **kwargs):
+    return store.search(ACCOUNT, CREDENTIALS, query, **kwargs)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ('fear', '"fear"'),
+    ('"mind killer" spi*', '"mind killer" "spi"*'),
+    ('say "hi', '"say" """hi"'),  # An unbalanced quote is searched for literally
+    ('***', ''),
+    ('a"b', '"a""b"'),
+])
+def test_build_match_query(query, expected):
+    assert HighlightStoreService.build_match_query(query) == expected
+
+
+def test_saved_books_are_indexed(store):
+    total, results = search(store, "fear")
+
+    assert total == 2
+    assert {result["book_id"] for result in results} == {"B1", "B2"}
+    assert all("<mark>" in result["text_snippet"] for result in results)
+
+
+def test_ranking_prefers_text_over_notes(store):
+    store.save_book(ACCOUNT, make_book("B3", "Notes", HighlightRecord(text="unrelated words", note="arrakis")), None, None)
+    store.save_book(ACCOUNT, make_book("B4", "Texts", HighlightRecord(text="arrakis", note="unrelated words")), None, None)
+
+    _, results = search(store, "arrakis")
+
+    assert [result["book_id"] for result in results] == ["B4", "B3"]
+    assert results[0]["score"] > results[1]["score"]
+    assert results[1]["note_snippet"] == "<mark>arrakis</mark>"
+
+
+def test_prefix_phrase_diacritics_and_metadata(store):
+    assert search(store, "spi*")[0] == 1
+    assert search(store, '"spice must"')[0] == 1
+    assert search(store, '"must spice"')[0] == 0
+    assert search(store, "cafe")[0] == 1
+    assert search(store, "herbert")[0] == 3
+    assert search(store, "children fear")[0] == 1
+    assert search(store, 'fear "mind')[0] == 1  # The stray quote is dropped by the tokenizer
+
+
+def test_filters_and_paging(store):
+    assert search(store, "fear", asins=["B2"])[0] == 1
+    assert search(store, "fear", page_from=6)[0] == 1
+    assert search(store, "herbert", page_to=10)[0] == 2
+
+    total, page = search(store, "herbert", limit=2, offset=2)
+    assert total == 3
+    assert len(page) == 1
+
+
+def test_resaving_and_deleting_books_updates_the_index(store):
+    store.save_book(ACCOUNT, make_book("B1", "Dune", HighlightRecord(text="Only this remains")), None, None)
+
+    assert search(store, "mind")[0] == 0
+    assert search(store, "remains")[0] == 1
+
+    store.delete_books(ACCOUNT, ["B1"])
+    assert search(store, "remains")[0] == 0
+
+
+def test_search_is_scoped_to_the_signed_in_credentials(store):
+    store.save_book("other-account", make_book("B9", "Private", HighlightRecord(text="fear")), None, None)
+
+    assert store.search(ACCOUNT, "guessed-credentials", "fear") == (0, [])
+    assert search(store, "fear")[0] == 2
+
+    store.record_login(ACCOUNT, "new-password")
+    assert search(store, "fear") == (0, [])
+
+
+def test_existing_highlights_are_backfilled(tmp_path):
+    path = str(tmp_path / "old.db")
+    store = HighlightStoreService(path)
+    store.record_login(ACCOUNT, CREDENTIALS)
+    store.save_book(ACCOUNT, make_book("B1", "Dune", HighlightRecord(text="Fear is the mind-killer.")), None, None)
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM highlights_fts")
+
+    reopened = HighlightStoreService(path)
+
+    assert search(reopened, "fear")[0] == 1
+
+
+def test_handler_refuses_credentials_that_never_signed_in(handler):
+    email = "reader@example.com"
+    key = account_key(email)
+    store = handler.highlight_store_service
+    store.save_book(key, make_book("B1", "Diary", HighlightRecord(text="my secret plans")), None, None)
+    store.save_sync_account(key, credential_key(email, "attacker-guess"), "envelope", "interval:3600", 0)
+
+    response = asyncio.run(handler.search_highlights(None, email, "attacker-guess", q="secret"))
+
+    assert response.status_code == 403
+    assert b"my secret plans" not in response.body
+
+    store.record_login(key, credential_key(email, "secret"))
+    store.save_sync_account(key, credential_key(email, "secret"), "envelope", "interval:3600", 0)
+    response = asyncio.run(handler.search_highlights(None, email, "secret", q="secret"))
+
+    assert response.status_code == 200
+    assert serialization.loads(response.body)["meta"]["total"] == 1
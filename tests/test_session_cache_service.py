@@ -0,0 +1,59 @@
+import base64
+import os
+
+import pytest
+
+from src.services.session_cache_service import SessionCacheService
+from src.utils.account import account_key, credential_key
+
+
+@pytest.fixture
+def session_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("SESSION_CACHE_ENABLED", "True")
+    monkeypatch.setenv("SESSION_CACHE_KEY", base64.b64encode(os.urandom(32)).decode("utf-8"))
+    return SessionCacheService(cache_dir=str(tmp_path), ttl=60, max_entries=2)
+
+
+def test_account_key_normalizes_email():
+    assert account_key(" Reader@Example.com ") == account_key("reader@example.com")
+
+
+def test_credential_key_depends_on_password():
+    assert credential_key("reader@example.com", "secret") == credential_key("reader@example.com", "secret")
+    assert credential_key("reader@example.com", "secret") != credential_key("reader@example.com", "guess")
+    assert credential_key("reader@example.com", "secret") != credential_key("other@example.com", "secret")
+
+
+def test_session_is_only_reused_with_the_same_password(session_cache):
+    state = {"cookies": [{"name": "session-id", "value": "1"}]}
+    session_cache.save(credential_key("reader@example.com", "secret"), state)
+
+    assert session_cache.load(credential_key("reader@example.com", "secret")) == state
+    assert session_cache.load(credential_key("reader@example.com", "guess")) is None
+
+
+def test_session_expires(session_cache):
+    key = credential_key("reader@example.com", "secret")
+    session_cache.save(key, {"cookies": []})
+    session_cache.ttl = -1
+
+    assert session_cache.load(key) is None
+    assert not os.listdir(session_cache.cache_dir)
+
+
+def test_session_cache_evicts_least_recently_used(session_cache):
+    keys = [credential_key(f"reader{i}@example.com", "secret") for i in range(3)]
+    for key in keys:
+        session_cache.save(key, {"cookies": []})
+
+    assert len(os.listdir(session_cache.cache_dir)) == 2
+    assert session_cache.load(keys[-1]) is not None
+
+
+def test_session_file_is_not_readable_under_another_key(session_cache):
+    key = credential_key("reader@example.com", "secret")
+    other = credential_key("reader@example.com", "guess")
+    session_cache.save(key, {"cookies": []})
+    os.replace(session_cache._path(key), session_cache._path(other))
+
+    assert session_cache.load(other) is None
\ No newline at end of file
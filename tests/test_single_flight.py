@@ -0,0 +1,149 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.admission_controller import AdmissionController
+from src.services.kindle_scraper_service import KindleScraperService
+from src.services.request_filter import RequestFilter
+from src.services.wait_strategy import WaitStrategy
+from src.utils.book_filter import BookFilter
+from src.utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return {"books": []}
+
+    async def scenario():
+        flight = SingleFlight(window=0)
+        results = await asyncio.gather(*(flight.run("key", work) for _ in range(5)))
+        assert flight.in_flight() == 0
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert len(runs) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_different_keys_run_separately():
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+
+    async def scenario():
+        flight = SingleFlight(window=0)
+        await asyncio.gather(flight.run("a", work), flight.run("b", work))
+
+    asyncio.run(scenario())
+
+    assert len(runs) == 2
+
+
+def test_result_is_shared_within_the_window_only():
+    runs = []
+
+    async def work():
+        runs.append(1)
+        return len(runs)
+
+    async def scenario():
+        flight = SingleFlight(window=0.05)
+        first = await flight.run("key", work)
+        second = await flight.run("key", work)
+        await asyncio.sleep(0.1)
+        third = await flight.run("key", work)
+        return first, second, third
+
+    assert asyncio.run(scenario()) == (1, 1, 2)
+
+
+def test_failures_are_not_kept():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    async def scenario():
+        flight = SingleFlight(window=10)
+        with pytest.raises(RuntimeError):
+            await flight.run("key", work)
+        return await flight.run("key", work)
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        flight = SingleFlight(window=0)
+        leaving = asyncio.create_task(flight.run("key", work))
+        staying = asyncio.create_task(flight.run("key", work))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+        return await staying
+
+    assert asyncio.run(scenario()) == "done"
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    monkeypatch.setenv("SINGLE_FLIGHT_WINDOW_SECONDS", "0")
+    scraper = KindleScraperService(
+        SimpleNamespace(size=1), None, None, RequestFilter(enabled=False), AdmissionController(ceiling=1), WaitStrategy(stats_path="")
+    )
+    scraper.runs = []
+
+    async def fake_scrape(email, password, headless, manual_puzzle, incremental, concurrency, extraction, humanization, *rest):
+        scraper.runs.append((incremental, concurrency, extraction, humanization))
+        await asyncio.sleep(0.05)
+        return {"books": [], "meta": {}}
+
+    scraper._scrape = fake_scrape
+    return scraper
+
+
+def test_scraper_coalesces_identical_requests(scraper):
+    async def scenario():
+        await asyncio.gather(*(
+            scraper.scrape("reader@example.com", "secret", request_key="key", humanization=humanization)
+            for humanization in (None, "normal", "normal")
+        ))
+
+    asyncio.run(scenario())
+
+    assert len(scraper.runs) == 1
+
+
+@pytest.mark.parametrize("options", [
+    {"incremental": True},
+    {"concurrency": 2},
+    {"extraction": "network"},
+    {"humanization": "none"},
+    {"book_filter": BookFilter.parse(asin="B1")},
+    {"resume_token": "token"},
+])
+def test_scraper_does_not_share_scrapes_across_options(scraper, options):
+    async def scenario():
+        await asyncio.gather(
+            scraper.scrape("reader@example.com", "secret", request_key="key"),
+            scraper.scrape("reader@example.com", "secret", request_key="key", **options),
+            scraper.scrape("reader@example.com", "secret", request_key="other-password"),
+        )
+
+    asyncio.run(scenario())
+
+    assert len(scraper.runs) == 3
@@ -0,0 +1,125 @@
+import asyncio
+import base64
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization as pem
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.models.kindle_models import BookRecord, HighlightRecord
+from src.utils import serialization
+from src.utils.account import account_key, credential_key
+from src.utils.schedule import Schedule
+
+VICTIM = "reader@example.com"
+
+
+@pytest.fixture
+def private_key_env(monkeypatch):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    data = key.private_bytes(pem.Encoding.PEM, pem.PrivateFormat.PKCS8, pem.NoEncryption())
+    monkeypatch.setenv("PRIVATE_KEY", base64.b64encode(data).decode("utf-8"))
+
+
+@pytest.fixture
+def sync_handler(handler, private_key_env):
+    handler.highlight_store_service.save_book(
+        account_key(VICTIM),
+        BookRecord(book_id="B1", book_title="Diary", book_author=["Reader"], highlights=[HighlightRecord(text="my secret plans")]),
+        "August 17, 2025",
+        None
+    )
+    return handler
+
+
+def sign_in(handler, email: str, password: str):
+    """What a scrape records once Amazon accepted the credentials"""
+    handler.highlight_store_service.record_login(account_key(email), credential_key(email, password))
+
+
+def read_store(handler, password: str):
+    return asyncio.run(handler.get_highlights(None, VICTIM, password, source="store"))
+
+
+def register(handler, password: str, **schedule):
+    return asyncio.run(handler.register_sync(None, VICTIM, password, **(schedule or {"interval": 3600})))
+
+
+def test_store_is_not_served_to_a_password_that_never_signed_in(sync_handler):
+    sign_in(sync_handler, VICTIM, "secret")
+
+    assert register(sync_handler, "attacker-guess").status_code == 201
+    response = read_store(sync_handler, "attacker-guess")
+
+    assert response.status_code == 403
+    assert b"my secret plans" not in response.body
+
+
+def test_unverified_registration_is_replaced_by_the_owner(sync_handler):
+    sign_in(sync_handler, VICTIM, "secret")
+    register(sync_handler, "attacker-guess")
+
+    assert register(sync_handler, "secret").status_code == 200
+    response = read_store(sync_handler, "secret")
+    assert response.status_code == 200
+    assert serialization.loads(response.body)["data"][0]["highlights"][0]["text"] == "my secret plans"
+
+    # Once the registered credentials have signed in, others cannot take the registration over
+    assert register(sync_handler, "attacker-guess").status_code == 409
+
+
+def test_store_follows_the_last_sign_in(sync_handler):
+    sign_in(sync_handler, VICTIM, "secret")
+    register(sync_handler, "secret")
+    sign_in(sync_handler, VICTIM, "new-password")
+
+    assert read_store(sync_handler, "secret").status_code == 403
+    assert register(sync_handler, "new-password").status_code == 200
+    assert read_store(sync_handler, "new-password").status_code == 200
+
+
+@pytest.mark.parametrize("schedule, status", [
+    ({"cron": "* * * * *"}, 400),
+    ({"cron": "*/5 * * * *"}, 400),
+    ({"cron": "0,5 3 * * *"}, 400),
+    ({"cron": "*/15 * * * *"}, 201),
+    ({"interval": 60}, 400),
+    ({"interval": 900}, 201),
+    ({"cron": "0 0 31 2 *"}, 400),
+])
+def test_schedule_floor(sync_handler, schedule, status):
+    assert register(sync_handler, "secret", **schedule).status_code == status
+
+
+def test_scheduler_never_books_a_run_sooner_than_the_floor(handler):
+    scheduler = handler.sync_scheduler
+    scheduler.jitter = 0
+    now = time.time()
+
+    assert scheduler._next_run(Schedule(cron="* * * * *"), now) == now + scheduler.min_interval
+    assert scheduler._next_run(Schedule(interval=86400), now) == now + 86400
+
+
+def test_invalid_stored_schedule_does_not_stop_other_accounts(handler):
+    store = handler.highlight_store_service
+    scheduler = handler.sync_scheduler
+    started = []
+
+    async def run(account):
+        started.append(account["account_key"])
+
+    scheduler._run = run
+    now = time.time()
+    store.save_sync_account("bad", "k", "envelope", "cron:0 0 31 2 *", now - 10)
+    store.save_sync_account("good", "k", "envelope", "interval:3600", now - 5)
+
+    async def scenario():
+        await scheduler._start_due_runs()
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    assert started == ["good"]
+    bad = store.get_sync_account("bad")
+    assert bad["last_status"] == "invalid"
+    assert bad["next_run_at"] >= now + scheduler.min_interval
@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from src.services.wait_strategy import WaitStrategy
+
+
+@pytest.fixture
+def waits(monkeypatch):
+    monkeypatch.setenv("WAIT_ADAPTIVE", "True")
+    monkeypatch.setenv("WAIT_MIN_SAMPLES", "10")
+    monkeypatch.setenv("WAIT_TIMEOUT_MULTIPLIER", "3")
+    monkeypatch.setenv("WAIT_MIN_TIMEOUT_MS", "2000")
+    monkeypatch.setenv("WAIT_MAX_TIMEOUT_MS", "120000")
+    monkeypatch.setenv("WAIT_WINDOW", "20")
+    return WaitStrategy(stats_path="")
+
+
+def test_default_until_enough_samples(waits):
+    for _ in range(9):
+        waits.record("library", 1.0)
+
+    assert waits.timeout("library", 30000) == 30000
+
+    waits.record("library", 1.0)
+    assert waits.timeout("library", 30000) == 3000
+
+
+def test_timeout_follows_p95_within_bounds(waits):
+    for _ in range(19):
+        waits.record("library", 0.1)
+    assert waits.timeout("library", 30000) == 2000  # Clamped to WAIT_MIN_TIMEOUT_MS
+
+    waits.record("library", 10.0)
+    waits.record("library", 10.0)
+    assert waits.p95("library") == 10.0
+    assert waits.timeout("library", 30000) == 30000
+
+    for _ in range(20):
+        waits.record("library", 100.0)
+    assert waits.timeout("library", 30000) == 120000  # Clamped to WAIT_MAX_TIMEOUT_MS
+
+
+def test_window_forgets_old_latencies(waits):
+    for _ in range(20):
+        waits.record("annotations", 10.0)
+    for _ in range(20):
+        waits.record("annotations", 1.0)
+
+    assert waits.timeout("annotations", 30000) == 3000
+
+
+def test_wait_records_duration_and_timeouts(waits):
+    async def scenario():
+        async with waits.wait("annotations", 5000) as timeout:
+            assert timeout == 5000
+            await asyncio.sleep(0.01)
+        with pytest.raises(PlaywrightTimeoutError):
+            async with waits.wait("annotations", 5000):
+                raise PlaywrightTimeoutError("timed out")
+        with pytest.raises(asyncio.TimeoutError):
+            async with waits.wait("annotations", 5000):
+                raise asyncio.TimeoutError()
+        with pytest.raises(ValueError):
+            async with waits.wait("annotations", 5000):
+                raise ValueError("not a wait")
+
+    asyncio.run(scenario())
+
+    samples = list(waits._samples["annotations"])
+    assert len(samples) == 3
+    assert 0.01 <= samples[0] < 1
+    # A timed out wait is recorded at its timeout, pushing the next one up
+    assert samples[1:] == [5.0, 5.0]
+
+
+def test_disabled_strategy_uses_defaults(waits):
+    waits.enabled = False
+    for _ in range(20):
+        waits.record("library", 1.0)
+
+    assert waits.timeout("library", 30000) == 30000
+
+
+def test_latencies_survive_a_restart(waits, tmp_path):
+    path = tmp_path / "wait_stats.json"
+    waits.stats_path = str(path)
+    for _ in range(10):
+        waits.record("library", 1.0)
+    waits.save()
+
+    assert json.loads(path.read_text()) == {"library": [1.0] * 10}
+    assert WaitStrategy(stats_path=str(path)).timeout("library", 30000) == 3000
+
+
+def test_unreadable_stats_are_ignored(tmp_path):
+    path = tmp_path / "wait_stats.json"
+    path.write_text("{not json")
+
+    assert WaitStrategy(stats_path=str(path)).stats() == {}
+
+
+def test_stats(waits):
+    waits.timeout("login", 30000)
+    for _ in range(10):
+        waits.record("library", 1.0)
+
+    assert waits.stats() == {
+        "library": {"samples": 10, "p95_seconds": 1.0, "timeout_ms": None},
+        "login": {"samples": 0, "p95_seconds": None, "timeout_ms": 30000},
+    }